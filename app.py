@@ -2,13 +2,15 @@
 OKX Crypto Desktop App - wxPython 4.
 Markets, tickers, candles (REST + WebSocket), spot trading (REST + WebSocket).
 """
+import os
 import threading
+import time
 from datetime import datetime, timezone
 import wx
 import wx.grid
 from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
 
-from config import API_KEY, SECRET_KEY, PASSPHRASE, USE_DEMO
+from config import API_KEY, SECRET_KEY, PASSPHRASE, USE_DEMO, REPLAY_PATH, REPLAY_SPEED, STALL_MS, DIAG_DIR, WS_INGEST
 from okx_client import (
     # get_instruments,
     get_tickers,
@@ -17,11 +19,20 @@ from okx_client import (
     get_orders,
     get_balance,
 )
-from okx_ws import OKXWebSocket
+from okx_ws import OKXWebSocket, WsFatalError
 from candles_chart import CandlesChartPanel
 # from tickers_sidebar import TickersPanel
 from markets_sidebar import MarketsPanel
 from trading_panel import TradingPanel
+from candle_store import get_store
+from instrument_catalog import get_catalog
+from ticker_store import get_ticker_store
+from md_record import parse_speed, start_replay
+from ui_watchdog import SamplingProfiler, StallWatchdog, run_main_loop
+from md_shm import IngestProcess
+from task_pool import get_task_pool
+from mem_report import format_report, measure
+from md_latency import get_latency_meter, now_ms
 
 # Custom events for thread-safe UI updates
 EVT_WS_TICKER = wx.NewEventType()
@@ -35,52 +46,76 @@ EVT_WS_ERROR_BINDER = wx.PyEventBinder(EVT_WS_ERROR, 1)
 
 
 class WsTickerEvent(wx.PyEvent):
-    def __init__(self, inst_id: str, data: dict):
+    def __init__(self, inst_id: str, data: dict, stamp=None):
         super().__init__(eventType=EVT_WS_TICKER)
         self.inst_id = inst_id
         self.data = data
+        self.stamp = stamp  # md_latency.Stamp
 
 
 class WsCandleEvent(wx.PyEvent):
-    def __init__(self, inst_id: str, data: list):
+    def __init__(self, inst_id: str, data: list, stamp=None):
         super().__init__(eventType=EVT_WS_CANDLE)
         self.inst_id = inst_id
         self.data = data
+        self.stamp = stamp
 
 
 class WsOrderEvent(wx.PyEvent):
-    def __init__(self, data: dict):
+    def __init__(self, data: dict, stamp=None):
         super().__init__(eventType=EVT_WS_ORDER)
         self.data = data
+        self.stamp = stamp
 
 
 class WsErrorEvent(wx.PyEvent):
-    def __init__(self, msg: str):
+    def __init__(self, msg: str, fatal: bool = False):
         super().__init__(eventType=EVT_WS_ERROR)
         self.msg = msg
+        self.fatal = fatal  # okx_ws.WsFatalError: shown in a dialog, not just the status bar
 
 
 class MainFrame(wx.Frame):
+    AGE_PANELS = ("markets", "chart")  # staleness readout in the status bar
+
     def __init__(self):
         super().__init__(None, title="OKX Crypto Desktop", size=(1200, 750))
-        self._ws_public: OKXWebSocket | None = None
+        self._ws_public: OKXWebSocket | IngestProcess | None = None
         self._ws_private: OKXWebSocket | None = None
         self._current_inst_id = "BTC-USDT"
+        self._watchdog: StallWatchdog | None = None
+        self._profiler: SamplingProfiler | None = None
+        self._ws_errors = 0
+        self._ws_error_shown = False
         
         # Menu bar
         menubar = wx.MenuBar()
         file_menu = wx.Menu()
+        profile_item = file_menu.AppendCheckItem(
+            wx.ID_ANY, "Sampling &profiler\tCtrl+Shift+P", "Sample the GUI thread; stopping writes a flamegraph file"
+        )
+        tasks_item = file_menu.Append(wx.ID_ANY, "Background &tasks...", "Queue depth and latency of background REST work")
+        memory_item = file_menu.Append(wx.ID_ANY, "&Memory usage...", "Approximate bytes held per subsystem")
+        latency_item = file_menu.Append(wx.ID_ANY, "Market data &latency...", "Per-channel latency percentiles and candle gap repairs")
+        file_menu.AppendSeparator()
         file_menu.Append(wx.ID_EXIT, "E&xit")
         menubar.Append(file_menu, "&File")
         self.SetMenuBar(menubar)
         self.Bind(wx.EVT_MENU, self.OnExit, id=wx.ID_EXIT)
+        self.Bind(wx.EVT_MENU, self._on_toggle_profiler, profile_item)
+        self.Bind(wx.EVT_MENU, lambda evt: wx.MessageBox(get_task_pool().format_stats(), "Background tasks"), tasks_item)
+        self.Bind(wx.EVT_MENU, self._on_memory_report, memory_item)
+        self.Bind(wx.EVT_MENU, lambda evt: wx.MessageBox(
+            get_latency_meter().format_stats() + "\n\nChart candle gaps: " + self.candles_chart_panel.gaps.format_counts(),
+            "Market data latency"), latency_item)
         
         # build UI
         self._build_ui()
         
         self._connect_events()
         self.Centre()
-        # Load data
+        # Load data; instrument metadata comes from the disk cache now and refreshes in the background
+        get_catalog().start()
         self.markets_panel.load()
         # self.tickers_panel.load()
         #self.candles_panel.set_pair(self._current_inst_id)
@@ -88,6 +123,10 @@ class MainFrame(wx.Frame):
         
         self.trading_panel._refresh_orders()
         self._start_ws()
+        if os.environ.get("OKX_UI_PROBE"):
+            self._start_ui_probe(os.environ["OKX_UI_PROBE"])
+        if STALL_MS > 0:
+            self._start_watchdog()
 
     def _build_ui(self):
         panel = wx.Panel(self)
@@ -129,8 +168,14 @@ class MainFrame(wx.Frame):
         main.Add(right, proportion=1, flag=wx.EXPAND | wx.ALL, border=5)
 
         panel.SetSizer(main)
-        self.status = self.CreateStatusBar()
+        self.status = self.CreateStatusBar(2)
+        self.status.SetStatusWidths([-3, -2])
         self.status.SetStatusText("OKX Spot — REST + WebSocket" + (" (Demo)" if USE_DEMO else ""))
+        # field 1: age of the newest data each panel has painted
+        self._age_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda evt: self.status.SetStatusText(
+            "Data age: " + get_latency_meter().format_ages(self.AGE_PANELS), 1), self._age_timer)
+        self._age_timer.Start(1000)
 
     def _connect_events(self):
         self.Bind(EVT_WS_TICKER_BINDER, self._on_ws_ticker)
@@ -157,7 +202,7 @@ class MainFrame(wx.Frame):
             if isinstance(data, list) and data:
                 data = data[0]
             if inst_id and data:
-                evt = WsTickerEvent(inst_id, data if isinstance(data, dict) else {})
+                evt = WsTickerEvent(inst_id, data if isinstance(data, dict) else {}, msg.get("stamp"))
                 wx.PostEvent(self, evt)
 
         def on_candle(msg):
@@ -167,24 +212,50 @@ class MainFrame(wx.Frame):
             if isinstance(data, list) and data:
                 data = data[0]  # single candle array [ts, o, h, l, c, vol, ...]
             if inst_id and data:
-                evt = WsCandleEvent(inst_id, data if isinstance(data, list) else [])
+                evt = WsCandleEvent(inst_id, data if isinstance(data, list) else [], msg.get("stamp"))
                 wx.PostEvent(self, evt)
 
         def on_error(err):
-            wx.PostEvent(self, WsErrorEvent(str(err)))
-
-        self._ws_public = OKXWebSocket(private=False, on_message=lambda m: self._dispatch_ws(m, on_ticker, on_candle), on_error=on_error)
+            wx.PostEvent(self, WsErrorEvent(str(err), isinstance(err, WsFatalError)))
+
+        if WS_INGEST == "process" and not REPLAY_PATH:
+            # decode in a child process; pushes arrive through shared memory, drained on a timer
+            self._ws_public = IngestProcess(on_error=on_error)
+            self._ingest_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self._on_ingest_poll, self._ingest_timer)
+            self._ingest_timer.Start(50)
+        else:
+            self._ws_public = OKXWebSocket(private=False, on_message=lambda m: self._dispatch_ws(m, on_ticker, on_candle), on_error=on_error)
+        if REPLAY_PATH:
+            self._start_replay(on_error)
+            return
         self._ws_public.start()
         self._ws_public.subscribe_ticker("BTC-USDT")
         self._ws_public.subscribe_candle("BTC-USDT", "1m")
         if API_KEY and SECRET_KEY and PASSPHRASE:
             def on_order(msg):
-                wx.PostEvent(self, WsOrderEvent(msg.get("data", {})))
-
-            self._ws_private = OKXWebSocket(private=True, on_message=on_order, on_error=on_error)
+                wx.PostEvent(self, WsOrderEvent(msg.get("data", {}), msg.get("stamp")))
+
+            self._ws_private = OKXWebSocket(
+                private=True,
+                on_message=on_order,
+                on_error=on_error,
+                on_open=lambda: wx.CallAfter(self.trading_panel.on_orders_stream_ready),
+            )
             self._ws_private.start()
             self._ws_private.subscribe_orders("SPOT")
 
+    def _start_replay(self, on_error):
+        """OKX_REPLAY: feed a recorded session through the same WS callbacks instead of connecting."""
+        get_latency_meter().enabled = False  # recorded exchange timestamps are not comparable with now
+        self._ws_private = OKXWebSocket(private=True, on_message=lambda m: wx.PostEvent(self, WsOrderEvent(m.get("data", {}))), on_error=on_error)
+        handlers = {
+            "pub": lambda raw: self._ws_public._on_message(None, raw),
+            "priv": lambda raw: self._ws_private._on_message(None, raw),
+        }
+        self._replay_stop = start_replay(REPLAY_PATH, handlers, parse_speed(REPLAY_SPEED))
+        self.status.SetStatusText(f"Replaying {REPLAY_PATH} at {REPLAY_SPEED}x")
+
     def _dispatch_ws(self, msg, on_ticker, on_candle):
         arg = msg.get("arg", {})
         ch = arg.get("channel", "")
@@ -193,24 +264,113 @@ class MainFrame(wx.Frame):
         elif ch and ch.startswith("candle"):
             on_candle(msg)
 
+    def _on_ingest_poll(self, evt):
+        tickers, candles = self._ws_public.poll()
+        store = get_ticker_store()
+        meter, t = get_latency_meter(), now_ms()
+        # the child decoded these; "net" covers the child and the ring, decode is ~0
+        for inst_id, data in tickers.items():
+            store.upsert(inst_id, data)
+            meter.applied(meter.received("tickers", inst_id, [data], t), "markets")
+        for inst_id, row in candles:
+            if self.candles_chart_panel.append_candle(inst_id, row):
+                meter.applied(meter.received("candle1m", inst_id, [row], t), "chart")
+
     def _on_ws_ticker(self, evt: WsTickerEvent):
-        self.tickers_panel.update_ticker(evt.inst_id, evt.data)
+        # every ticker view repaints its dirty rows from the shared store
+        get_ticker_store().upsert(evt.inst_id, evt.data)
+        get_latency_meter().applied(evt.stamp, "markets")
 
     def _on_ws_candle(self, evt: WsCandleEvent):
-        self.candles_panel.append_candle(evt.inst_id, evt.data)
+        if self.candles_chart_panel.append_candle(evt.inst_id, evt.data):
+            get_latency_meter().applied(evt.stamp, "chart")
 
     def _on_ws_order(self, evt: WsOrderEvent):
         self.trading_panel.update_order_ws(evt.data)
+        meter = get_latency_meter()
+        meter.applied(evt.stamp, "orders")
+        meter.painted("orders")  # the row is set in place; orders arrive too rarely for an age readout
 
     def _on_ws_error(self, evt: WsErrorEvent):
-        self.status.SetStatusText(f"WS error: {evt.msg}")
-        wx.MessageBox(evt.msg, "WebSocket Error", wx.OK | wx.ICON_WARNING)
+        # during an outage every reconnect attempt fails again: the status bar keeps count, and only
+        # errors that reconnecting will not cure get a dialog
+        self._ws_errors += 1
+        self.status.SetStatusText(f"WS error ({self._ws_errors}): {evt.msg}")
+        if evt.fatal and not self._ws_error_shown:  # one dialog at a time, even if the error repeats
+            self._ws_error_shown = True
+            wx.MessageBox(evt.msg, "WebSocket Error", wx.OK | wx.ICON_WARNING)
+            self._ws_error_shown = False
+
+    def _start_ui_probe(self, path: str):
+        """soak_test.py: log event-loop lag (how late a 100 ms timer fires) as "epoch_ms lag_ms" lines."""
+        self._probe = open(path, "a", buffering=1)
+        self._probe_due = time.perf_counter() + 0.1
+        self._probe_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._on_ui_probe, self._probe_timer)
+        self._probe_timer.Start(100)
+
+    def _on_ui_probe(self, evt):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._probe_due) * 1000)
+        self._probe_due = now + 0.1
+        self._probe.write(f"{int(time.time() * 1000)} {lag_ms:.1f}\n")
+
+    def _start_watchdog(self):
+        """Heartbeat for ui_watchdog: if this timer stops firing, the monitor thread logs what the GUI thread is doing."""
+        os.makedirs(DIAG_DIR, exist_ok=True)
+        self._watchdog = StallWatchdog(
+            threading.get_ident(), STALL_MS / 1000, os.path.join(DIAG_DIR, "ui_stalls.log"), on_stall=self._on_stall
+        )
+        self._heartbeat = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda evt: self._watchdog.beat(), self._heartbeat)
+        self._heartbeat.Start(100)
+        self._watchdog.start()
+
+    def _on_stall(self, seconds: float, handler: str):
+        self.status.SetStatusText(f"GUI stalled {seconds * 1000:.0f} ms in {handler} (see ui_stalls.log)")
+
+    def _on_toggle_profiler(self, evt):
+        if self._profiler is None:
+            self._profiler = SamplingProfiler(threading.get_ident())
+            self._profiler.start()
+            self.status.SetStatusText("Profiling the GUI thread; File > Sampling profiler again to stop")
+            return
+        path = os.path.join(DIAG_DIR, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        try:
+            os.makedirs(DIAG_DIR, exist_ok=True)
+            n = self._profiler.stop(path)
+            self.status.SetStatusText(f"Profile: {n} samples written to {path}")
+        except OSError as e:
+            self.status.SetStatusText(f"Profile not written: {e}")
+        self._profiler = None
+
+    def _on_memory_report(self, evt):
+        store, catalog = get_ticker_store(), get_catalog()
+        chart, markets, trading = self.candles_chart_panel, self.markets_panel, self.trading_panel
+        rows = measure({
+            "Ticker store": lambda: (store, len(store)),
+            "Markets row text": lambda: (markets._texts, len(markets._texts)),
+            "Chart candles": lambda: (chart._candles, len(chart._candles)),
+            "Chart indicators": lambda: (chart.indicators, len(chart.indicators)),
+            "Open orders": lambda: (trading._orders, len(trading._orders)),
+            "Instrument catalog": lambda: (catalog, len(catalog)),
+        })
+        wx.MessageBox(format_report(rows), "Memory usage")
 
     def OnExit(self, evt):
+        self._age_timer.Stop()
+        if self._watchdog:
+            self._heartbeat.Stop()
+            self._watchdog.stop()
+        if isinstance(self._ws_public, IngestProcess):
+            self._ingest_timer.Stop()
         if self._ws_public:
             self._ws_public.stop()
         if self._ws_private:
             self._ws_private.stop()
+        store = get_store()
+        if store:
+            store.close()
         self.Destroy()
 
 
@@ -218,7 +378,7 @@ def main():
     app = wx.App()
     f = MainFrame()
     f.Show()
-    app.MainLoop()
+    run_main_loop(app)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the hot paths (signing, query strings, WS decode/dispatch, chart drawing, market
+list filtering, terminal state updates). No network: market data comes from mock_okx's synthetic model
+with a fixed seed, so runs are comparable.
+
+  python bench.py                   run everything and compare with the saved baseline
+  python bench.py --save            run and store the results as the new baseline
+  python bench.py -k ws -k sign     only cases whose name contains one of these
+  python bench.py --threshold 25    flag cases more than 25% slower than the baseline (default 15%; exit status 1)
+
+Cases that draw need wxPython and a display; on a headless box run `xvfb-run python bench.py`,
+otherwise they are skipped. The baseline is machine-specific: ~/.okx_desktop/bench_baseline.json
+(OKX_BENCH_BASELINE or --baseline).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+from typing import Callable
+
+# synthetic frames must never end up in a recording, and nothing here should touch the real cache
+os.environ.pop("OKX_RECORD_DIR", None)
+os.environ.pop("OKX_REPLAY", None)
+os.environ.setdefault("OKX_CANDLE_DB", "")
+
+from config import INSTRUMENT_CACHE_DIR
+import mock_okx
+
+BASELINE_PATH = os.environ.get("OKX_BENCH_BASELINE", os.path.join(INSTRUMENT_CACHE_DIR, "bench_baseline.json"))
+SEED = 1
+INSTRUMENTS = 20  # instruments in the WS frame mix (all on the terminal watch list)
+FRAMES = 2000
+MARKETS = 700  # roughly OKX's USDT spot list
+QUERIES = ["", "B", "BT", "BTC", "", "usdt", "T01", "T012", "ETH-USDT", "X"]  # typing, clearing, no hits
+CHART_SIZE = (1200, 600)
+RECHECKS = 2  # a case over the threshold is measured again this many times before it is flagged
+
+
+class Skip(Exception):
+    """Raised by a case's setup when it cannot run here (reason in the message)."""
+
+
+# name -> setup(); setup returns (fn, ops): fn() performs `ops` operations of the measured path
+CASES: dict[str, Callable[[], tuple[Callable[[], None], int]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# --- Data ---
+
+_data: dict = {}
+
+
+def _exchange() -> mock_okx.MockExchange:
+    if "exchange" not in _data:
+        _data["exchange"] = mock_okx.MockExchange(INSTRUMENTS, seed=SEED)
+    return _data["exchange"]
+
+
+def _frames() -> list[str]:
+    """Public WS frames in the mock's channel rotation; a quarter go to BTC-USDT, like a watched pair."""
+    if "frames" not in _data:
+        ex = _exchange()
+        rng = random.Random(SEED)
+        ids = list(ex.instruments)
+        now_ms = int(time.time() * 1000)
+        frames = []
+        for i in range(FRAMES):
+            inst = ex.instruments[ids[0] if rng.random() < 0.25 else rng.choice(ids)]
+            inst.step(rng, now_ms)
+            ch = mock_okx.CHANNELS[i % len(mock_okx.CHANNELS)]
+            if ch == "tickers":
+                item = inst.ticker(now_ms)
+            elif ch == "trades":
+                item = inst.trades[0]
+            elif ch == "books5":
+                item = inst.book(5, now_ms)
+            else:
+                item = inst.candle_row(inst.candles[-1], "0")
+            frames.append(json.dumps({"arg": {"channel": ch, "instId": inst.inst_id}, "data": [item]}, separators=(",", ":")))
+        _data["frames"] = frames
+    return _data["frames"]
+
+
+def _tickers(n: int = MARKETS) -> list[dict]:
+    """A market-wide REST ticker snapshot (MARKETS symbols, mostly -USDT)."""
+    if "tickers" not in _data:
+        rng = random.Random(SEED)
+        now_ms = int(time.time() * 1000)
+        bases = mock_okx.MAJORS + [f"T{i:04d}" for i in range(n - len(mock_okx.MAJORS))]
+        out = []
+        for i, base in enumerate(bases[:n]):
+            last = 10 ** rng.uniform(-3, 4)
+            quote = "USDT" if i % 10 else "USDC"
+            out.append({
+                "instType": "SPOT", "instId": f"{base}-{quote}", "last": f"{last:.6g}",
+                "open24h": f"{last * rng.uniform(0.9, 1.1):.6g}", "high24h": f"{last * 1.12:.6g}",
+                "low24h": f"{last * 0.88:.6g}", "vol24h": f"{rng.uniform(1, 1e6):.2f}", "ts": str(now_ms),
+            })
+        _data["tickers"] = out
+    return _data["tickers"]
+
+
+def _wx_frame():
+    """A hidden top-level frame to parent panels in; Skip when wx or a display is unavailable."""
+    try:
+        import wx
+    except ImportError:
+        raise Skip("wxPython not installed")
+    if sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        raise Skip("no display (run under xvfb-run)")
+    if wx.GetApp() is None:
+        _data["wx_app"] = wx.App(False)
+    return wx.Frame(None, size=(CHART_SIZE[0], CHART_SIZE[1] + 200))
+
+
+# --- Cases ---
+
+@case("sign.rest")
+def _sign_rest():
+    from okx_client import _sign
+    body = json.dumps({"instId": "BTC-USDT", "tdMode": "cash", "side": "buy", "ordType": "limit", "px": "60000.1", "sz": "0.01"})
+    return lambda: _sign("2024-01-01T00:00:00.000Z", "POST", "/api/v5/trade/order", body), 1
+
+
+@case("sign.ws")
+def _sign_ws():
+    from okx_ws import _sign_ws
+    return lambda: _sign_ws("1704067200"), 1
+
+
+@case("request.query_string")
+def _query_string():
+    from okx_client import _query_string
+    params = {"instId": "BTC-USDT", "bar": "1m", "after": "1704067200000", "before": "", "limit": "300"}
+    return lambda: _query_string(params), 1
+
+
+@case("ws.on_message")
+def _ws_on_message():
+    from okx_ws import OKXWebSocket
+    ws = OKXWebSocket(private=False, on_message=lambda m: None)
+    frames = _frames()
+
+    def run():
+        for raw in frames:
+            ws._on_message(None, raw)
+    return run, len(frames)
+
+
+@case("app.dispatch_ws")
+def _app_dispatch_ws():
+    try:
+        from app import MainFrame
+    except ImportError as e:
+        raise Skip(f"app not importable ({e})")
+    msgs = []
+    for raw in _frames():
+        data = json.loads(raw)
+        msgs += [{"arg": data["arg"], "data": item} for item in data["data"]]
+    dispatch = MainFrame._dispatch_ws  # does not touch self, so no frame (or display) is needed
+    noop = lambda m: None
+
+    def run():
+        for msg in msgs:
+            dispatch(None, msg, noop, noop)
+    return run, len(msgs)
+
+
+@case("chart.draw")
+def _chart_draw():
+    frame = _wx_frame()
+    import wx
+    from candles_chart import CandlesChartPanel
+    panel = CandlesChartPanel(frame)
+    panel.set_data(_exchange().instruments["BTC-USDT"].candles_for("1m"))
+    w, h = CHART_SIZE
+    dc = wx.MemoryDC(wx.Bitmap(w, h))
+    return lambda: panel._draw(dc, w, h), 1
+
+
+@case("markets.filter")
+def _markets_filter():
+    from instrument_search import InstrumentIndex
+    index = InstrumentIndex(sorted(t["instId"] for t in _tickers()))
+
+    def run():
+        for q in QUERIES:
+            index.search(q)
+    return run, len(QUERIES)
+
+
+@case("markets.rebuild")
+def _markets_rebuild():
+    frame = _wx_frame()
+    from markets_sidebar import MarketsPanel
+    from ticker_store import TickerStore
+    store = TickerStore()
+    panel = MarketsPanel(frame, on_select=lambda inst_id: None, store=store)
+    store.load(_tickers())
+    cols = panel.list.GetColumnCount()
+
+    def run():
+        # what a keystroke costs once the debounce fires: filter, then format the visible rows
+        for q in QUERIES:
+            panel.search.ChangeValue(q)
+            panel._apply_filter()
+            panel._texts = {}
+            for row in range(min(40, len(panel._filtered))):
+                for col in range(cols):
+                    panel._item_text(row, col)
+    return run, len(QUERIES)
+
+
+@case("markets.store_upsert")
+def _store_upsert():
+    from ticker_store import TickerStore
+    store = TickerStore()
+    store.load(_tickers())
+    updates = [json.loads(raw)["data"][0] for raw in _frames() if '"channel":"tickers"' in raw]
+
+    def run():
+        for d in updates:
+            store.upsert(d["instId"], d)
+    return run, len(updates)
+
+
+@case("terminal.on_ws_message")
+def _terminal_on_ws_message():
+    import terminal_btc
+    terminal_btc.set_watch(list(_exchange().instruments))
+    frames = _frames()
+    on_message = terminal_btc._on_ws_message
+
+    def run():
+        for raw in frames:
+            on_message(None, raw)
+    return run, len(frames)
+
+
+# --- Runner ---
+
+def measure(fn: Callable[[], None], ops: int, repeat: int) -> float:
+    """Best time per operation in µs: timeit picks a loop count of at least 0.2 s, best of `repeat`."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number / ops * 1e6
+
+
+def _machine() -> dict:
+    return {"host": platform.node(), "machine": platform.machine(), "python": platform.python_version()}
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path: str, results: dict[str, float], old: dict):
+    """Measured cases replace their entries; cases not run this time keep the old ones."""
+    merged = dict(old.get("results", {}))
+    merged.update(results)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"saved": int(time.time()), **_machine(), "results": merged}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for the hot paths")
+    ap.add_argument("-k", dest="only", action="append", default=[], help="run cases whose name contains this (repeatable)")
+    ap.add_argument("--repeat", type=int, default=5, help="samples per case (best is kept)")
+    ap.add_argument("--threshold", type=float, default=15.0, help="percent slower than baseline that counts as a regression")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save", action="store_true", help="store these results as the baseline")
+    ap.add_argument("--list", action="store_true", help="list case names and exit")
+    args = ap.parse_args()
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    base = baseline.get("results", {})
+    if baseline and any(baseline.get(k) != v for k, v in _machine().items()):
+        print(f"note: baseline was saved on {baseline.get('host')} / Python {baseline.get('python')}; comparisons are rough")
+    limit = 1 + args.threshold / 100
+    results: dict[str, float] = {}
+    regressions = []
+    print(f"{'case':26} {'µs/op':>10} {'baseline':>10} {'change':>8}")
+    for name, setup in CASES.items():
+        if args.only and not any(k in name for k in args.only):
+            continue
+        try:
+            fn, ops = setup()
+        except Skip as e:
+            print(f"{name:26} {'skipped':>10}  {e}")
+            continue
+        us = measure(fn, ops, args.repeat)
+        prev = base.get(name)
+        for _ in range(RECHECKS):
+            if not prev or us <= prev * limit:
+                break
+            us = min(us, measure(fn, ops, args.repeat))  # a noisy sample should not fail the run
+        results[name] = us
+        if prev:
+            ratio = us / prev
+            flag = "  REGRESSION" if ratio > limit else "  faster" if ratio < 1 / limit else ""
+            if ratio > limit:
+                regressions.append(name)
+            print(f"{name:26} {us:>10.3f} {prev:>10.3f} {(ratio - 1) * 100:>+7.1f}%{flag}")
+        else:
+            print(f"{name:26} {us:>10.3f} {'-':>10} {'':>8}")
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"baseline saved to {args.baseline}")
+    elif not base:
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+    if regressions and not args.save:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+CandleBuffer: bounded, timestamp-ordered OHLCV buffer for REST + WebSocket candles.
+Rows are OKX arrays [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm], kept oldest first.
+Storage is packed: an int64 ts column plus one comma-joined string per bar (about 130 bytes a bar
+instead of ~640 for a list of nine str). Rows are handed out as tuples, rebuilt on access.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Callable, NamedTuple
+
+from config import CANDLE_CAPACITY
+
+
+class CandleChange(NamedTuple):
+    """Result of upsert(): row index (after eviction), action and rows evicted from the front."""
+    index: int
+    action: str  # "update" | "append" | "insert" | "drop"
+    evicted: int = 0
+
+
+def candle_ts(row) -> int:
+    try:
+        return int(row[0])
+    except (TypeError, ValueError, IndexError):
+        return -1
+
+
+def is_confirmed(row) -> bool:
+    return len(row) > 8 and str(row[8]) == "1"
+
+
+def _pack(row) -> str:
+    return ",".join(map(str, row[1:]))
+
+
+class CandleBuffer:
+    """
+    OKX pushes the in-progress bar many times; each push replaces the bar with the same ts.
+    A bar is committed once a confirm=1 version arrives: later unconfirmed pushes for it are
+    dropped, and unconfirmed bars are only accepted as the newest bar.
+    """
+
+    def __init__(self, capacity: int = CANDLE_CAPACITY, on_commit: Callable[[tuple], None] | None = None):
+        self.capacity = max(1, int(capacity))
+        self.on_commit = on_commit
+        self._ts = array("q")
+        self._text: list[str] = []  # "o,h,l,c,vol,volCcy,volCcyQuote,confirm" per bar
+        self._confirmed = bytearray()
+
+    def _row(self, i: int) -> tuple:
+        return (str(self._ts[i]), *self._text[i].split(","))
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self._ts)))]
+        if i < 0:
+            i += len(self._ts)
+        if not 0 <= i < len(self._ts):
+            raise IndexError("candle index out of range")
+        return self._row(i)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self._ts)))
+
+    @property
+    def rows(self) -> list[tuple]:
+        """Rows oldest first, rebuilt from the packed columns (O(n): index single rows in hot paths)."""
+        return [self._row(i) for i in range(len(self._ts))]
+
+    @property
+    def last_ts(self) -> int | None:
+        return self._ts[-1] if self._ts else None
+
+    @property
+    def live(self) -> tuple | None:
+        """The in-progress (unconfirmed) newest bar, if any."""
+        if self._ts and not self._confirmed[-1]:
+            return self._row(len(self._ts) - 1)
+        return None
+
+    def index_of(self, ts: int) -> int:
+        """Index of the bar with this ts, or -1."""
+        i = bisect_left(self._ts, ts)
+        return i if i < len(self._ts) and self._ts[i] == ts else -1
+
+    def between(self, start: int, end: int) -> list[tuple]:
+        """Rows with start <= ts < end."""
+        return [self._row(i) for i in range(bisect_left(self._ts, start), bisect_left(self._ts, end))]
+
+    def gaps(self, interval_ms: int, since: int | None = None) -> list[tuple[int, int]]:
+        """Runs of missing bars as (first, last) missing ts, judged by the bar interval; since: only runs
+        that start after the bar with this ts."""
+        ts = self._ts
+        start = bisect_left(ts, since) + 1 if since is not None else 1
+        return [(ts[i - 1] + interval_ms, ts[i] - interval_ms)
+                for i in range(start, len(ts)) if ts[i] - ts[i - 1] > interval_ms]
+
+    def clear(self):
+        self._ts = array("q")
+        self._text = []
+        self._confirmed = bytearray()
+
+    def nbytes(self) -> int:
+        """Approximate heap bytes held by the packed columns."""
+        return (
+            sys.getsizeof(self._ts) + sys.getsizeof(self._confirmed) + sys.getsizeof(self._text)
+            + sum(map(sys.getsizeof, self._text))
+        )
+
+    def set_rows(self, data: list) -> int:
+        """Replace contents with data in any order (REST is newest first). Returns rows dropped over capacity."""
+        by_ts = {}
+        for row in data or []:
+            ts = candle_ts(row)
+            if ts >= 0:
+                by_ts[ts] = row
+        keys = sorted(by_ts)
+        dropped = max(0, len(keys) - self.capacity)
+        keys = keys[dropped:]
+        self._ts = array("q", keys)
+        self._text = [_pack(by_ts[k]) for k in keys]
+        self._confirmed = bytearray(is_confirmed(by_ts[k]) for k in keys)
+        return dropped
+
+    def upsert(self, row: list) -> CandleChange:
+        ts = candle_ts(row)
+        if ts < 0:
+            return CandleChange(-1, "drop")
+        text = _pack(row)
+        confirmed = is_confirmed(row)
+        ts_list = self._ts
+        if not ts_list or ts > ts_list[-1]:
+            ts_list.append(ts)
+            self._text.append(text)
+            self._confirmed.append(confirmed)
+            if confirmed:
+                self._commit(len(ts_list) - 1)
+            evicted = self._evict()
+            return CandleChange(len(ts_list) - 1, "append", evicted)
+        i = bisect_left(ts_list, ts)
+        if i < len(ts_list) and ts_list[i] == ts:
+            if self._confirmed[i] and not confirmed:
+                return CandleChange(i, "drop")
+            changed = self._text[i] != text
+            self._text[i] = text
+            self._confirmed[i] = confirmed
+            if confirmed and changed:
+                self._commit(i)
+            return CandleChange(i, "update")
+        # Older bar that is not in the buffer: only confirmed history may be filled in
+        if not confirmed or (i == 0 and len(ts_list) >= self.capacity):
+            return CandleChange(-1, "drop")
+        ts_list.insert(i, ts)
+        self._text.insert(i, text)
+        self._confirmed.insert(i, 1)
+        self._commit(i)
+        evicted = self._evict()
+        return CandleChange(i - evicted, "insert", evicted)
+
+    def _commit(self, i: int):
+        if self.on_commit:
+            self.on_commit(self._row(i))
+
+    def _evict(self) -> int:
+        n = len(self._ts) - self.capacity
+        if n <= 0:
+            return 0
+        del self._ts[:n]
+        del self._text[:n]
+        del self._confirmed[:n]
+        return n
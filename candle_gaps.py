@@ -0,0 +1,101 @@
+"""
+Candle gap detection and REST repair. After a WS stall or reconnect the next candle push can be several
+bars ahead of the last one, and the bars in between are silently missing. GapRepairer looks for such
+runs, judged by the bar interval, after every load and on every appended bar. Each new run is fetched
+in the background with get_candles(after=, before=). The rows come back through `deliver` and are merged
+oldest first with merge(), on the GUI thread.
+Each range is fetched once per pair. If REST has no bars for it (a quiet pair with no trades in those
+minutes), it stays a gap and counts as empty. A failed fetch is retried at the next check.
+A bar left unconfirmed when a newer one is appended (its confirm push was lost too) is refetched with
+the range after it.
+"""
+import threading
+from typing import Callable
+
+from candle_buffer import CandleBuffer, CandleChange, candle_ts, is_confirmed
+from candle_resample import bar_ms
+from okx_client import get_candles
+from task_pool import get_task_pool
+
+PAGE = 300  # get_candles limit
+MAX_BARS = 1440  # per range; older history is left to the next full load
+MAX_RANGES = 20  # per check, newest first: a long-gappy history is not fetched all at once
+
+
+class GapRepairer:
+    def __init__(self, bar: str, deliver: Callable[[str, list], None]):
+        """deliver(inst_id, rows) is called from a worker thread with the fetched rows (oldest first);
+        the owner hands them to merge() on the GUI thread (wx.CallAfter)."""
+        self.bar = bar
+        self.ms = bar_ms(bar)
+        self.deliver = deliver
+        self.counts = dict.fromkeys(("gaps", "repaired", "bars", "empty", "failed"), 0)
+        self._lock = threading.Lock()
+        self._seen: set[tuple[str, int, int]] = set()  # ranges fetched or being fetched for this pair
+
+    def reset(self):
+        """New pair: forget the ranges already fetched."""
+        with self._lock:
+            self._seen.clear()
+
+    def check(self, inst_id: str, buffer: CandleBuffer, change: CandleChange | None = None):
+        """After a load (change None: scan the whole buffer) or an upsert (only an append can open a gap)."""
+        if not inst_id or len(buffer) < 2:
+            return
+        if change is None:
+            gaps = buffer.gaps(self.ms)
+        elif change.action == "append" and change.index >= 1:
+            prev = buffer[change.index - 1]
+            gaps = buffer.gaps(self.ms, since=candle_ts(prev))
+            if not is_confirmed(prev):
+                gaps = [(candle_ts(prev), gaps[0][1] if gaps else candle_ts(prev))]
+        else:
+            return
+        for first, last in reversed(gaps[-MAX_RANGES:]):
+            key = (inst_id, first, last)
+            with self._lock:
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                self.counts["gaps"] += 1
+            self._fetch(inst_id, first, last)
+
+    def _fetch(self, inst_id: str, first: int, last: int):
+        def work(task):
+            rows: list = []
+            after = last + self.ms  # get_candles: after/before are exclusive bounds on ts
+            try:
+                while len(rows) < MAX_BARS:
+                    page = get_candles(inst_id, bar=self.bar, after=str(after), before=str(first - self.ms),
+                                       limit=PAGE)
+                    page = [r for r in page if first <= candle_ts(r) <= last]
+                    rows.extend(page)
+                    if len(page) < PAGE:
+                        break
+                    after = candle_ts(page[-1])
+            except Exception:
+                with self._lock:
+                    self.counts["failed"] += 1
+                    self._seen.discard((inst_id, first, last))
+                return
+            rows.sort(key=candle_ts)
+            self.deliver(inst_id, rows)
+
+        get_task_pool().submit(work, key=("gap", id(self), inst_id, first, last))
+
+    def merge(self, rows: list, upsert: Callable[[list], bool]) -> int:
+        """GUI thread: upsert fetched rows oldest first; upsert(row) -> True if the row was taken.
+        Returns the number of bars merged."""
+        added = sum(1 for r in rows if upsert(r))
+        with self._lock:
+            if added:
+                self.counts["repaired"] += 1
+                self.counts["bars"] += added
+            else:
+                self.counts["empty"] += 1
+        return added
+
+    def format_counts(self) -> str:
+        c = self.counts
+        return (f"gaps {c['gaps']}, repaired {c['repaired']} ({c['bars']} bars), "
+                f"empty {c['empty']}, failed {c['failed']}")
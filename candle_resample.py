@@ -0,0 +1,242 @@
+"""
+Local multi-timeframe candles: build 3m..1D bars from a single 1m stream (REST history + WS).
+OKX aligns 1m..4H bars to UTC; 6H/12H/1D default to Hong Kong time (UTC+8) unless the bar
+has a "utc" suffix (e.g. 1Dutc).
+Run: python candle_resample.py [INST_ID] [BAR ...]  to check local bars against REST.
+"""
+from decimal import Decimal, InvalidOperation
+
+from candle_buffer import CandleBuffer, CandleChange, candle_ts, is_confirmed
+from config import CANDLE_CAPACITY, RESAMPLE_MINUTES
+
+MINUTE_MS = 60_000
+HK_OFFSET_MS = 8 * 3600 * 1000
+BAR_MINUTES = {
+    "1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30,
+    "1H": 60, "2H": 120, "4H": 240, "6H": 360, "12H": 720, "1D": 1440,
+}
+
+
+def _base_bar(bar: str) -> str:
+    base = bar[:-3] if bar.endswith("utc") else bar
+    if base not in BAR_MINUTES:
+        raise ValueError(f"unsupported bar: {bar}")
+    return base
+
+
+def bar_ms(bar: str) -> int:
+    return BAR_MINUTES[_base_bar(bar)] * MINUTE_MS
+
+
+def bar_offset_ms(bar: str) -> int:
+    """Shift applied before flooring: HK-time bars start at 16:00 UTC rather than 00:00."""
+    if bar.endswith("utc") or BAR_MINUTES[_base_bar(bar)] < 360:
+        return 0
+    return HK_OFFSET_MS
+
+
+def bucket_start(ts: int, bar: str) -> int:
+    ms, off = bar_ms(bar), bar_offset_ms(bar)
+    return (ts + off) // ms * ms - off
+
+
+def _d(s) -> Decimal:
+    try:
+        return Decimal(str(s))
+    except (InvalidOperation, ValueError):
+        return Decimal(0)
+
+
+class _Bucket:
+    """One higher-timeframe bar: finished minutes folded into o/h/l/c/vols, plus the live minute."""
+
+    __slots__ = ("start", "o", "h", "l", "c", "vols", "live")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.o = self.h = self.l = self.c = None  # (Decimal, str)
+        self.vols = [Decimal(0), Decimal(0), Decimal(0)]
+        self.live: list | None = None
+
+    def fold(self, row: list):
+        hi, lo = (_d(row[2]), row[2]), (_d(row[3]), row[3])
+        if self.o is None:
+            self.o, self.h, self.l = row[1], hi, lo
+        else:
+            if hi[0] > self.h[0]:
+                self.h = hi
+            if lo[0] < self.l[0]:
+                self.l = lo
+        self.c = row[4]
+        for i in range(3):
+            if len(row) > 5 + i:
+                self.vols[i] += _d(row[5 + i])
+
+    def push(self, row: list) -> bool:
+        """Set the live minute, folding the previous one if this is a newer minute. False if out of order."""
+        live = self.live
+        if live is not None:
+            ts, live_ts = candle_ts(row), candle_ts(live)
+            if ts < live_ts:
+                return False
+            if ts > live_ts:
+                self.fold(live)
+        self.live = row
+        return True
+
+    def bar(self, confirm: bool) -> list:
+        o, h, l, c, vols = self.o, self.h, self.l, self.c, list(self.vols)
+        live = self.live
+        if live is not None:
+            hi, lo = (_d(live[2]), live[2]), (_d(live[3]), live[3])
+            if o is None:
+                o, h, l = live[1], hi, lo
+            else:
+                h = hi if hi[0] > h[0] else h
+                l = lo if lo[0] < l[0] else l
+            c = live[4]
+            for i in range(3):
+                if len(live) > 5 + i:
+                    vols[i] += _d(live[5 + i])
+        return [str(self.start), o, h[1], l[1], c] + [str(v) for v in vols] + ["1" if confirm else "0"]
+
+
+class Resampler:
+    """Aggregates 1m rows into one target bar size; output lives in self.buffer."""
+
+    def __init__(self, bar: str, capacity: int = CANDLE_CAPACITY):
+        self.bar = bar
+        self.ms = bar_ms(bar)
+        self.buffer = CandleBuffer(capacity)
+        self._cur: _Bucket | None = None
+
+    def _complete(self, b: _Bucket) -> bool:
+        live = b.live
+        return live is not None and is_confirmed(live) and candle_ts(live) + MINUTE_MS >= b.start + self.ms
+
+    def load(self, minutes: list[list]):
+        """Rebuild from 1m rows (oldest first). A leading partial bucket is skipped; see seed()."""
+        bars = []
+        cur = None
+        for row in minutes:
+            start = bucket_start(candle_ts(row), self.bar)
+            if cur is None or start != cur.start:
+                if cur is not None:
+                    bars.append(cur.bar(True))
+                cur = _Bucket(start)
+            cur.push(row)
+        self._cur = cur
+        if cur is not None:
+            bars.append(cur.bar(self._complete(cur)))
+        if len(bars) > 1 and candle_ts(minutes[0]) > candle_ts(bars[0]):
+            bars = bars[1:]
+        self.buffer.set_rows(bars)
+
+    def seed(self, rows: list[list]):
+        """Merge REST bars of this size that are older than the locally built history."""
+        first = self.buffer[0] if len(self.buffer) else None
+        first_ts = candle_ts(first) if first else None
+        for row in rows or []:
+            if first_ts is None or candle_ts(row) < first_ts:
+                self.buffer.upsert(row)
+
+    def update(self, row: list, minutes: CandleBuffer) -> list[CandleChange]:
+        """Apply one 1m row (already upserted into `minutes`). Returns the buffer changes, in order."""
+        start = bucket_start(candle_ts(row), self.bar)
+        cur = self._cur
+        changes = []
+        if cur is None or start > cur.start:
+            if cur is not None:
+                changes.append(self.buffer.upsert(cur.bar(True)))
+            cur = self._cur = _Bucket(start)
+            cur.push(row)
+        elif start == cur.start:
+            if not cur.push(row):
+                cur = self._cur = self._rebuild(start, minutes)
+        else:
+            # Late minute for a closed bucket (e.g. gap repair): rebuild it from the 1m history
+            changes.append(self.buffer.upsert(self._rebuild(start, minutes).bar(True)))
+            return changes
+        changes.append(self.buffer.upsert(cur.bar(self._complete(cur))))
+        return changes
+
+    def _rebuild(self, start: int, minutes: CandleBuffer) -> _Bucket:
+        b = _Bucket(start)
+        for r in minutes.between(start, start + self.ms):
+            b.push(r)
+        return b
+
+
+class MultiTimeframe:
+    """One 1m buffer plus a Resampler per higher bar; switching bars needs no network."""
+
+    def __init__(self, bars: list[str], capacity: int = CANDLE_CAPACITY, minutes: int = RESAMPLE_MINUTES):
+        self.minutes = CandleBuffer(max(capacity, minutes))
+        self._resamplers = {bar: Resampler(bar, capacity) for bar in bars if bar != "1m"}
+
+    def buffer(self, bar: str) -> CandleBuffer:
+        return self.minutes if bar == "1m" else self._resamplers[bar].buffer
+
+    def clear(self):
+        self.minutes.clear()
+        for r in self._resamplers.values():
+            r.load([])
+
+    def set_minutes(self, data: list):
+        """Load 1m history in any order (REST is newest first) and rebuild every bar."""
+        self.minutes.set_rows(data)
+        for r in self._resamplers.values():
+            r.load(self.minutes.rows)
+
+    def seed(self, bar: str, rows: list):
+        if bar in self._resamplers:
+            self._resamplers[bar].seed(rows)
+
+    def update(self, row: list) -> dict[str, list[CandleChange]]:
+        """Apply one 1m WS row. Returns {bar: changes} for every bar that changed."""
+        change = self.minutes.upsert(row)
+        if change.action == "drop":
+            return {}
+        out = {"1m": [change]}
+        for bar, r in self._resamplers.items():
+            out[bar] = r.update(row, self.minutes)
+        return out
+
+
+def compare_bars(local: list[list], rest: list[list]) -> list[tuple]:
+    """Compare confirmed bars present in both. Returns (ts, field, local, rest) for each mismatch."""
+    fields = ("open", "high", "low", "close", "vol", "volCcy", "volCcyQuote")
+    by_ts = {candle_ts(r): r for r in local if is_confirmed(r)}
+    out = []
+    for r in rest:
+        mine = by_ts.get(candle_ts(r))
+        if mine is None or not is_confirmed(r):
+            continue
+        for i, name in enumerate(fields, start=1):
+            if i >= len(r) or i >= len(mine):
+                break
+            a, b = _d(mine[i]), _d(r[i])
+            if i < 5 and a != b:
+                out.append((r[0], name, mine[i], r[i]))
+            elif i >= 5 and abs(a - b) > max(abs(b), Decimal(1)) * Decimal("1e-6"):
+                out.append((r[0], name, mine[i], r[i]))
+    return out
+
+
+if __name__ == "__main__":
+    import sys
+
+    from okx_client import get_candles, get_candles_paged
+
+    inst_id = sys.argv[1] if len(sys.argv) > 1 else "BTC-USDT"
+    bars = sys.argv[2:] or ["3m", "5m", "15m", "30m", "1H", "2H", "4H", "1D"]
+    mtf = MultiTimeframe(bars)
+    mtf.set_minutes(get_candles_paged(inst_id, "1m", count=RESAMPLE_MINUTES))
+    for bar in bars:
+        local = mtf.buffer(bar).rows
+        rest = get_candles(inst_id, bar=bar, limit="100")
+        common = {candle_ts(r) for r in local} & {candle_ts(r) for r in rest}
+        bad = compare_bars(local, rest)
+        print(f"{bar:>5}: {len(local)} local, {len(common)} compared, {len(bad)} mismatches")
+        for m in bad[:5]:
+            print("       ", m)
@@ -0,0 +1,195 @@
+"""
+CandleStore: SQLite cache of confirmed OKX candles keyed by (instId, bar, ts).
+Cached history loads immediately; only the gap since the last stored bar is fetched via REST.
+Writes go through a background thread so the GUI thread never waits on disk.
+"""
+import os
+import queue
+import sqlite3
+import threading
+
+from candle_buffer import candle_ts, is_confirmed
+from config import CANDLE_DB_PATH, CANDLE_DB_MAX_ROWS, CANDLE_DB_MAX_MB
+from okx_client import get_candles_paged
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    inst_id TEXT NOT NULL,
+    bar TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    o TEXT, h TEXT, l TEXT, c TEXT,
+    vol TEXT, vol_ccy TEXT, vol_quote TEXT,
+    PRIMARY KEY (inst_id, bar, ts)
+) WITHOUT ROWID
+"""
+_COMPACT_EVERY = 5000  # rows written between compactions
+
+
+def _db_row(inst_id: str, bar: str, row: list) -> tuple:
+    vals = [str(v) for v in row[1:8]]
+    vals += [""] * (7 - len(vals))
+    return (inst_id, bar, candle_ts(row), *vals)
+
+
+class CandleStore:
+    def __init__(
+        self,
+        path: str = CANDLE_DB_PATH,
+        max_rows: int = CANDLE_DB_MAX_ROWS,
+        max_mb: int = CANDLE_DB_MAX_MB,
+    ):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_bytes = max_mb * 1024 * 1024
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        self._queue: queue.Queue = queue.Queue()
+        self._written = 0
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    # --- Read ---
+
+    def load(self, inst_id: str, bar: str, limit: int = 1000) -> list[list]:
+        """Newest `limit` cached bars, newest first like get_candles. Cached bars are all confirmed."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT ts, o, h, l, c, vol, vol_ccy, vol_quote FROM candles"
+                " WHERE inst_id = ? AND bar = ? ORDER BY ts DESC LIMIT ?",
+                (inst_id, bar, int(limit)),
+            )
+            return [[str(r[0]), *r[1:], "1"] for r in cur.fetchall()]
+
+    def last_ts(self, inst_id: str, bar: str) -> int | None:
+        with self._lock:
+            r = self._db.execute(
+                "SELECT MAX(ts) FROM candles WHERE inst_id = ? AND bar = ?", (inst_id, bar)
+            ).fetchone()
+        return r[0] if r else None
+
+    def sync(self, inst_id: str, bar: str, limit: int = 300, on_cached=None) -> list[list]:
+        """
+        Blocking (call from a worker). Passes cached bars to on_cached before any network call,
+        then fetches only the bars since the last cached one (or `limit` bars on a cold cache)
+        and saves them. Returns fresh + cached, newest first.
+        """
+        cached = self.load(inst_id, bar, limit)
+        if cached and on_cached:
+            on_cached(cached)
+        since = candle_ts(cached[0]) if cached else None
+        fresh = get_candles_paged(inst_id, bar, count=limit, since=since)
+        self.save(inst_id, bar, fresh)
+        return fresh + cached
+
+    # --- Write ---
+
+    def save(self, inst_id: str, bar: str, rows: list[list]):
+        """Queue confirmed rows for writing; unconfirmed (in-progress) bars are ignored."""
+        rows = [_db_row(inst_id, bar, r) for r in rows or [] if is_confirmed(r) and candle_ts(r) >= 0]
+        if rows:
+            self._queue.put(rows)
+
+    def committer(self, inst_id: str, bar: str):
+        """on_commit callback for a CandleBuffer of this series."""
+        return lambda row: self.save(inst_id, bar, [row])
+
+    def flush(self):
+        """Wait until queued rows are on disk."""
+        self._queue.join()
+
+    def _write_loop(self):
+        while True:
+            batch = self._queue.get()
+            n = 1
+            try:
+                while True:
+                    batch = batch + self._queue.get_nowait()
+                    n += 1
+            except queue.Empty:
+                pass
+            try:
+                with self._lock:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+                    )
+                    self._db.commit()
+                self._written += len(batch)
+                if self._written >= _COMPACT_EVERY:
+                    self._written = 0
+                    self.compact()
+            except sqlite3.Error:
+                pass
+            finally:
+                for _ in range(n):
+                    self._queue.task_done()
+
+    # --- Maintenance ---
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+            free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        return (pages - free) * page_size
+
+    def compact(self):
+        """Trim each series to max_rows, then drop the globally oldest bars while over the size cap."""
+        with self._lock:
+            series = self._db.execute(
+                "SELECT inst_id, bar, COUNT(*) FROM candles GROUP BY inst_id, bar"
+            ).fetchall()
+            for inst_id, bar, n in series:
+                if n > self.max_rows:
+                    self._db.execute(
+                        "DELETE FROM candles WHERE inst_id = ? AND bar = ? AND ts <= ("
+                        " SELECT ts FROM candles WHERE inst_id = ? AND bar = ? ORDER BY ts DESC LIMIT 1 OFFSET ?)",
+                        (inst_id, bar, inst_id, bar, self.max_rows),
+                    )
+            self._db.commit()
+        while self.size_bytes() > self.max_bytes:
+            with self._lock:
+                total = self._db.execute("SELECT COUNT(*) FROM candles").fetchone()[0]
+                if not total:
+                    break
+                self._db.execute(
+                    "DELETE FROM candles WHERE (inst_id, bar, ts) IN ("
+                    " SELECT inst_id, bar, ts FROM candles ORDER BY ts LIMIT ?)",
+                    (max(1, total // 10),),
+                )
+                self._db.commit()
+        with self._lock:
+            self._db.execute("PRAGMA incremental_vacuum").fetchall()  # frees one page per step
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+_store: CandleStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CandleStore | None:
+    """Shared store, opened on first use. None when OKX_CANDLE_DB is empty or the file cannot be opened."""
+    global _store
+    if not CANDLE_DB_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = CandleStore()
+            except (sqlite3.Error, OSError):
+                return None
+            threading.Thread(target=_store.compact, daemon=True).start()
+        return _store
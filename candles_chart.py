@@ -3,12 +3,17 @@ CandlesChartPanel: draw OHLCV candlestick chart with volume.
 Data format: list of [ts, open, high, low, close, vol, ...] (OKX style).
 """
 import wx
-import threading
 from datetime import datetime, timezone
 
 from okx_client import (
     get_candles,
 )
+from candle_buffer import CandleBuffer
+from candle_gaps import GapRepairer
+from candle_store import get_store
+from indicators import IndicatorEngine
+from md_latency import get_latency_meter
+from task_pool import get_task_pool
 
 
 def _f(s, default=0.0):
@@ -26,10 +31,25 @@ class CandlesChartPanel(wx.Panel):
     MARGIN_TOP = 24
     MARGIN_BOTTOM = 48
     VOL_HEIGHT_RATIO = 0.22  # volume area height ratio of chart
+    # (indicator, output, colour) drawn as lines on the price scale
+    OVERLAYS = [
+        ("sma20", "sma", (240, 185, 11)),
+        ("ema50", "ema", (86, 156, 214)),
+        ("bb20", "upper", (150, 110, 200)),
+        ("bb20", "mid", (110, 80, 150)),
+        ("bb20", "lower", (150, 110, 200)),
+        ("vwap", "vwap", (220, 220, 220)),
+    ]
 
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
-        self._candles = []  # list of [ts, o, h, l, c, vol, ...]
+        self._inst_id = None
+        self.indicators = IndicatorEngine()  # float columns + indicators
+        # same capacity as the engine (which keeps at least 2x its longest window), so both evict in
+        # step and live pushes stay on the one-bar update path
+        self._candles = CandleBuffer(self.indicators.capacity)  # [ts, o, h, l, c, vol, ...] oldest first
+        # missing 1m bars (WS stall / reconnect) are refetched and merged in
+        self.gaps = GapRepairer("1m", lambda inst_id, rows: wx.CallAfter(self._merge_gap, inst_id, rows))
         self.SetBackgroundColour(wx.Colour(28, 30, 34))
         self.SetMinSize((300, 180))
         self.Bind(wx.EVT_PAINT, self._on_paint)
@@ -37,6 +57,10 @@ class CandlesChartPanel(wx.Panel):
 
     def set_pair(self, inst_id: str):
         self._inst_id = inst_id
+        store = get_store()
+        # confirmed live bars are written to the on-disk cache as they arrive
+        self._candles.on_commit = store.committer(inst_id, "1m") if store and inst_id else None
+        self.gaps.reset()
         # self.pair_label.SetLabel(inst_id or "—")
         self._load()
 
@@ -47,27 +71,49 @@ class CandlesChartPanel(wx.Panel):
         bar = "1m"
         inst_id = self._inst_id
 
-        def work():
+        def work(task):
+            # a newer pair selection supersedes this load; guard() drops results that arrive after it
+            set_data = task.guard(self.set_data)
             try:
-                data = get_candles(inst_id, bar=bar, limit="300")
-                wx.CallAfter(self.set_data, data)
+                store = get_store()
+                if store:
+                    data = store.sync(inst_id, bar, 300, on_cached=lambda rows: wx.CallAfter(set_data, rows))
+                else:
+                    data = get_candles(inst_id, bar=bar, limit="300")
+                wx.CallAfter(set_data, data)
             except Exception as e:
-                wx.CallAfter(self.set_data, str(e))
+                wx.CallAfter(set_data, str(e))
 
-        threading.Thread(target=work, daemon=True).start()
+        get_task_pool().submit(work, key=("chart", id(self)))
 
     def set_data(self, data: list):
-        """Set OHLCV data. Each row: [ts, open, high, low, close, vol, ...] (OKX order)."""
-        if not data:
-            self._candles = []
+        """Set OHLCV data. Each row: [ts, open, high, low, close, vol, ...] (OKX order, any sort order)."""
+        if not data or not isinstance(data, list):
+            self._candles.clear()
         else:
-            self._candles = list(data)
+            self._candles.set_rows(data)
+            self.gaps.check(self._inst_id, self._candles)
+        self.indicators.load(self._candles.rows)
         self.Refresh()
 
-    def append_candle(self, row: list):
-        """Append one candle and refresh."""
-        self._candles.append(row)
+    def append_candle(self, inst_id: str, row: list) -> bool:
+        """Upsert one WS candle (same ts replaces the in-progress bar) and refresh. False if not applied."""
+        if inst_id != self._inst_id or not row:
+            return False
+        change = self._candles.upsert(row)
+        if change.action == "drop":
+            return False
+        self.indicators.apply(self._candles, change)
+        self.gaps.check(inst_id, self._candles, change)
         self.Refresh()
+        return True
+
+    def _merge_gap(self, inst_id: str, rows: list):
+        if inst_id != self._inst_id:
+            return
+        if self.gaps.merge(rows, lambda r: self._candles.upsert(r).action != "drop"):
+            self.indicators.load(self._candles.rows)
+            self.Refresh()
 
     def _on_size(self, evt):
         self.Refresh()
@@ -79,6 +125,7 @@ class CandlesChartPanel(wx.Panel):
         if w <= 0 or h <= 0:
             return
         self._draw(dc, w, h)
+        get_latency_meter().painted("chart")
 
     def _draw(self, dc: wx.DC, w: int, h: int):
         candles = self._candles
@@ -87,17 +134,23 @@ class CandlesChartPanel(wx.Panel):
             dc.DrawText("No candle data", self.MARGIN_LEFT, self.MARGIN_TOP + 20)
             return
 
-        # Parse to floats; OKX order is [ts, o, h, l, c, vol, ...]
-        rows = []
-        for c in candles:
-            ts = c[0]
-            o, hi, lo, cl = _f(c[1]), _f(c[2]), _f(c[3]), _f(c[4])
-            vol = _f(c[5]) if len(c) > 5 else 0.0
-            rows.append((ts, o, hi, lo, cl, vol))
+        # Float columns come from the indicator engine; only the bars that fit are drawn
+        eng = self.indicators
+        chart_w = w - self.MARGIN_RIGHT - self.MARGIN_LEFT
+        n = min(len(eng), max(1, (chart_w - 2) // 3))
+        first = len(eng) - n
+        rows = list(zip(eng.ts[first:], eng.open[first:], eng.high[first:], eng.low[first:], eng.close[first:], eng.vol[first:]))
+        overlays = []
+        for name, out, rgb in self.OVERLAYS:
+            if name in eng.indicators:
+                overlays.append((eng.values(name)[out][first:], wx.Colour(*rgb)))
 
-        n = len(rows)
         price_min = min(r[3] for r in rows)
         price_max = max(r[2] for r in rows)
+        for values, _ in overlays:
+            vals = [v for v in values if v is not None]
+            if vals:
+                price_min, price_max = min(price_min, min(vals)), max(price_max, max(vals))
         if price_max <= price_min:
             price_max = price_min + 1.0
         vol_max = max(r[5] for r in rows) or 1.0
@@ -131,15 +184,15 @@ class CandlesChartPanel(wx.Panel):
         gap = 1
         x0 = chart_left + 2
 
+        # Y scale: top = price_max, bottom = price_min
+        def py(price):
+            t = (price - price_min) / (price_max - price_min)
+            return chart_top + int((1.0 - t) * candle_area_h)
+
         for i, (ts, o, hi, lo, cl, vol) in enumerate(rows):
             x = x0 + i * (bar_w + gap)
             xc = x + bar_w // 2
 
-            # Y scale: top = price_max, bottom = price_min
-            def py(price):
-                t = (price - price_min) / (price_max - price_min)
-                return chart_top + int((1.0 - t) * candle_area_h)
-
             y_hi = py(hi)
             y_lo = py(lo)
             y_o = py(o)
@@ -168,6 +221,31 @@ class CandlesChartPanel(wx.Panel):
             vy = vol_top + (vol_area_h - 4) - vh
             dc.DrawRectangle(x, vy, bar_w, max(1, vh))
 
+        # Indicator overlays (price scale)
+        for values, colour in overlays:
+            dc.SetPen(wx.Pen(colour, 1))
+            pts = []
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                pts.append(wx.Point(x0 + i * (bar_w + gap) + bar_w // 2, py(v)))
+            if len(pts) > 1:
+                dc.DrawLines(pts)
+
+        # Latest oscillator values (top)
+        labels = []
+        for name, fmt in (("rsi14", "RSI {rsi:.1f}"), ("macd", "MACD {macd:.4g} / {signal:.4g}"), ("atr14", "ATR {atr:.4g}")):
+            if name in eng.indicators:
+                last = eng.last(name)
+                if all(v is not None for v in last.values()):
+                    labels.append(fmt.format(**last))
+        gaps = self.gaps.counts
+        if gaps["gaps"]:
+            labels.append(f"gaps {gaps['gaps']}, repaired {gaps['bars']} bars")
+        if labels:
+            dc.SetTextForeground(wx.Colour(140, 142, 148))
+            dc.DrawText("   ".join(labels), chart_left, 4)
+
         # Time labels (bottom, sample)
         dc.SetTextForeground(wx.Colour(140, 142, 148))
         step = max(1, n // 6)
@@ -1,15 +1,82 @@
 
 """
-CandlesTblPanel: draw OHLCV candlestick chart with volume.
+CandlesTblPanel: OHLCV candle table backed by a virtual grid table over the candle buffer.
 Data format: list of [ts, open, high, low, close, vol, ...] (OKX style).
 """
 import wx
-import threading
+import wx.grid
 from datetime import datetime, timezone
 
 from okx_client import (
     get_candles,
+    get_candles_paged,
 )
+from candle_buffer import CandleBuffer
+from candle_gaps import GapRepairer
+from candle_resample import MultiTimeframe
+from candle_store import get_store
+from config import RESAMPLE_MINUTES
+from task_pool import get_task_pool
+
+class CandlesTable(wx.grid.GridTableBase):
+    """Virtual table: the grid asks only for visible cells; time strings are cached per ts."""
+
+    COLS = ["Time", "Open", "High", "Low", "Close", "Volume"]
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = source  # callable -> current CandleBuffer
+        self._rows = 0  # row count the grid was last told about
+        self._ts_text = {}
+
+    def GetNumberRows(self):
+        return len(self._source())
+
+    def GetNumberCols(self):
+        return len(self.COLS)
+
+    def GetColLabelValue(self, col):
+        return self.COLS[col]
+
+    def IsEmptyCell(self, row, col):
+        return False
+
+    def GetValue(self, row, col):
+        candles = self._source()
+        if row >= len(candles):
+            return ""
+        c = candles[row]
+        if col == 0:
+            return self._fmt_ts(c[0])
+        return str(c[col]) if len(c) > col else ""
+
+    def SetValue(self, row, col, value):
+        pass
+
+    def _fmt_ts(self, ts) -> str:
+        text = self._ts_text.get(ts)
+        if text is None:
+            try:
+                text = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+            except Exception:
+                text = str(ts)
+            if len(self._ts_text) > 8 * len(self._source()) + 1024:
+                self._ts_text.clear()
+            self._ts_text[ts] = text
+        return text
+
+    def sync_rows(self, grid: wx.grid.Grid):
+        """Tell the grid about a changed row count (cells are fetched lazily on repaint)."""
+        n, known = self.GetNumberRows(), self._rows
+        if n == known:
+            return
+        if n > known:
+            msg = wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED, n - known)
+        else:
+            msg = wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_DELETED, n, known - n)
+        self._rows = n
+        grid.ProcessTableMessage(msg)
+
 
 class CandlesPanel(wx.Panel):
     BAR_OPTIONS = ["1m", "3m", "5m", "15m", "30m", "1H", "2H", "4H", "1D"]
@@ -27,89 +94,134 @@ class CandlesPanel(wx.Panel):
         self.bar_choice.SetSelection(0)
         bar_row.Add(self.bar_choice, 0, wx.RIGHT, 8)
         self.refresh_btn = wx.Button(self, label="Refresh")
-        bar_row.Add(self.refresh_btn, 0)
+        bar_row.Add(self.refresh_btn, 0, wx.RIGHT, 8)
+        self.gap_label = wx.StaticText(self, label="")
+        bar_row.Add(self.gap_label, 0, wx.ALIGN_CENTER_VERTICAL)
         layout.Add(bar_row, 0, wx.ALL, 4)
+        self._inst_id = None
+        # All bars are aggregated locally from one 1m stream; REST per bar only seeds older history
+        self._mtf = MultiTimeframe(self.BAR_OPTIONS)
+        self._seeded = set()
+        # missing 1m bars are refetched and merged into the 1m stream, which rebuilds every bar above it
+        self.gaps = GapRepairer("1m", lambda inst_id, rows: wx.CallAfter(self._merge_gap, inst_id, rows))
         self.grid = wx.grid.Grid(self)
-        self.grid.CreateGrid(0, 6)
-        self.grid.SetColLabelValue(0, "Time")
-        self.grid.SetColLabelValue(1, "Open")
-        self.grid.SetColLabelValue(2, "High")
-        self.grid.SetColLabelValue(3, "Low")
-        self.grid.SetColLabelValue(4, "Close")
-        self.grid.SetColLabelValue(5, "Volume")
+        self._table = CandlesTable(lambda: self._candles)
+        self.grid.SetTable(self._table, True)
         self.grid.EnableEditing(False)
         layout.Add(self.grid, 1, wx.EXPAND)
         self.SetSizer(layout)
-        self._inst_id = None
-        self._candles = []
-        self.bar_choice.Bind(wx.EVT_CHOICE, lambda e: self._load())
+        self.bar_choice.Bind(wx.EVT_CHOICE, lambda e: self._on_bar())
         self.refresh_btn.Bind(wx.EVT_BUTTON, lambda e: self._load())
 
+    @property
+    def _bar(self) -> str:
+        return self.BAR_OPTIONS[self.bar_choice.GetSelection()]
+
+    @property
+    def _candles(self) -> CandleBuffer:
+        return self._mtf.buffer(self._bar)
+
     def set_pair(self, inst_id: str):
         self._inst_id = inst_id
         self.pair_label.SetLabel(inst_id or "—")
+        store = get_store()
+        self._mtf.minutes.on_commit = store.committer(inst_id, "1m") if store and inst_id else None
+        self._mtf.clear()
+        self.gaps.reset()
+        self._set_candles()
         self._load()
 
     def _load(self):
         if not self._inst_id:
             return
-        bar = self.BAR_OPTIONS[self.bar_choice.GetSelection()]
         inst_id = self._inst_id
 
-        def work():
+        def work(task):
+            set_minutes = task.guard(self._set_minutes)
             try:
-                data = get_candles(inst_id, bar=bar, limit="100")
-                wx.CallAfter(self._set_candles, data)
+                store = get_store()
+                if store:
+                    data = store.sync(
+                        inst_id, "1m", RESAMPLE_MINUTES,
+                        on_cached=lambda rows: wx.CallAfter(set_minutes, inst_id, rows),
+                    )
+                else:
+                    data = get_candles_paged(inst_id, bar="1m", count=RESAMPLE_MINUTES)
+                wx.CallAfter(set_minutes, inst_id, data)
             except Exception as e:
-                wx.CallAfter(self._show_error, str(e))
+                wx.CallAfter(task.guard(self._show_error), str(e))
 
-        threading.Thread(target=work, daemon=True).start()
+        get_task_pool().submit(work, key=("candles", id(self)))
 
-    def _set_candles(self, data: list):
-        # OKX returns [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]
-        self._candles = data
-        if self._on_candles_set:
-            self._on_candles_set(data)
-        n = self.grid.GetNumberRows()
-        if n > 0:
-            self.grid.DeleteRows(0, n)
-        for row, c in enumerate(reversed(data)):
-            self.grid.AppendRows(1)
-            ts = c[0] if isinstance(c[0], str) else str(c[0])
+    def _set_minutes(self, inst_id: str, data: list):
+        if inst_id != self._inst_id:
+            return
+        self._mtf.set_minutes(data)
+        self.gaps.check(inst_id, self._mtf.minutes)
+        self._seeded.clear()
+        self._set_candles()
+        self._seed(self._bar)
+
+    def _on_bar(self):
+        self._set_candles()
+        self._seed(self._bar)
+
+    def _seed(self, bar: str):
+        """Fetch older history for a higher bar once per load; local bars take precedence."""
+        if bar == "1m" or bar in self._seeded or not self._inst_id:
+            return
+        self._seeded.add(bar)
+        inst_id = self._inst_id
+
+        def work(task):
             try:
-                dt = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+                data = get_candles(inst_id, bar=bar, limit="100")
+                wx.CallAfter(self._apply_seed, inst_id, bar, data)
             except Exception:
-                dt = ts
-            self.grid.SetCellValue(row, 0, dt)
-            self.grid.SetCellValue(row, 1, str(c[1]))
-            self.grid.SetCellValue(row, 2, str(c[2]))
-            self.grid.SetCellValue(row, 3, str(c[3]))
-            self.grid.SetCellValue(row, 4, str(c[4]))
-            self.grid.SetCellValue(row, 5, str(c[5]) if len(c) > 5 else "")
+                pass
 
+        get_task_pool().submit(work, key=("seed", id(self), bar))
 
+    def _apply_seed(self, inst_id: str, bar: str, data: list):
+        if inst_id != self._inst_id:
+            return
+        self._mtf.seed(bar, data)
+        if bar == self._bar:
+            self._set_candles()
 
+    def _set_candles(self):
+        if self._on_candles_set:
+            self._on_candles_set(self._candles.rows)
+        self._table.sync_rows(self.grid)
+        self.grid.ForceRefresh()
 
     def append_candle(self, inst_id: str, arr: list):
         if inst_id != self._inst_id or not arr:
             return
-        # [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]
-        self._candles.append(arr)
-        self.grid.AppendRows(1)
-        row = self.grid.GetNumberRows() - 1
-        ts = arr[0] if isinstance(arr[0], str) else str(arr[0])
-        try:
-            dt = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
-        except Exception:
-            dt = ts
-        self.grid.SetCellValue(row, 0, dt)
-        self.grid.SetCellValue(row, 1, str(arr[1]))
-        self.grid.SetCellValue(row, 2, str(arr[2]))
-        self.grid.SetCellValue(row, 3, str(arr[3]))
-        self.grid.SetCellValue(row, 4, str(arr[4]))
-        self.grid.SetCellValue(row, 5, str(arr[5]) if len(arr) > 5 else "")
+        # 1m [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]; same ts updates the live bar
+        out = self._mtf.update(arr)
+        if out:
+            self.gaps.check(inst_id, self._mtf.minutes, out["1m"][0])
+        changes = [c for c in out.get(self._bar, []) if c.action != "drop"]
+        if not changes:
+            return
+        self._table.sync_rows(self.grid)
+        if any(c.evicted or c.action == "insert" for c in changes):
+            # rows shifted: repaint whatever is visible
+            self.grid.ForceRefresh()
+        else:
+            for c in changes:
+                self.grid.RefreshBlock(c.index, 0, c.index, len(CandlesTable.COLS) - 1)
         if self._on_candles_set:
-            self._on_candles_set(self._candles)
+            self._on_candles_set(self._candles.rows)
+
+    def _merge_gap(self, inst_id: str, rows: list):
+        if inst_id != self._inst_id:
+            return
+        if self.gaps.merge(rows, lambda r: bool(self._mtf.update(r))):
+            self._set_candles()
+        c = self.gaps.counts
+        self.gap_label.SetLabel(f"Gaps: {c['gaps']}, repaired {c['bars']} bars")
 
     def _show_error(self, msg: str):
         wx.MessageBox(msg, "Error", wx.OK | wx.ICON_ERROR)            
\ No newline at end of file
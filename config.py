@@ -1,10 +1,12 @@
 """OKX API configuration. Set credentials in .env or edit defaults (demo trading)."""
 import os
 
-# OKX API v5
-REST_BASE = "https://www.okx.com"
+# OKX API v5 (OKX_REST_BASE / OKX_WS_PUBLIC / OKX_WS_PRIVATE override, e.g. to use mock_okx.py)
+REST_BASE = os.environ.get("OKX_REST_BASE", "https://www.okx.com")
 WS_PUBLIC = "wss://ws.okx.com:8443/ws/v5/public"
 WS_PRIVATE = "wss://ws.okx.com:8443/ws/v5/private"
+WS_PUBLIC_OVERRIDE = os.environ.get("OKX_WS_PUBLIC", "")
+WS_PRIVATE_OVERRIDE = os.environ.get("OKX_WS_PRIVATE", "")
 
 # Demo trading (same host; use x-simulated-trading: 1 header for REST)
 # WS demo: wss://wspap.okx.com:8443/ws/v5/public and .../private
@@ -18,7 +20,54 @@ SECRET_KEY = os.environ.get("OKX_SECRET_KEY", "")
 PASSPHRASE = os.environ.get("OKX_PASSPHRASE", "")
 
 def get_ws_public_url():
+    if WS_PUBLIC_OVERRIDE:
+        return WS_PUBLIC_OVERRIDE
     return WS_PUBLIC_DEMO if USE_DEMO else WS_PUBLIC
 
 def get_ws_private_url():
+    if WS_PRIVATE_OVERRIDE:
+        return WS_PRIVATE_OVERRIDE
     return WS_PRIVATE_DEMO if USE_DEMO else WS_PRIVATE
+
+# Candles kept in memory per chart/table (oldest bars are evicted past this)
+CANDLE_CAPACITY = int(os.environ.get("OKX_CANDLE_CAPACITY", "1000"))
+
+# 1m history kept for local 3m..1D aggregation (OKX serves ~1440 recent 1m bars via /market/candles)
+RESAMPLE_MINUTES = int(os.environ.get("OKX_RESAMPLE_MINUTES", "1440"))
+
+# On-disk candle cache (SQLite). Set OKX_CANDLE_DB="" to disable.
+CANDLE_DB_PATH = os.environ.get("OKX_CANDLE_DB", os.path.join(os.path.expanduser("~"), ".okx_desktop", "candles.db"))
+CANDLE_DB_MAX_ROWS = int(os.environ.get("OKX_CANDLE_DB_MAX_ROWS", "100000"))  # per (instId, bar)
+CANDLE_DB_MAX_MB = int(os.environ.get("OKX_CANDLE_DB_MAX_MB", "200"))
+
+# Instrument metadata cache (tickSz, lotSz, minSz, state...), refreshed in the background when older than the TTL
+INSTRUMENT_CACHE_DIR = os.environ.get("OKX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".okx_desktop"))
+INSTRUMENT_TTL = int(os.environ.get("OKX_INSTRUMENT_TTL", str(6 * 3600)))  # seconds
+
+# Raw WS frame recording (md_record.py): set OKX_RECORD_DIR to record; segments roll over by size/age
+RECORD_DIR = os.environ.get("OKX_RECORD_DIR", "")
+RECORD_SEGMENT_MB = float(os.environ.get("OKX_RECORD_SEGMENT_MB", "64"))  # uncompressed
+RECORD_SEGMENT_MIN = float(os.environ.get("OKX_RECORD_SEGMENT_MIN", "60"))
+# Replay a recording through the WS callbacks instead of connecting (speed: 1, 10, ... or "max")
+REPLAY_PATH = os.environ.get("OKX_REPLAY", "")
+REPLAY_SPEED = os.environ.get("OKX_REPLAY_SPEED", "1")
+
+# GUI diagnostics (ui_watchdog.py): main-loop stalls longer than OKX_STALL_MS are logged with the GUI
+# thread's stack (0 disables); stall logs and profiler output (folded stacks) go to OKX_DIAG_DIR
+STALL_MS = int(os.environ.get("OKX_STALL_MS", "500"))
+DIAG_DIR = os.environ.get("OKX_DIAG_DIR", INSTRUMENT_CACHE_DIR)
+
+# Public WS ingest: "thread" (in the GUI process) or "process" (md_shm.py: a child process decodes and
+# writes tickers/candles into a shared-memory ring of OKX_INGEST_RING records that the GUI polls)
+WS_INGEST = os.environ.get("OKX_WS_INGEST", "thread").strip().lower()
+INGEST_RING_RECORDS = int(os.environ.get("OKX_INGEST_RING", "65536"))
+
+# Background REST work (task_pool.py): worker threads shared by all panels, and the queue bound
+TASK_WORKERS = int(os.environ.get("OKX_TASK_WORKERS", "4"))
+TASK_QUEUE = int(os.environ.get("OKX_TASK_QUEUE", "256"))
+
+# Market data staleness (md_latency.py): a panel whose newest painted data is older than this is
+# flagged STALE in the status bar / terminal footer
+STALE_MS = int(os.environ.get("OKX_STALE_MS", "3000"))
+# OKX_LATENCY=0 turns the per-push latency stamps off (no histograms, no staleness readout)
+LATENCY = os.environ.get("OKX_LATENCY", "1") != "0"
@@ -0,0 +1,337 @@
+"""
+Streaming technical indicators over OKX candles: SMA, EMA, RSI, MACD, Bollinger Bands, ATR, session VWAP.
+Each indicator is a step function over small scalar state, so a new or changed (live) bar costs O(1).
+Headless use:
+    eng = IndicatorEngine()
+    eng.load(rows)          # batch, oldest first
+    eng.update(ws_row)      # same ts replaces the live bar, newer ts appends
+    eng.last("rsi14")       # {"rsi": 61.2}
+"""
+import math
+
+from candle_buffer import CandleBuffer, CandleChange, candle_ts
+from config import CANDLE_CAPACITY
+
+
+def _f(s, default=0.0):
+    try:
+        return float(s)
+    except (TypeError, ValueError):
+        return default
+
+
+def _ema(state: tuple, x: float, n: int) -> tuple[tuple, float | None]:
+    """EMA seeded with the SMA of the first n values. state: (ema, warmup_sum, count)."""
+    ema, s, k = state
+    k += 1
+    if k < n:
+        return (None, s + x, k), None
+    if k == n:
+        ema = (s + x) / n
+    else:
+        ema += 2.0 / (n + 1) * (x - ema)
+    return (ema, 0.0, k), ema
+
+
+class Indicator:
+    """step(eng, i, state) -> (state, values) must not mutate state: the live bar is recomputed from it."""
+
+    outputs: tuple[str, ...] = ()
+    window = 1
+
+    def init(self) -> tuple:
+        return ()
+
+    def step(self, eng: "IndicatorEngine", i: int, state: tuple) -> tuple[tuple, tuple]:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    outputs = ("sma",)
+
+    def __init__(self, n: int = 20):
+        self.n = self.window = n
+
+    def init(self):
+        return (0.0, 0)
+
+    def step(self, eng, i, state):
+        s, k = state
+        c = eng.close
+        s += c[i]
+        if k >= self.n:
+            s -= c[i - self.n]
+        k += 1
+        return (s, k), (s / self.n if k >= self.n else None,)
+
+
+class EMA(Indicator):
+    outputs = ("ema",)
+
+    def __init__(self, n: int = 50):
+        self.n = n
+
+    def init(self):
+        return (None, 0.0, 0)
+
+    def step(self, eng, i, state):
+        state, v = _ema(state, eng.close[i], self.n)
+        return state, (v,)
+
+
+class RSI(Indicator):
+    """Wilder's RSI."""
+
+    outputs = ("rsi",)
+
+    def __init__(self, n: int = 14):
+        self.n = n
+
+    def init(self):
+        return (None, 0.0, 0.0, 0)
+
+    def step(self, eng, i, state):
+        prev, ag, al, k = state
+        c = eng.close[i]
+        if prev is None:
+            return (c, ag, al, k), (None,)
+        d = c - prev
+        g, l = (d, 0.0) if d > 0 else (0.0, -d)
+        n = self.n
+        k += 1
+        if k < n:
+            ag, al = ag + g, al + l
+        elif k == n:
+            ag, al = (ag + g) / n, (al + l) / n
+        else:
+            ag, al = (ag * (n - 1) + g) / n, (al * (n - 1) + l) / n
+        if k < n:
+            v = None
+        elif al == 0:
+            v = 100.0 if ag > 0 else 50.0
+        else:
+            v = 100.0 - 100.0 / (1.0 + ag / al)
+        return (c, ag, al, k), (v,)
+
+
+class MACD(Indicator):
+    outputs = ("macd", "signal", "hist")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+
+    def init(self):
+        e = (None, 0.0, 0)
+        return (e, e, e)
+
+    def step(self, eng, i, state):
+        fs, ss, sg = state
+        c = eng.close[i]
+        fs, f = _ema(fs, c, self.fast)
+        ss, s = _ema(ss, c, self.slow)
+        if f is None or s is None:
+            return (fs, ss, sg), (None, None, None)
+        m = f - s
+        sg, sig = _ema(sg, m, self.signal)
+        return (fs, ss, sg), (m, sig, m - sig if sig is not None else None)
+
+
+class Bollinger(Indicator):
+    outputs = ("mid", "upper", "lower")
+
+    def __init__(self, n: int = 20, k: float = 2.0):
+        self.n = self.window = n
+        self.k = k
+
+    def init(self):
+        return (0.0, 0.0, 0)
+
+    def step(self, eng, i, state):
+        s, sq, cnt = state
+        c = eng.close
+        x = c[i]
+        s, sq = s + x, sq + x * x
+        if cnt >= self.n:
+            old = c[i - self.n]
+            s, sq = s - old, sq - old * old
+        cnt += 1
+        if cnt < self.n:
+            return (s, sq, cnt), (None, None, None)
+        mid = s / self.n
+        sd = math.sqrt(max(0.0, sq / self.n - mid * mid))
+        return (s, sq, cnt), (mid, mid + self.k * sd, mid - self.k * sd)
+
+
+class ATR(Indicator):
+    """Wilder's average true range."""
+
+    outputs = ("atr",)
+
+    def __init__(self, n: int = 14):
+        self.n = n
+
+    def init(self):
+        return (None, 0.0, 0)
+
+    def step(self, eng, i, state):
+        prev, atr, k = state
+        h, l, c = eng.high[i], eng.low[i], eng.close[i]
+        tr = h - l if prev is None else max(h - l, abs(h - prev), abs(l - prev))
+        n = self.n
+        k += 1
+        if k < n:
+            return (c, atr + tr, k), (None,)
+        atr = (atr + tr) / n if k == n else (atr * (n - 1) + tr) / n
+        return (c, atr, k), (atr,)
+
+
+class VWAP(Indicator):
+    """Volume-weighted typical price, reset at each session (default: UTC day)."""
+
+    outputs = ("vwap",)
+
+    def __init__(self, session_ms: int = 86_400_000, offset_ms: int = 0):
+        self.session_ms, self.offset_ms = session_ms, offset_ms
+
+    def init(self):
+        return (None, 0.0, 0.0)
+
+    def step(self, eng, i, state):
+        session, pv, v = state
+        cur = (eng.ts[i] + self.offset_ms) // self.session_ms
+        if cur != session:
+            session, pv, v = cur, 0.0, 0.0
+        vol = eng.vol[i]
+        pv += (eng.high[i] + eng.low[i] + eng.close[i]) / 3.0 * vol
+        v += vol
+        return (session, pv, v), (pv / v if v else None,)
+
+
+def default_indicators() -> dict[str, Indicator]:
+    return {
+        "sma20": SMA(20),
+        "ema50": EMA(50),
+        "bb20": Bollinger(20, 2.0),
+        "vwap": VWAP(),
+        "rsi14": RSI(14),
+        "macd": MACD(12, 26, 9),
+        "atr14": ATR(14),
+    }
+
+
+class IndicatorEngine:
+    """
+    Float OHLCV columns plus one output column per indicator value, aligned with a CandleBuffer.
+    For the last bar it keeps the state before and after it, so live pushes recompute one step.
+    """
+
+    def __init__(self, indicators: dict[str, Indicator] | None = None, capacity: int = CANDLE_CAPACITY):
+        self.indicators = indicators if indicators is not None else default_indicators()
+        self.capacity = max(capacity, 2 * max((ind.window for ind in self.indicators.values()), default=1))
+        self._reset()
+
+    def _reset(self):
+        self.ts: list[int] = []
+        self.open: list[float] = []
+        self.high: list[float] = []
+        self.low: list[float] = []
+        self.close: list[float] = []
+        self.vol: list[float] = []
+        self._out = {name: tuple([] for _ in ind.outputs) for name, ind in self.indicators.items()}
+        self._prev = {name: ind.init() for name, ind in self.indicators.items()}
+        self._state = dict(self._prev)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def values(self, name: str) -> dict[str, list]:
+        """Output columns of one indicator, aligned with the candles (None during warm-up)."""
+        ind = self.indicators[name]
+        return dict(zip(ind.outputs, self._out[name]))
+
+    def last(self, name: str) -> dict:
+        ind = self.indicators[name]
+        return {o: (col[-1] if col else None) for o, col in zip(ind.outputs, self._out[name])}
+
+    def load(self, rows: list[list]):
+        """Batch mode: parse columns in one pass, then run each indicator over them in a tight loop."""
+        self._reset()
+        rows = list(rows or [])
+        self.ts = [candle_ts(r) for r in rows]
+        self.open = [_f(r[1]) for r in rows]
+        self.high = [_f(r[2]) for r in rows]
+        self.low = [_f(r[3]) for r in rows]
+        self.close = [_f(r[4]) for r in rows]
+        self.vol = [_f(r[5]) if len(r) > 5 else 0.0 for r in rows]
+        n = len(rows)
+        for name, ind in self.indicators.items():
+            cols = self._out[name]
+            state = prev = ind.init()
+            step = ind.step
+            for i in range(n):
+                prev = state
+                state, vals = step(self, i, state)
+                for col, v in zip(cols, vals):
+                    col.append(v)
+            self._prev[name], self._state[name] = prev, state
+        self._trim()
+
+    def update(self, row: list) -> bool:
+        """Apply the newest bar. False if row is older than the last bar (caller should load())."""
+        ts = candle_ts(row)
+        if self.ts and ts < self.ts[-1]:
+            return False
+        vals = (_f(row[1]), _f(row[2]), _f(row[3]), _f(row[4]), _f(row[5]) if len(row) > 5 else 0.0)
+        cols = (self.open, self.high, self.low, self.close, self.vol)
+        append = not self.ts or ts > self.ts[-1]
+        if append:
+            self.ts.append(ts)
+            for col, v in zip(cols, vals):
+                col.append(v)
+        else:
+            for col, v in zip(cols, vals):
+                col[-1] = v
+        i = len(self.ts) - 1
+        for name, ind in self.indicators.items():
+            if append:
+                self._prev[name] = self._state[name]
+            state, out = ind.step(self, i, self._prev[name])
+            self._state[name] = state
+            for col, v in zip(self._out[name], out):
+                if append:
+                    col.append(v)
+                else:
+                    col[-1] = v
+        if append:
+            self._trim()
+        return True
+
+    def apply(self, buffer: CandleBuffer, change: CandleChange):
+        """Follow a CandleBuffer.upsert(); anything but a change to the newest bar reloads."""
+        if change.action == "drop":
+            return
+        if (
+            change.action in ("append", "update")
+            and change.index == len(buffer) - 1
+            and self.update(buffer[change.index])
+            and len(self) == len(buffer)
+        ):
+            return
+        self.load(buffer.rows)
+
+    def _trim(self):
+        n = len(self.ts) - self.capacity
+        if n <= 0:
+            return
+        for col in (self.ts, self.open, self.high, self.low, self.close, self.vol):
+            del col[:n]
+        for cols in self._out.values():
+            for col in cols:
+                del col[:n]
+
+
+def compute(rows: list[list], indicators: dict[str, Indicator] | None = None) -> dict[str, dict[str, list]]:
+    """One-shot batch computation: {name: {output: column}}."""
+    eng = IndicatorEngine(indicators, capacity=max(len(rows), 1))
+    eng.load(rows)
+    return {name: eng.values(name) for name in eng.indicators}
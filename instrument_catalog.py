@@ -0,0 +1,166 @@
+"""
+InstrumentCatalog: OKX instrument metadata (tickSz, lotSz, minSz, max sizes, state) per instType.
+Startup reads the JSON cache immediately; get_instruments refreshes it in the background when the
+cache is older than INSTRUMENT_TTL. A content hash plays the role of an ETag: listeners are only
+notified when the instrument list actually changed.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+from config import INSTRUMENT_CACHE_DIR, INSTRUMENT_TTL
+from okx_client import get_instruments
+
+
+def _digest(data: list[dict]) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class InstrumentCatalog:
+    def __init__(
+        self,
+        inst_types: tuple[str, ...] = ("SPOT",),
+        cache_dir: str = INSTRUMENT_CACHE_DIR,
+        ttl: int = INSTRUMENT_TTL,
+    ):
+        self.inst_types = inst_types
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[["InstrumentCatalog"], None]] = []
+        self._raw: dict[str, list[dict]] = {}  # instType -> instruments
+        self._etag: dict[str, str] = {}
+        self._fetched_at: dict[str, float] = {}
+        self._by_id: dict[str, dict] = {}
+        self._by_base: dict[str, list[dict]] = {}
+        self._by_quote: dict[str, list[dict]] = {}
+        self._started = False
+
+    # --- Lookup (safe from any thread: indexes are replaced, never mutated) ---
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, inst_id: str) -> bool:
+        return inst_id in self._by_id
+
+    def get(self, inst_id: str) -> dict | None:
+        return self._by_id.get(inst_id)
+
+    def by_base(self, ccy: str) -> list[dict]:
+        return self._by_base.get(ccy.upper(), [])
+
+    def by_quote(self, ccy: str) -> list[dict]:
+        return self._by_quote.get(ccy.upper(), [])
+
+    def live_ids(self, quote: str | None = None) -> set[str]:
+        src = self.by_quote(quote) if quote else self._by_id.values()
+        return {d["instId"] for d in src if d.get("state") == "live"}
+
+    # --- Lifecycle ---
+
+    def subscribe(self, callback: Callable[["InstrumentCatalog"], None]):
+        """callback(catalog) runs on the refresh thread whenever instruments change."""
+        self._listeners.append(callback)
+
+    def start(self):
+        """Load the disk cache now, then refresh stale instTypes in the background. Idempotent."""
+        if self._started:
+            return
+        self._started = True
+        for inst_type in self.inst_types:
+            self._read_cache(inst_type)
+        self._reindex()
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def refresh(self, inst_type: str, force: bool = False) -> bool:
+        """Blocking: fetch instType if stale (or forced). True if the data changed."""
+        if not force and time.time() - self._fetched_at.get(inst_type, 0) < self.ttl:
+            return False
+        data = get_instruments(inst_type)
+        etag = _digest(data)
+        with self._lock:
+            changed = etag != self._etag.get(inst_type)
+            self._raw[inst_type] = data
+            self._etag[inst_type] = etag
+            self._fetched_at[inst_type] = time.time()
+        self._write_cache(inst_type)
+        if changed:
+            self._reindex()
+            for cb in list(self._listeners):
+                try:
+                    cb(self)
+                except Exception:
+                    pass
+        return changed
+
+    def _refresh_loop(self):
+        while True:
+            for inst_type in self.inst_types:
+                try:
+                    self.refresh(inst_type)
+                except Exception:
+                    pass  # keep serving the cache; retry next round
+            time.sleep(max(60, min(self.ttl, 3600)))
+
+    # --- Cache + indexes ---
+
+    def _cache_path(self, inst_type: str) -> str:
+        return os.path.join(self.cache_dir, f"instruments_{inst_type}.json")
+
+    def _read_cache(self, inst_type: str):
+        try:
+            with open(self._cache_path(inst_type), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            with self._lock:
+                self._raw[inst_type] = cached.get("data", [])
+                self._etag[inst_type] = cached.get("etag", "")
+                self._fetched_at[inst_type] = float(cached.get("fetched_at", 0))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _write_cache(self, inst_type: str):
+        with self._lock:
+            payload = {
+                "etag": self._etag.get(inst_type, ""),
+                "fetched_at": self._fetched_at.get(inst_type, 0),
+                "data": self._raw.get(inst_type, []),
+            }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path(inst_type)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _reindex(self):
+        with self._lock:
+            raw = [d for data in self._raw.values() for d in data]
+        by_id, by_base, by_quote = {}, {}, {}
+        for d in raw:
+            inst_id = d.get("instId")
+            if not inst_id:
+                continue
+            by_id[inst_id] = d
+            by_base.setdefault((d.get("baseCcy") or "").upper(), []).append(d)
+            by_quote.setdefault((d.get("quoteCcy") or "").upper(), []).append(d)
+        self._by_id, self._by_base, self._by_quote = by_id, by_base, by_quote
+
+
+_catalog: InstrumentCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> InstrumentCatalog:
+    """Shared catalog for all panels; call .start() once at startup."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = InstrumentCatalog()
+        return _catalog
@@ -0,0 +1,102 @@
+"""
+InstrumentIndex: substring/prefix search over instIds (e.g. BTC-USDT).
+Results are ranked: exact base currency, base prefix, quote prefix, then any other substring. The
+postings are kept already split by rank, so a query is a few dict lookups and list concatenations
+rather than a ranking pass over every hit:
+  exact[b]  base == b
+  base[p]   base starts with p (p shorter than the base)
+  quote[p]  quote starts with p, base does not
+  rest[g]   contains the 1-3 character gram g, neither base nor quote starts with it
+Longer queries take exact/base/quote directly and verify the rest among the few instIds where their
+first trigram occurs other than at the start of the base or the quote (mid[t]), or where the query
+runs from the start of the base or the quote past its end (BTC-U: exact[BTC]; USD-S: cross[USD-S]).
+"""
+
+
+def _split(inst_id: str) -> tuple[str, str]:
+    parts = inst_id.split("-")
+    return parts[0], (parts[1] if len(parts) > 1 else "")
+
+
+class InstrumentIndex:
+    MAX_GRAM = 3
+
+    def __init__(self, inst_ids=()):
+        self.build(inst_ids)
+
+    def build(self, inst_ids):
+        """Index inst_ids; ties in ranking keep this order."""
+        self._ids: list[str] = []
+        self._upper: list[str] = []
+        self._base: list[str] = []
+        self._quote: list[str] = []
+        self._exact: dict[str, list[str]] = {}
+        self._base_pre: dict[str, list[str]] = {}
+        self._quote_pre: dict[str, list[str]] = {}
+        self._rest: dict[str, list[str]] = {}
+        self._mid: dict[str, list[int]] = {}  # trigram -> positions where it occurs off the base/quote start
+        self._cross: dict[str, list[int]] = {}  # quote and on (BTC-USD-SWAP: USD-, USD-S, ...) -> positions
+        self._seen: dict[str, int] = {}
+        for inst_id in inst_ids:
+            self.add(inst_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, inst_id: str) -> bool:
+        return inst_id in self._seen
+
+    def add(self, inst_id: str):
+        if inst_id in self._seen:
+            return
+        pos = len(self._ids)
+        key = inst_id.upper()
+        if key == inst_id:
+            key = inst_id  # the usual case: share the string
+        base, quote = _split(key)
+        self._seen[inst_id] = pos
+        self._ids.append(inst_id)
+        self._upper.append(key)
+        self._base.append(base)
+        self._quote.append(quote)
+        self._exact.setdefault(base, []).append(inst_id)
+        for n in range(1, len(base)):
+            self._base_pre.setdefault(base[:n], []).append(inst_id)
+        for n in range(1, len(quote) + 1):
+            if not base.startswith(quote[:n]):
+                self._quote_pre.setdefault(quote[:n], []).append(inst_id)
+        starts = (0, len(base) + 1) if quote else (0,)
+        if quote:
+            for end in range(starts[1] + max(len(quote) + 1, self.MAX_GRAM + 1), len(key) + 1):
+                self._cross.setdefault(key[starts[1]:end], []).append(pos)
+        grams, mid = set(), set()
+        for n in range(1, self.MAX_GRAM + 1):
+            for i in range(len(key) - n + 1):
+                g = key[i:i + n]
+                grams.add(g)
+                if n == self.MAX_GRAM and i not in starts:
+                    mid.add(g)
+        for g in grams:
+            if not base.startswith(g) and not quote.startswith(g):
+                self._rest.setdefault(g, []).append(inst_id)
+        for g in mid:
+            self._mid.setdefault(g, []).append(pos)
+
+    def search(self, query: str) -> list[str]:
+        q = query.strip().upper()
+        if not q:
+            return list(self._ids)
+        out = self._exact.get(q, []) + self._base_pre.get(q, []) + self._quote_pre.get(q, [])
+        if len(q) <= self.MAX_GRAM:
+            return out + self._rest.get(q, [])
+        upper, base, quote = self._upper, self._base, self._quote
+        cand = self._mid.get(q[:self.MAX_GRAM], [])
+        cross = self._cross.get(q, [])
+        if "-" in q:
+            seen = self._seen
+            cross = cross + [seen[i] for i in self._exact.get(q.split("-", 1)[0], ())]
+        if cross:
+            cand = sorted(set(cand).union(cross))
+        ids = self._ids
+        out += [ids[i] for i in cand if q in upper[i] and not base[i].startswith(q) and not quote[i].startswith(q)]
+        return out
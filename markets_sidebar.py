@@ -3,7 +3,7 @@
 """
 markets
 """
-import threading
+import math
 from datetime import datetime, timezone
 import wx
 import wx.grid
@@ -15,6 +15,12 @@ from okx_client import (
     get_tickers,
 )
 from okx_ws import OKXWebSocket
+from instrument_search import InstrumentIndex
+from sorted_view import SortedView
+from instrument_catalog import get_catalog
+from ticker_store import TickerStore, get_ticker_store
+from task_pool import get_task_pool
+from md_latency import get_latency_meter
 
 class AutoWidthListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
     def __init__(self, parent, *args, **kwargs):
@@ -22,84 +28,204 @@ class AutoWidthListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
         ListCtrlAutoWidthMixin.__init__(self)
 
 
+class VirtualListCtrl(AutoWidthListCtrl):
+    """LC_VIRTUAL list: rows are produced on demand by get_text(row, col) for visible items only."""
+
+    def __init__(self, parent, get_text, style=0):
+        super().__init__(parent, style=style | wx.LC_VIRTUAL)
+        self._get_text = get_text
+
+    def OnGetItemText(self, item, col):
+        return self._get_text(item, col)
+
+
 class MarketsPanel(wx.Panel):
-    def __init__(self, parent, on_select: callable):
+    FILTER_DELAY_MS = 120  # debounce for search typing
+
+    BULK_REFRESH = 64  # above this many dirty rows, repaint the visible list once
+
+    def __init__(self, parent, on_select: callable, store: TickerStore | None = None):
         super().__init__(parent)
         self.on_select = on_select
         layout = wx.BoxSizer(wx.VERTICAL)
         self.search = wx.SearchCtrl(self, style=wx.TE_PROCESS_ENTER)
         self.search.SetDescriptiveText("Filter pair...")
         layout.Add(self.search, 0, wx.EXPAND | wx.ALL, 2)
-        self.list = AutoWidthListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.list = VirtualListCtrl(self, self._item_text, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
         self.list.AppendColumn("Pair", width=120)
         self.list.AppendColumn("Price", width=150)
         self.list.AppendColumn("Change %", width=80)
         self.list.AppendColumn("Open 24h", width=120)
         self.list.AppendColumn("High 24h", width=120)
         self.list.AppendColumn("Low 24h", width=120)
+        self.list.AppendColumn("Range 24h %", width=90)
         self.list.AppendColumn("Volume 24h", width=120)
         self.list.AppendColumn("Time", width=120)
         layout.Add(self.list, 1, wx.EXPAND)
         self.SetSizer(layout)
         self.list.Bind(wx.EVT_LIST_ITEM_SELECTED, self._on_sel)
+        self.list.Bind(wx.EVT_LIST_COL_CLICK, self._on_col_click)
         self.search.Bind(wx.EVT_TEXT, self._on_filter)
-        self._instruments = []
-        self._filtered = []
+        self.search.Bind(wx.EVT_TEXT_ENTER, lambda e: self._apply_filter())
+        self._filter_timer = wx.CallLater(self.FILTER_DELAY_MS, self._apply_filter)
+        self._filter_timer.Stop()
+        self._store = store or get_ticker_store()
+        self._seen = 0  # store version already applied
+        self._known = 0  # store rows already classified (rows are only appended)
+        self._universe = set()  # instIds shown in this panel
+        self._texts = {}  # instId -> row strings, rebuilt only when the ticker changes
+        self._meter = get_latency_meter()
+        self._filtered = []  # instIds shown, in list order
+        self._rows = {}  # instId -> row in _filtered
+        self._index = InstrumentIndex()
+        self._sort_col = None
+        self._sort_desc = False
+        self._view: SortedView | None = None  # sorted order of _filtered while a column is sorted
+        self._live_ids = None  # live SPOT USDT instIds from the instrument catalog, once loaded
+        self._store.subscribe(self._on_store_change)
+        get_catalog().subscribe(lambda c: wx.CallAfter(self._on_catalog))
 
     def load(self):
-        def work():
+        def work(task):
             try:
-                # data = get_instruments("SPOT")
-                data = data = get_tickers("SPOT")
-                wx.CallAfter(self._set_instruments, data)
+                data = get_tickers("SPOT")
+                wx.CallAfter(self._store.load, data)
             except Exception as e:
                 wx.CallAfter(self._show_error, str(e))
 
-        threading.Thread(target=work, daemon=True).start()
-
-    def _set_instruments(self, data: list):
-        # self._instruments = [d for d in data if d.get("state") == "live" and d.get("quoteCcy") == "USDT"]
-        # self._filtered = self._instruments.copy()
-        self._tickers = [d for d in data if (d.get("instId") or "").endswith("-USDT")]
-        self._filtered = self._tickers.copy()
-        # sort by last
-        self._filtered.sort(key=lambda x: x.get("instId", ""), reverse=False)
-        self._refresh_list()
-
-    def _refresh_list(self):
-        self.list.DeleteAllItems()
-        for d in self._filtered: #[:150]:
-            last = last = d.get("last", "") or d.get("lastPx", "")
-            open_px = d.get("open24h", "") or d.get("sodUtc0", "")
-            high = str(d.get("high24h", "") or d.get("highPx", ""))
-            low = str(d.get("low24h", "") or d.get("lowPx", ""))
-            vol = str(d.get("vol24h", "") or d.get("volCcy24h", ""))
-            s1 = str(d.get("ts", "")) #[:19] if d.get("ts") else ""
+        get_task_pool().submit(work, key=("markets", id(self)))
+
+    def _on_catalog(self):
+        catalog = get_catalog()
+        self._live_ids = catalog.live_ids("USDT") if len(catalog) else None
+        self._universe = {i for i in self._store.ids if self._in_universe(i)}
+        self._index.build(sorted(self._universe))
+        self._texts = {}
+        self._apply_filter()
+
+    def _in_universe(self, inst_id: str) -> bool:
+        if self._live_ids is not None:
+            return inst_id in self._live_ids
+        return inst_id.endswith("-USDT")
+
+    def _on_store_change(self, store: TickerStore):
+        rows, self._seen = store.changed_since(self._seen)
+        if not rows:
+            return
+        if self._known < len(store):
+            if self._live_ids is None and len(get_catalog()):
+                self._live_ids = get_catalog().live_ids("USDT")
+            new = [i for i in store.ids[self._known:] if self._in_universe(i)]
+            self._known = len(store)
+            if new:
+                self._universe.update(new)
+                if len(self._index) == 0:
+                    self._index.build(sorted(new))
+                else:
+                    for i in new:
+                        self._index.add(i)
+                self._texts = {}
+                self._apply_filter()
+                return
+        ids = store.ids
+        bulk = len(rows) > self.BULK_REFRESH
+        for r in rows:
+            inst_id = ids[r]
+            if inst_id not in self._universe:
+                continue
+            self._texts.pop(inst_id, None)
+            if self._view is not None:
+                span = self._view.update(inst_id)
+                if span and not bulk:
+                    self.list.RefreshItems(*span)
+            elif inst_id in self._rows and not bulk:
+                self.list.RefreshItem(self._rows[inst_id])
+        if bulk:
+            self.list.Refresh()
+
+    def _sort_key(self, inst_id: str, col: int):
+        if col == 0:
+            return inst_id
+        st = self._store
+        r = st.row(inst_id)
+        if col == 2:
+            return st.change_pct(r)
+        if col == 6:
+            return st.range_pct(r)
+        if col == 8:
+            return float(st.ts[r])
+        field = {1: "last", 3: "open24h", 4: "high24h", 5: "low24h", 7: "vol24h"}[col]
+        return st.num[field][r]
+
+    def _row_text(self, inst_id: str) -> tuple:
+        st = self._store
+        r = st.row(inst_id)
+        text = st.text
+        ch, rng = st.change_pct(r), st.range_pct(r)
+        return (
+            inst_id,
+            text["last"][r],
+            "" if math.isnan(ch) else f"{ch:.2f}%",
+            text["open24h"][r],
+            text["high24h"][r],
+            text["low24h"][r],
+            "" if math.isnan(rng) else f"{rng:.2f}%",
+            text["vol24h"][r],
+            str(st.ts[r] or ""),
+        )
+
+    def _item_text(self, row: int, col: int) -> str:
+        if row >= len(self._filtered):
+            return ""
+        self._meter.painted("markets")  # the virtual list asks for text while it paints
+        inst_id = self._display(row)
+        text = self._texts.get(inst_id)
+        if text is None:
+            text = self._texts[inst_id] = self._row_text(inst_id)
+        return text[col]
+
+    def _apply_filter(self):
+        self._filter_timer.Stop()
+        # exact base currency first, then prefix matches, then substrings
+        self._filtered = self._index.search(self.search.GetValue())
+        self._rows = {k: i for i, k in enumerate(self._filtered)}
+        if self._view is not None:
+            self._view.reset(self._filtered)
+        self.list.SetItemCount(len(self._filtered))
+        self.list.Refresh()
+
+    def _display(self, row: int) -> str:
+        return self._view[row] if self._view is not None else self._filtered[row]
+
+    def _on_col_click(self, evt):
+        col = evt.GetColumn()
+        if col < 0:
+            return
+        if col == self._sort_col:
+            self._sort_desc = not self._sort_desc
+        else:
+            # numbers start high-to-low (top movers), pair names A-Z
+            self._sort_col, self._sort_desc = col, col != 0
+        # missing values sort last in either direction
+        missing = float("-inf") if self._sort_desc else float("inf")
 
-            try:
-                lf, of = float(last), float(open_px)
-                ch = ((lf - of) / of * 100) if of else 0
-                self.list.Append( (d.get("instId", ""), last, f"{ch:.2f}%", open_px, high, low, vol, s1)) # , open_px, high, low, vol, ts) )
-            except (TypeError, ValueError):
-                # self.grid.SetCellValue(row, 2, "")
-                # wx.MessageBox(msg, "Error", wx.OK | wx.ICON_ERROR)
-                self.list.Append( (d.get("instId", ""), last, "", open_px, high, low, vol, s1)) #, open_px, high, low, vol, ts) )
-                
+        def key_of(inst_id):
+            v = self._sort_key(inst_id, col)
+            return missing if isinstance(v, float) and math.isnan(v) else v
 
-            
+        self._view = SortedView(key_of, reverse=self._sort_desc)
+        self._view.reset(self._filtered)
+        if hasattr(self.list, "ShowSortIndicator"):
+            self.list.ShowSortIndicator(col, not self._sort_desc)
+        self.list.Refresh()
 
     def _on_filter(self, evt):
-        q = self.search.GetValue().strip().upper()
-        if not q:
-            self._filtered = self._tickers.copy()
-        else:
-            self._filtered = [d for d in self._tickers if q in (d.get("instId") or "").upper()]
-        self._refresh_list()
+        self._filter_timer.Start(self.FILTER_DELAY_MS)
 
     def _on_sel(self, evt):
         idx = evt.GetIndex()
         if 0 <= idx < len(self._filtered):
-            inst_id = self._filtered[idx].get("instId", "")
+            inst_id = self._display(idx)
             if inst_id and self.on_select:
                 self.on_select(inst_id)
 
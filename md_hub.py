@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Market-data hub: one upstream OKX public feed shared by every local UI and script.
+The hub speaks the OKX v5 protocol on a localhost port, so clients only change their endpoints:
+
+  python md_hub.py --port 8780
+  OKX_REST_BASE=http://127.0.0.1:8780 OKX_WS_PUBLIC=ws://127.0.0.1:8780/ws/v5/public python run.py
+  (likewise terminal_btc.py; the private stream still goes straight to OKX)
+
+WS: a topic (channel + instId) is subscribed upstream when its first local client subscribes and
+dropped after the last one leaves. The hub keeps the latest state of each topic (ticker, live candle,
+books5, recent trades); a new subscriber gets it at once as a push with "action": "snapshot", then
+the upstream pushes (deltas) forwarded byte for byte. Snapshot and deltas go out under one lock, so
+nothing is missed or repeated in between. Upstream (un)subscribes are queued under that lock and sent by
+one sender thread, so they reach OKX in the order the topics changed, and no push waits on a send.
+REST: requests are forwarded to OKX; public market GETs are answered from a short-TTL cache (identical
+requests in flight are coalesced), and /market/ticker from the live ticker when the hub holds one.
+GET /hub/status reports clients, topics and counters.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+import ws_local
+from config import REST_BASE
+from okx_ws import OKXWebSocket
+from ws_local import WsClient
+
+TRADES_KEEP = 50  # newest trades per instrument in a trades snapshot
+# seconds a public GET is served from cache, by path (paths not listed are always forwarded)
+REST_TTL = {
+    "/api/v5/market/ticker": 0.5,
+    "/api/v5/market/tickers": 1.0,
+    "/api/v5/market/books": 0.5,
+    "/api/v5/market/trades": 0.5,
+    "/api/v5/market/candles": 1.0,
+    "/api/v5/market/history-candles": 30.0,
+    "/api/v5/public/instruments": 60.0,
+}
+FORWARD_HEADERS = ("Content-Type", "Accept", "OK-ACCESS-KEY", "OK-ACCESS-SIGN", "OK-ACCESS-TIMESTAMP",
+                   "OK-ACCESS-PASSPHRASE", "x-simulated-trading")
+
+
+def _key(arg: dict) -> tuple[str, str]:
+    return arg.get("channel", ""), arg.get("instId", "")
+
+
+def _supported(channel: str) -> bool:
+    return channel in ("tickers", "trades", "books5", "bbo-tbt") or channel.startswith("candle")
+
+
+class _Upstream(OKXWebSocket):
+    """Public OKXWebSocket that hands data pushes to the hub as raw text, so they can be forwarded as is."""
+
+    def __init__(self, on_push, on_error):
+        super().__init__(private=False, on_error=on_error)
+        self._on_push = on_push
+
+    def _on_message(self, ws, raw: str):
+        if raw.startswith('{"arg"'):  # pushes; events, pongs and errors start differently
+            if self._recorder:
+                self._recorder.record(self._source, raw)
+            self._on_push(raw)
+        else:
+            super()._on_message(ws, raw)
+
+
+class Hub:
+    def __init__(self):
+        self.upstream = _Upstream(self._on_push, self._on_upstream_error)
+        self._subs: dict[tuple[str, str], set[WsClient]] = {}
+        self._state: dict[tuple[str, str], list] = {}  # topic -> snapshot payload (newest first)
+        self._clients: set[WsClient] = set()
+        self._lock = threading.Lock()
+        self._upstream_q: queue.SimpleQueue = queue.SimpleQueue()  # (op, args), put under _lock; None stops
+        threading.Thread(target=self._send_upstream, name="hub-upstream", daemon=True).start()
+        self.frames_in = 0
+        self.frames_out = 0
+        self.errors = 0
+        self.last_error = ""
+
+    def start(self):
+        self.upstream.start()
+
+    def stop(self):
+        self._upstream_q.put(None)
+        self.upstream.stop()
+
+    # --- Local clients ---
+
+    def connect(self, client: WsClient):
+        with self._lock:
+            self._clients.add(client)
+
+    def disconnect(self, client: WsClient):
+        with self._lock:
+            self._clients.discard(client)
+            args = [{"channel": c, "instId": i} for (c, i), subs in self._subs.items() if client in subs]
+        self.unsubscribe(client, args, ack=False)
+
+    def subscribe(self, client: WsClient, args: list[dict]):
+        """Ack (or reject) each arg, send the snapshot when there is one, and subscribe new topics upstream in one batch."""
+        new = []
+        with self._lock:
+            for arg in args:
+                channel, inst_id = _key(arg)
+                if not _supported(channel) or not inst_id:
+                    client.send_json({"event": "error", "code": "60018", "msg": f"Hub does not serve channel:{channel},instId:{inst_id}"})
+                    continue
+                topic = {"channel": channel, "instId": inst_id}
+                subs = self._subs.setdefault((channel, inst_id), set())
+                if not subs:
+                    new.append(topic)
+                subs.add(client)
+                client.send_json({"event": "subscribe", "arg": topic, "connId": "hub"})
+                items = self._state.get((channel, inst_id))
+                if items:
+                    client.send_json({"arg": topic, "action": "snapshot", "data": items})
+            if new:
+                self._upstream_q.put(("subscribe", new))
+
+    def unsubscribe(self, client: WsClient, args: list[dict], ack: bool = True):
+        gone = []
+        with self._lock:
+            for arg in args:
+                key = _key(arg)
+                subs = self._subs.get(key)
+                if subs is not None:
+                    subs.discard(client)
+                    if not subs:
+                        del self._subs[key]
+                        self._state.pop(key, None)  # would be stale by the next subscribe
+                        gone.append({"channel": key[0], "instId": key[1]})
+                if ack:
+                    client.send_json({"event": "unsubscribe", "arg": arg, "connId": "hub"})
+            if gone:
+                self._upstream_q.put(("unsubscribe", gone))
+
+    # --- Upstream ---
+
+    def _send_upstream(self):
+        while (item := self._upstream_q.get()) is not None:
+            op, args = item
+            if op == "subscribe":
+                self.upstream.subscribe(args)
+            else:
+                self.upstream.unsubscribe(args)
+
+    def _on_push(self, raw: str):
+        try:
+            msg = json.loads(raw)
+            key = _key(msg["arg"])
+            data = msg["data"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._on_upstream_error(e)
+            return
+        frame = ws_local.ws_frame(raw.encode("utf-8"))
+        with self._lock:
+            self.frames_in += 1
+            subs = self._subs.get(key)
+            if not subs:
+                return  # unsubscribed while the push was in flight
+            if key[0] == "trades":
+                self._state[key] = (data + self._state.get(key, []))[:TRADES_KEEP]
+            elif data:
+                self._state[key] = data[:1]
+            for client in subs:
+                client.push(frame)
+            self.frames_out += len(subs)
+
+    def _on_upstream_error(self, e: Exception):
+        self.errors += 1
+        self.last_error = str(e)
+
+    def ticker(self, inst_id: str) -> dict | None:
+        """Live ticker for inst_id if the hub is subscribed to it."""
+        with self._lock:
+            items = self._state.get(("tickers", inst_id))
+            return items[0] if items else None
+
+    def status(self) -> dict:
+        with self._lock:
+            clients = list(self._clients)
+            return {
+                "clients": len(clients),
+                "topics": len(self._subs),
+                "frames_in": self.frames_in,
+                "frames_out": self.frames_out,
+                "dropped": sum(c.dropped for c in clients),
+                "upstream_errors": self.errors,
+                "last_error": self.last_error,
+            }
+
+
+class RestCache:
+    """Forwards REST calls to OKX; public GETs listed in REST_TTL are cached briefly and coalesced."""
+
+    def __init__(self, base: str = REST_BASE):
+        self.base = base.rstrip("/")
+        self.session = requests.Session()
+        self.hits = 0
+        self.upstream = 0
+        self._cache: dict[tuple, tuple[float, int, bytes]] = {}  # key -> (expires, status, body)
+        self._inflight: dict[tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, path_qs: str, headers: dict, body: bytes | None) -> tuple[int, bytes]:
+        path = path_qs.split("?", 1)[0]
+        ttl = REST_TTL.get(path)
+        if method != "GET" or ttl is None or "OK-ACCESS-KEY" in headers:
+            return self._forward(method, path_qs, headers, body)
+        key = (path_qs, headers.get("x-simulated-trading", ""))
+        while True:
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit and hit[0] > time.monotonic():
+                    self.hits += 1
+                    return hit[1], hit[2]
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    done = self._inflight[key] = threading.Event()
+                    break
+            waiter.wait(15)  # same request already on its way: share its answer
+        try:
+            status, payload = self._forward(method, path_qs, headers, body)
+            if status == 200:
+                with self._lock:
+                    self._cache[key] = (time.monotonic() + ttl, status, payload)
+                    if len(self._cache) > 4096:
+                        now = time.monotonic()
+                        self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            return status, payload
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def _forward(self, method: str, path_qs: str, headers: dict, body: bytes | None) -> tuple[int, bytes]:
+        self.upstream += 1
+        try:
+            r = self.session.request(method, self.base + path_qs, headers=headers, data=body, timeout=15)
+            return r.status_code, r.content
+        except requests.RequestException as e:
+            return 502, json.dumps({"code": "50001", "msg": f"hub: upstream unavailable ({e})", "data": []}).encode("utf-8")
+
+
+# --- HTTP / WS server ---
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hub: Hub  # set by make_server
+    rest: RestCache
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.headers.get("Upgrade", "").lower() == "websocket":
+            self._websocket()
+        else:
+            self._rest("GET")
+
+    def do_POST(self):
+        self._rest("POST")
+
+    def _reply(self, status: int, payload: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _rest(self, method: str):
+        url = urlparse(self.path)
+        if url.path == "/hub/status":
+            status = dict(self.hub.status(), rest_hits=self.rest.hits, rest_upstream=self.rest.upstream)
+            self._reply(200, json.dumps(status).encode("utf-8"))
+            return
+        if url.path == "/api/v5/market/ticker":
+            live = self.hub.ticker((parse_qs(url.query).get("instId") or [""])[0])
+            if live is not None:
+                self._reply(200, json.dumps({"code": "0", "msg": "", "data": [live]}).encode("utf-8"))
+                return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {h: self.headers[h] for h in FORWARD_HEADERS if self.headers.get(h)}
+        self._reply(*self.rest.request(method, self.path, headers, body))
+
+    def _websocket(self):
+        if urlparse(self.path).path != "/ws/v5/public":
+            self._reply(404, b'{"code":"60004","msg":"hub serves /ws/v5/public only"}')
+            return
+        ws_local.accept(self)
+        client = WsClient(self.wfile)
+        self.hub.connect(client)
+        try:
+            ws_local.serve(self, client, lambda text: self._ws_text(client, text))
+        finally:
+            self.hub.disconnect(client)
+            client.close()
+
+    def _ws_text(self, client: WsClient, text: str):
+        if text == "ping":
+            client.push(ws_local.ws_frame(b"pong"))
+            return
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            msg = {}
+        op, args = msg.get("op"), msg.get("args") or []
+        if op == "subscribe":
+            self.hub.subscribe(client, args)
+        elif op == "unsubscribe":
+            self.hub.unsubscribe(client, args)
+        else:
+            client.send_json({"event": "error", "code": "60012", "msg": f"Illegal request: {text[:100]}"})
+
+
+def make_server(hub: Hub, rest: RestCache, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Bind (port 0 picks a free one) without serving yet; call serve_forever() on a thread."""
+    handler = type("HubHandler", (_Handler,), {"hub": hub, "rest": rest})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def env_for(server: ThreadingHTTPServer) -> dict[str, str]:
+    """Environment that points the app / terminal_btc.py at this hub (public data only)."""
+    host, port = server.server_address[:2]
+    return {"OKX_REST_BASE": f"http://{host}:{port}", "OKX_WS_PUBLIC": f"ws://{host}:{port}/ws/v5/public"}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Share one upstream OKX market-data feed between local clients")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8780)
+    ap.add_argument("--interval", type=float, default=10, help="print status every N seconds (0: quiet)")
+    args = ap.parse_args()
+    hub, rest = Hub(), RestCache()
+    server = make_server(hub, rest, args.host, args.port)
+    hub.start()
+    for k, v in env_for(server).items():
+        print(f"export {k}={v}")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        while True:
+            time.sleep(args.interval or 3600)
+            if args.interval:
+                s = hub.status()
+                print(f"clients={s['clients']} topics={s['topics']} in={s['frames_in']} out={s['frames_out']} "
+                      f"dropped={s['dropped']} rest hits={rest.hits} upstream={rest.upstream}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Market data latency and staleness. Each push gets a Stamp on receipt, and the stages are timed per
+channel in log-bucketed histograms:
+  net     exchange ts -> socket receive (only when the push carries a ts; candles do not)
+  decode  receive -> parsed
+  apply   parsed -> applied to the UI state (includes the wait in the GUI event queue)
+  paint   applied -> painted
+  total   exchange ts (or receive) -> painted
+Pushes are sampled: at most one per topic (channel + instId) every SAMPLE_MS gets a Stamp, the rest cost
+a dict lookup. Per topic, so a busy symbol cannot starve the others of stamps (and of a fresh age).
+Per panel, age_ms() is how old the newest data that panel has painted is: the staleness shown in the
+app's status bar and the terminal footer. Exchange and local clocks are compared directly, so net and
+staleness are only as good as NTP; negative spans count as 0. OKX_LATENCY=0 turns it all off.
+"""
+import math
+import threading
+import time
+from typing import Iterable
+
+from config import LATENCY, STALE_MS
+
+STAGES = ("net", "decode", "apply", "paint", "total")
+SAMPLE_MS = 250  # per topic; also the resolution of age_ms()
+
+
+def now_ms() -> float:
+    return time.time() * 1000
+
+
+class Histogram:
+    """Latencies in ms: 8 buckets per doubling from 0.05 ms (about 9% resolution), up to ~14 min."""
+
+    BASE_MS = 0.05
+    PER_DOUBLING = 8
+    BUCKETS = PER_DOUBLING * 24
+
+    __slots__ = ("counts", "n", "max")
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.n = 0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        ms = max(0.0, ms)
+        i = 0 if ms <= self.BASE_MS else int(math.log2(ms / self.BASE_MS) * self.PER_DOUBLING) + 1
+        self.counts[min(i, self.BUCKETS - 1)] += 1
+        self.n += 1
+        self.max = max(self.max, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper edge of the bucket holding the p-th quantile (0..1), capped at the largest sample."""
+        if not self.n:
+            return 0.0
+        want = p * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= want and c:
+                return min(self.max, self.BASE_MS * 2 ** (i / self.PER_DOUBLING))
+        return self.max
+
+
+class Stamp:
+    """Times of one push, epoch ms. exch is None when the push has no exchange ts."""
+
+    __slots__ = ("channel", "exch", "recv", "decoded", "applied", "painted")
+
+    def __init__(self, channel: str, exch: float | None, recv: float, decoded: float):
+        self.channel = channel
+        self.exch = exch
+        self.recv = recv
+        self.decoded = decoded
+        self.applied = 0.0
+        self.painted = False  # by any panel: paint and total are counted once per push
+
+    @property
+    def origin(self) -> float:
+        return self.exch if self.exch is not None else self.recv
+
+
+def exchange_ts(item) -> float | None:
+    """ts of a ticker / trade / book push (uTime for orders). Candle rows carry the bar start, not an event time."""
+    if not isinstance(item, dict):
+        return None
+    try:
+        return float(item.get("ts") or item.get("uTime") or "")
+    except ValueError:
+        return None
+
+
+class LatencyMeter:
+    def __init__(self, stale_ms: float = STALE_MS, enabled: bool = LATENCY):
+        self.enabled = enabled  # also off while replaying a recording: its timestamps are from the past
+        self.stale_ms = stale_ms
+        self._lock = threading.Lock()
+        self._hist: dict[str, dict[str, Histogram]] = {}  # channel -> stage -> histogram
+        self._pending: dict[str, Stamp] = {}  # panel -> newest applied push not painted yet
+        self._shown: dict[str, float] = {}  # panel -> origin of the newest push it painted
+        self._sampled: dict[tuple[str, str], float] = {}  # topic -> recv of its last stamped push (WS threads only)
+
+    def _add(self, channel: str, stage: str, ms: float):
+        stages = self._hist.get(channel)
+        if stages is None:
+            stages = self._hist[channel] = {s: Histogram() for s in STAGES}
+        stages[stage].add(ms)
+
+    def received(self, channel: str, inst_id: str, items: list, recv: float) -> Stamp | None:
+        """After decoding a push that was read off the socket at recv (epoch ms). None unless the push is
+        sampled; net and decode are added to the histograms with apply, so this takes no lock."""
+        if not self.enabled:
+            return None
+        topic = (channel, inst_id)
+        if recv - self._sampled.get(topic, 0.0) < SAMPLE_MS:
+            return None
+        self._sampled[topic] = recv
+        return Stamp(channel, exchange_ts(items[0]) if items else None, recv, now_ms())
+
+    def applied(self, stamp: Stamp | None, *panels: str):
+        """After the push is in the state the panels draw from (GUI thread / terminal writer)."""
+        if stamp is None:
+            return
+        stamp.applied = now_ms()
+        with self._lock:
+            if stamp.exch is not None:
+                self._add(stamp.channel, "net", stamp.recv - stamp.exch)
+            self._add(stamp.channel, "decode", stamp.decoded - stamp.recv)
+            self._add(stamp.channel, "apply", stamp.applied - stamp.decoded)
+            for p in panels:
+                self._pending[p] = stamp
+
+    def painted(self, panel: str):
+        """The panel just painted; cheap when nothing new was applied to it."""
+        if panel not in self._pending:
+            return
+        t = now_ms()
+        with self._lock:
+            stamp = self._pending.pop(panel, None)
+            if stamp is None:
+                return
+            if not stamp.painted:
+                stamp.painted = True
+                self._add(stamp.channel, "paint", t - stamp.applied)
+                self._add(stamp.channel, "total", t - stamp.origin)
+            self._shown[panel] = max(self._shown.get(panel, 0.0), stamp.origin)
+
+    def age_ms(self, panel: str) -> float | None:
+        """How old the newest data painted by the panel is; None before its first push."""
+        shown = self._shown.get(panel)
+        return None if shown is None else max(0.0, now_ms() - shown)
+
+    def format_ages(self, panels: Iterable[str]) -> str:
+        parts = []
+        for p in panels:
+            age = self.age_ms(p)
+            if age is None:
+                parts.append(f"{p} —")
+            else:
+                parts.append(f"{p} {age / 1000:.1f}s" + (" STALE" if age > self.stale_ms else ""))
+        return "  ".join(parts)
+
+    def stats(self) -> dict[str, dict[str, tuple[int, float, float, float, float]]]:
+        """channel -> stage -> (count, p50, p95, p99, max) in ms."""
+        with self._lock:
+            return {
+                ch: {s: (h.n, h.percentile(0.5), h.percentile(0.95), h.percentile(0.99), h.max)
+                     for s, h in stages.items() if h.n}
+                for ch, stages in sorted(self._hist.items())
+            }
+
+    def format_stats(self) -> str:
+        lines = []
+        for ch, stages in self.stats().items():
+            lines.append(ch)
+            for s in STAGES:
+                if s in stages:
+                    n, p50, p95, p99, mx = stages[s]
+                    lines.append(f"  {s:<7} n {n:<7} p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {mx:.1f} ms")
+        return "\n".join(lines) or "No market data yet"
+
+
+_meter: LatencyMeter | None = None
+_meter_lock = threading.Lock()
+
+
+def get_latency_meter() -> LatencyMeter:
+    """Shared by the WS clients, the app's panels and terminal_btc."""
+    global _meter
+    with _meter_lock:
+        if _meter is None:
+            _meter = LatencyMeter()
+        return _meter
@@ -0,0 +1,289 @@
+"""
+Market data recorder and replayer for raw WS frames.
+The recorder tees every frame into gzip segments: a "#okxlog 1 <epoch_ns>" header line, then one line
+per frame "<µs since previous frame>\t<source>\t<raw frame>" (source: pub, priv, term). Segments roll
+over by size and age; compression and disk writes happen on a background thread, so the WS thread only
+appends to a deque. A crash loses at most the last flush interval.
+
+Replay feeds frames back through the same callbacks (OKXWebSocket._on_message, terminal_btc._on_ws_message)
+at 1x, Nx or maximum speed.
+
+  OKX_RECORD_DIR=~/okx_rec python run.py       (or terminal_btc.py) records
+  OKX_REPLAY=~/okx_rec OKX_REPLAY_SPEED=10 python run.py
+  python terminal_btc.py --replay ~/okx_rec --speed max
+  python md_record.py info ~/okx_rec
+  python md_record.py bench ~/okx_rec          decode / dispatch throughput, no network
+"""
+import argparse
+import atexit
+import glob
+import gzip
+import heapq
+import json
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from config import RECORD_DIR, RECORD_SEGMENT_MB, RECORD_SEGMENT_MIN, REPLAY_PATH
+
+MAGIC = "#okxlog 1"
+
+
+class Frame(NamedTuple):
+    ts_ns: int  # wall clock at receipt
+    source: str
+    raw: str
+
+
+class Recorder:
+    def __init__(
+        self,
+        directory: str,
+        segment_mb: float = RECORD_SEGMENT_MB,
+        segment_min: float = RECORD_SEGMENT_MIN,
+        flush_s: float = 0.5,
+    ):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_bytes = int(segment_mb * 1024 * 1024)  # uncompressed
+        self.segment_ns = int(segment_min * 60 * 1e9)
+        self.flush_s = flush_s
+        self.frames = 0
+        self.segments = 0
+        self._q: deque = deque()
+        self._file: gzip.GzipFile | None = None
+        self._seg_start = self._seg_bytes = self._prev_ns = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def record(self, source: str, raw):
+        """Hot path (WS thread): timestamp and enqueue only."""
+        self._q.append((time.time_ns(), source, raw))
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _loop(self):
+        while not self._stop.wait(self.flush_s):
+            self._drain()
+        self._drain()
+        self._close_segment()
+
+    def _drain(self):
+        q = self._q
+        if not q:
+            return
+        lines = []
+        try:
+            while q:
+                ts, source, raw = q.popleft()
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8", "replace")
+                if self._file is None or self._seg_bytes >= self.segment_bytes or ts - self._seg_start >= self.segment_ns:
+                    self._write(lines)
+                    lines = []
+                    self._open_segment(ts)
+                delta = (ts - self._prev_ns) // 1000
+                self._prev_ns += delta * 1000  # carry the sub-us remainder: deltas do not drift over a segment
+                line = f"{delta}\t{source}\t{raw}\n"
+                self._seg_bytes += len(line)
+                self.frames += 1
+                lines.append(line)
+            self._write(lines)
+            self._file.flush()  # sync flush: everything so far is readable even if we crash later
+        except OSError:
+            q.clear()  # disk full/unwritable: drop rather than grow without bound
+
+    def _write(self, lines: list[str]):
+        if lines and self._file is not None:
+            self._file.write("".join(lines).encode("utf-8"))
+
+    def _open_segment(self, ts_ns: int):
+        self._close_segment()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(ts_ns / 1e9))
+        path = os.path.join(self.directory, f"md-{stamp}-{os.getpid()}-{self.segments:04d}.log.gz")
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(f"{MAGIC} {ts_ns}\n".encode("ascii"))
+        self._seg_start = self._prev_ns = ts_ns
+        self._seg_bytes = 0
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+_recorder: Recorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Recorder | None:
+    """Shared recorder when OKX_RECORD_DIR is set (and not replaying), else None."""
+    global _recorder
+    if not RECORD_DIR or REPLAY_PATH:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            try:
+                _recorder = Recorder(RECORD_DIR)
+            except OSError:
+                return None
+            atexit.register(_recorder.close)
+        return _recorder
+
+
+# --- Reading / replay ---
+
+def segment_paths(path: str) -> list[str]:
+    """A segment file, or every segment in a directory."""
+    path = os.path.expanduser(path)
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "md-*.log.gz")))
+    return [path]
+
+
+def _read_segment(path: str) -> Iterator[Frame]:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8", newline="\n") as f:
+            header = f.readline()
+            if not header.startswith(MAGIC):
+                return
+            ts = int(header.split()[2])
+            for line in f:
+                if not line.endswith("\n"):
+                    return  # torn last line
+                delta, source, raw = line[:-1].split("\t", 2)
+                ts += int(delta) * 1000
+                yield Frame(ts, source, raw)
+    except (EOFError, zlib.error, OSError, ValueError, IndexError):
+        return  # segment still being written or truncated by a crash: keep what was readable
+
+
+def read_frames(path: str, sources: Iterable[str] | None = None) -> Iterator[Frame]:
+    """All frames under path in time order (segments from several processes are merged)."""
+    wanted = set(sources) if sources else None
+    frames = heapq.merge(*(_read_segment(p) for p in segment_paths(path)), key=lambda fr: fr.ts_ns)
+    return (fr for fr in frames if wanted is None or fr.source in wanted)
+
+
+def parse_speed(s: str | float) -> float:
+    """'max' (or 0) -> 0 = no pacing; otherwise a multiplier."""
+    if isinstance(s, str) and s.strip().lower() in ("max", "0", ""):
+        return 0.0
+    return max(0.0, float(s))
+
+
+def replay(
+    frames: Iterable[Frame],
+    handlers: dict[str, Callable[[str], None]],
+    speed: float = 1.0,
+    stop: threading.Event | None = None,
+) -> dict:
+    """Call handlers[source](raw) for each frame, paced at `speed` x recorded time (0 = as fast as possible)."""
+    n = 0
+    t0 = time.perf_counter()
+    first = None
+    for fr in frames:
+        if stop is not None and stop.is_set():
+            break
+        handler = handlers.get(fr.source)
+        if handler is None:
+            continue
+        if speed:
+            if first is None:
+                first = fr.ts_ns
+            delay = t0 + (fr.ts_ns - first) / 1e9 / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        handler(fr.raw)
+        n += 1
+    elapsed = time.perf_counter() - t0
+    return {"frames": n, "seconds": elapsed, "rate": n / elapsed if elapsed else 0.0}
+
+
+def start_replay(path: str, handlers: dict[str, Callable[[str], None]], speed: float) -> threading.Event:
+    """Replay on a daemon thread; set the returned event to stop it."""
+    stop = threading.Event()
+    threading.Thread(target=lambda: replay(read_frames(path, handlers), handlers, speed, stop), daemon=True).start()
+    return stop
+
+
+# --- CLI ---
+
+def _info(path: str):
+    paths = segment_paths(path)
+    n, sources, channels, first, last, raw_bytes = 0, {}, {}, None, None, 0
+    for fr in read_frames(path):
+        n += 1
+        raw_bytes += len(fr.raw)
+        first = fr.ts_ns if first is None else first
+        last = fr.ts_ns
+        sources[fr.source] = sources.get(fr.source, 0) + 1
+        i = fr.raw.find('"channel":"')
+        if i >= 0:
+            ch = fr.raw[i + 11:fr.raw.find('"', i + 11)]
+            channels[ch] = channels.get(ch, 0) + 1
+    size = sum(os.path.getsize(p) for p in paths)
+    span = (last - first) / 1e9 if n else 0.0
+    print(f"{len(paths)} segments, {size / 1024:.0f} KB on disk, {n} frames over {span:.1f}s "
+          f"({n / span if span else 0:.0f}/s), raw {raw_bytes / 1024:.0f} KB ({raw_bytes / max(size, 1):.1f}x compression)")
+    print("sources:", ", ".join(f"{k} {v}" for k, v in sorted(sources.items())))
+    print("channels:", ", ".join(f"{k} {v}" for k, v in sorted(channels.items(), key=lambda kv: -kv[1])))
+
+
+def _bench(path: str, repeat: int):
+    """Deterministic throughput of the decode and dispatch paths over frames held in memory."""
+    frames = list(read_frames(path))
+    if not frames:
+        print("no frames")
+        return
+    public = [fr.raw for fr in frames if fr.source in ("pub", "term")]
+    from okx_ws import OKXWebSocket
+    import terminal_btc
+
+    inst_ids = sorted({json.loads(r).get("arg", {}).get("instId", "") for r in public[:5000] if r.startswith("{")} - {""})
+    terminal_btc.set_watch(inst_ids or [terminal_btc.INST_ID])
+    ws = OKXWebSocket(private=False, on_message=lambda m: None)
+    cases = {
+        "json.loads": lambda raw: json.loads(raw) if raw != "pong" else None,
+        "OKXWebSocket._on_message": lambda raw: ws._on_message(None, raw),
+        "terminal_btc._on_ws_message": lambda raw: terminal_btc._on_ws_message(None, raw),
+    }
+    print(f"{len(public)} public frames, best of {repeat}")
+    for name, fn in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for raw in public:
+                fn(raw)
+            best = min(best, time.perf_counter() - t0)
+        print(f"  {name:30} {len(public) / best:>12,.0f} frames/s  {best / len(public) * 1e6:7.2f} µs/frame")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or benchmark recorded market data")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info").add_argument("path")
+    b = sub.add_parser("bench")
+    b.add_argument("path")
+    b.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    if args.cmd == "info":
+        _info(args.path)
+    else:
+        _bench(args.path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Out-of-process WS ingest: an OKXWebSocket runs in a child process, which decodes every push and writes
+tickers and candles as fixed-layout records into a multiprocessing.shared_memory ring. The GUI drains
+the ring on a timer with struct.unpack_from straight off the shared buffer (no pipes, no pickling),
+so JSON decoding never competes with painting for the GUI process's GIL.
+
+Ring layout: a 64-byte header (magic, capacity, record size, last written seq), then `capacity`
+192-byte records. There is a single writer. For each record it zeroes the slot's seq, writes the
+payload, writes the seq, then advances the header. A reader accepts a slot only if its seq matches
+before and after unpacking; records overwritten before they were read are counted as lost.
+
+  OKX_WS_INGEST=process python run.py
+  python md_shm.py bench --seconds 10 --runs 3   threaded vs process ingest against a local mock_okx
+"""
+import argparse
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable
+
+from config import INGEST_RING_RECORDS
+
+MAGIC = b"OKXRING1"
+HEADER = 64
+HEAD_SEQ = 16  # offset of the last written seq in the header
+FIELD = 20  # bytes per numeric string field
+# seq, kind, flags, ts, instId, 7 decimal strings; 188 bytes, padded to 192
+RECORD = struct.Struct(f"<QBB6xq24s{7 * f'{FIELD}s'}4x")
+SEQ = struct.Struct("<Q")
+_HEAD = struct.Struct("<8sII")
+TICKER, CANDLE = 1, 2
+TICKER_FIELDS = ("last", "open24h", "high24h", "low24h", "vol24h", "bidPx", "askPx")
+
+
+def _fit(s) -> bytes:
+    b = str(s or "").encode("ascii", "replace")
+    if len(b) > FIELD:
+        try:
+            b = f"{float(s):.12g}".encode("ascii")
+        except ValueError:
+            b = b[:FIELD]
+    return b
+
+
+def _text(b: bytes) -> str:
+    return b.rstrip(b"\0").decode("ascii")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without letting this process's resource tracker unlink it at exit."""
+    shm = shared_memory.SharedMemory(name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except (AttributeError, KeyError):
+        pass
+    return shm
+
+
+class RingWriter:
+    def __init__(self, buf: memoryview):
+        magic, self.capacity, size = _HEAD.unpack_from(buf, 0)
+        if magic != MAGIC or size != RECORD.size:
+            raise ValueError("not an OKX ring segment")
+        self.buf = buf
+        self.seq = SEQ.unpack_from(buf, HEAD_SEQ)[0]
+
+    def put(self, kind: int, flags: int, inst_id: str, ts: int, fields: list[bytes]):
+        self.seq += 1
+        off = HEADER + (self.seq % self.capacity) * RECORD.size
+        buf = self.buf
+        SEQ.pack_into(buf, off, 0)  # slot in flux
+        RECORD.pack_into(buf, off, 0, kind, flags, ts, inst_id.encode("ascii", "replace"), *fields)
+        SEQ.pack_into(buf, off, self.seq)
+        SEQ.pack_into(buf, HEAD_SEQ, self.seq)
+
+    def put_ticker(self, inst_id: str, d: dict):
+        try:
+            ts = int(d.get("ts") or 0)
+        except (TypeError, ValueError):
+            ts = 0
+        self.put(TICKER, 0, inst_id, ts, [_fit(d.get(f)) for f in TICKER_FIELDS])
+
+    def put_candle(self, inst_id: str, row: list):
+        """[ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm] (OKX order)."""
+        if len(row) < 6:
+            return
+        row = list(row) + [""] * (9 - len(row))
+        self.put(CANDLE, row[8] == "1", inst_id, int(row[0]), [_fit(v) for v in row[1:8]])
+
+
+class RingReader:
+    def __init__(self, buf: memoryview):
+        self.buf = buf
+        self.capacity = _HEAD.unpack_from(buf, 0)[1]
+        self.seq = SEQ.unpack_from(buf, HEAD_SEQ)[0]  # start at the live edge
+        self.lost = 0
+
+    def read(self) -> list[tuple]:
+        """Records written since the last call, oldest first (raw RECORD tuples)."""
+        buf, cap, size = self.buf, self.capacity, RECORD.size
+        head = SEQ.unpack_from(buf, HEAD_SEQ)[0]
+        if head - self.seq >= cap:  # lapped: the oldest slots are gone (or being rewritten)
+            skip = head - self.seq - (cap - 1)
+            self.lost += skip
+            self.seq += skip
+        out = []
+        for s in range(self.seq + 1, head + 1):
+            off = HEADER + (s % cap) * size
+            rec = RECORD.unpack_from(buf, off)
+            if rec[0] != s or SEQ.unpack_from(buf, off)[0] != s:
+                self.lost += 1  # overwritten while we were reading it
+                continue
+            out.append(rec)
+        self.seq = head
+        return out
+
+
+def create_ring(capacity: int = INGEST_RING_RECORDS) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(create=True, size=HEADER + capacity * RECORD.size)
+    _HEAD.pack_into(shm.buf, 0, MAGIC, capacity, RECORD.size)
+    SEQ.pack_into(shm.buf, HEAD_SEQ, 0)
+    return shm
+
+
+class IngestProcess:
+    """
+    Drop-in for the GUI's public OKXWebSocket (start/stop/subscribe_*), but pushes are not delivered by
+    callback: call poll() from a GUI timer. Subscriptions go to the child as JSON lines on its stdin;
+    the child exits when stdin closes, so it never outlives the GUI.
+    """
+
+    def __init__(self, capacity: int = INGEST_RING_RECORDS, on_error: Callable[[Exception], None] | None = None):
+        self.on_error = on_error or (lambda _: None)
+        self._shm = create_ring(capacity)
+        self._reader = RingReader(self._shm.buf)
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def lost(self) -> int:
+        return self._reader.lost
+
+    def start(self):
+        self._proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "ingest", self._shm.name],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+        threading.Thread(target=self._read_errors, daemon=True).start()
+
+    def stop(self):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=3)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+        self._reader.buf = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def _send(self, op: str, args: list[dict]):
+        with self._lock:
+            if self._proc is None:
+                return
+            try:
+                self._proc.stdin.write(json.dumps({"op": op, "args": args}) + "\n")
+            except OSError as e:
+                self.on_error(e)
+
+    def _read_errors(self):
+        proc = self._proc
+        for line in proc.stdout:
+            self.on_error(RuntimeError(line.rstrip("\n")))
+        if self._proc is proc:
+            from okx_ws import WsFatalError
+            self.on_error(WsFatalError(f"ingest process exited ({proc.wait()})"))
+
+    def subscribe(self, args: list[dict]):
+        self._send("subscribe", args)
+
+    def unsubscribe(self, args: list[dict]):
+        self._send("unsubscribe", args)
+
+    def subscribe_ticker(self, inst_id: str):
+        self.subscribe([{"channel": "tickers", "instId": inst_id}])
+
+    def subscribe_candle(self, inst_id: str, bar: str = "1m"):
+        self.subscribe([{"channel": "candle" + bar, "instId": inst_id}])
+
+    def poll(self) -> tuple[dict[str, dict], list[tuple[str, list]]]:
+        """(latest ticker per instId, candle rows in arrival order) since the last poll."""
+        tickers: dict[str, dict] = {}
+        candles: dict[tuple[str, str], list] = {}  # a bar updated twice keeps its place, latest values
+        for _, kind, flags, ts, inst, *fields in self._reader.read():
+            inst_id = _text(inst)
+            if kind == TICKER:
+                d = dict(zip(TICKER_FIELDS, map(_text, fields)))
+                d["instId"], d["ts"] = inst_id, str(ts)
+                tickers[inst_id] = d
+            elif kind == CANDLE:
+                candles[(inst_id, str(ts))] = [str(ts), *map(_text, fields), "1" if flags else "0"]
+        return tickers, [(inst_id, row) for (inst_id, _), row in candles.items()]
+
+
+def _ingest_main(name: str):
+    """Child: decode pushes into the ring; stdin carries subscriptions, stdout carries errors."""
+    from okx_ws import OKXWebSocket
+
+    shm = _attach(name)
+    writer = RingWriter(shm.buf)
+    out_lock = threading.Lock()
+
+    def on_message(msg: dict):
+        ch = msg.get("arg", {}).get("channel", "")
+        inst_id = msg.get("arg", {}).get("instId", "")
+        data = msg.get("data")
+        if ch == "tickers" and isinstance(data, dict):
+            writer.put_ticker(inst_id, data)
+        elif ch.startswith("candle") and isinstance(data, list):
+            writer.put_candle(inst_id, data)
+
+    def on_error(e):
+        with out_lock:
+            print(str(e).replace("\n", " "), flush=True)
+
+    ws = OKXWebSocket(private=False, on_message=on_message, on_error=on_error)
+    ws.start()
+    for line in sys.stdin:
+        try:
+            cmd = json.loads(line)
+        except ValueError:
+            continue
+        if cmd.get("op") in ("subscribe", "unsubscribe"):
+            getattr(ws, cmd["op"])(cmd.get("args") or [])
+    ws.stop()
+    writer.buf = None
+    shm.close()
+
+
+# --- Benchmark ---
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _paint_work(n: int):
+    """Stand-in for a repaint: pure-Python work that needs the GIL."""
+    x = 0
+    for i in range(n):
+        x += i * i % 7
+    return x
+
+
+def _bench_gui_loop(source, seconds: float, paint_n: int, fps: int) -> dict:
+    """Fixed-rate GUI loop: drain the source into a TickerStore, then 'paint'; times each frame."""
+    from ticker_store import TickerStore
+
+    store = TickerStore()
+    period = 1 / fps
+    frames, late = [], []
+    applied = 0
+    t_end = time.perf_counter() + seconds
+    due = time.perf_counter()
+    while time.perf_counter() < t_end:
+        now = time.perf_counter()
+        if now < due:
+            time.sleep(due - now)
+        t0 = time.perf_counter()
+        late.append((t0 - due) * 1000)
+        tickers, n = source()
+        for inst_id, d in tickers.items():
+            store.upsert(inst_id, d, notify=False)
+        applied += n
+        _paint_work(paint_n)
+        frames.append((time.perf_counter() - t0) * 1000)
+        due += period
+        if due < time.perf_counter():
+            due = time.perf_counter()  # do not try to catch up missed frames
+
+    def pct(xs, p):
+        xs = sorted(xs)
+        return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else float("nan")
+    return {"msgs": applied / seconds, "frames": len(frames) / seconds,
+            "frame_p50": pct(frames, 0.5), "frame_p99": pct(frames, 0.99), "late_p99": pct(late, 0.99)}
+
+
+def _bench(seconds: float, rate: float, instruments: int, paint_ms: float, fps: int, runs: int):
+    port = _free_port()
+    mock = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_okx.py"),
+                             "--port", str(port), "--rate", str(rate), "--instruments", str(instruments), "--seed", "1"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ.update(OKX_REST_BASE=f"http://127.0.0.1:{port}", OKX_WS_PUBLIC=f"ws://127.0.0.1:{port}/ws/v5/public")
+    results: dict[str, list[dict]] = {"threaded": [], "process": []}
+    lost = 0
+    try:
+        time.sleep(2 + instruments / 100)  # candle backfill
+        import config
+        config.WS_PUBLIC_OVERRIDE = os.environ["OKX_WS_PUBLIC"]
+        from okx_ws import OKXWebSocket
+
+        t0 = time.perf_counter()
+        _paint_work(100000)
+        paint_n = int(100000 * paint_ms / 1000 / (time.perf_counter() - t0))
+        ids = ["BTC-USDT", "ETH-USDT", "SOL-USDT", "XRP-USDT", "DOGE-USDT", "ADA-USDT", "TRX-USDT", "LINK-USDT",
+               "AVAX-USDT", "DOT-USDT", "LTC-USDT", "BCH-USDT", "TON-USDT", "OKB-USDT"]
+        ids += [f"T{i:04d}-USDT" for i in range(max(0, instruments - len(ids)))]
+        args = [{"channel": ch, "instId": i} for i in ids[:instruments] for ch in ("tickers", "candle1m")]
+        print(f"mock: {instruments} instruments, {rate:g} msgs/s offered; GUI loop {fps} fps with ~{paint_ms:g} ms paint; "
+              f"{seconds:g}s each, {runs} runs alternating")
+
+        def run_threaded() -> dict:
+            # what the app does by default (decode on a thread in this process, events to the GUI thread)
+            q: deque = deque()
+            ws = OKXWebSocket(private=False, on_message=lambda m: q.append(m))
+            ws.start()
+            ws.subscribe(args)
+            time.sleep(1)
+
+            def thread_source():
+                tickers, n = {}, 0
+                while q:
+                    m = q.popleft()
+                    n += 1
+                    if m["arg"].get("channel") == "tickers":
+                        tickers[m["arg"]["instId"]] = m["data"]
+                return tickers, n
+            thread_source()
+            try:
+                return _bench_gui_loop(thread_source, seconds, paint_n, fps)
+            finally:
+                ws.stop()
+
+        def run_process() -> dict:
+            nonlocal lost
+            ingest = IngestProcess()
+            ingest.start()
+            ingest.subscribe(args)
+            time.sleep(1)
+
+            def shm_source():
+                before = ingest._reader.seq
+                tickers, _ = ingest.poll()
+                return tickers, ingest._reader.seq - before
+            shm_source()
+            try:
+                return _bench_gui_loop(shm_source, seconds, paint_n, fps)
+            finally:
+                lost += ingest.lost
+                ingest.stop()
+
+        for i in range(runs):  # alternate which goes first, so drift on the machine hits both alike
+            order = (("threaded", run_threaded), ("process", run_process))
+            for name, run in order if i % 2 == 0 else order[::-1]:
+                results[name].append(run())
+    finally:
+        mock.terminate()
+
+    # one-off runs swing a lot on a busy or small machine: median, with min..max over the runs
+    def spread(rs: list[dict], key: str) -> str:
+        xs = sorted(r[key] for r in rs)
+        return f"{xs[len(xs) // 2]:.1f} ({xs[0]:.1f}-{xs[-1]:.1f})"
+    print(f"{'':10} {'msgs/s':>9} {'fps':>6} {'frame p50 ms':>18} {'frame p99 ms':>18} {'late p99 ms':>18}")
+    for name, rs in results.items():
+        msgs = sorted(r["msgs"] for r in rs)[len(rs) // 2]
+        fps_ = sorted(r["frames"] for r in rs)[len(rs) // 2]
+        print(f"{name:10} {msgs:>9,.0f} {fps_:>6.1f} {spread(rs, 'frame_p50'):>18} {spread(rs, 'frame_p99'):>18} "
+              f"{spread(rs, 'late_p99'):>18}")
+    print(f"ring records lost: {lost}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shared-memory WS ingest")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("ingest", help="child process (started by IngestProcess)").add_argument("name")
+    b = sub.add_parser("bench", help="threaded vs process ingest against a local mock_okx")
+    b.add_argument("--seconds", type=float, default=10)
+    b.add_argument("--rate", type=float, default=20000, help="mock messages per second")
+    b.add_argument("--instruments", type=int, default=100)
+    b.add_argument("--paint-ms", type=float, default=8, help="simulated paint cost per frame")
+    b.add_argument("--fps", type=int, default=30)
+    b.add_argument("--runs", type=int, default=3, help="runs of each mode; medians and min-max are reported")
+    args = ap.parse_args()
+    if args.cmd == "ingest":
+        _ingest_main(args.name)
+    else:
+        _bench(args.seconds, args.rate, args.instruments, args.paint_ms, args.fps, max(1, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Memory accounting: approximate heap bytes per subsystem, by walking what each one holds
+(sys.getsizeof over dicts, sequences, __dict__ and __slots__; functions, methods, classes and modules
+are not followed, so a stored callback does not drag a whole panel in). Objects reachable from two
+subsystems are charged to the first one, so the rows add up to the total.
+The app shows this under File > Memory usage.
+
+  python mem_report.py                           bytes per record, raw OKX shapes vs compact ones
+  python mem_report.py --instruments 700 --bars 1440   plus the estimate for a whole-universe load
+
+Records are decoded from JSON text, like real pushes, so every string is owned by its record.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from types import BuiltinFunctionType, CodeType, FrameType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable
+
+_LEAF = (str, bytes, bytearray, int, float, bool, complex, array, type(None))
+_SKIP = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, CodeType, FrameType)
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """Bytes of obj and everything it holds that is not already in seen (updated in place)."""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, _LEAF):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if isinstance(d, dict):
+                stack.append(d)
+            for cls in type(o).__mro__:
+                slots = cls.__dict__.get("__slots__", ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    if name not in ("__dict__", "__weakref__") and hasattr(o, name):
+                        stack.append(getattr(o, name))
+    return total
+
+
+# name -> () -> (object to account, record count)
+Sections = dict[str, Callable[[], tuple[Any, int]]]
+
+
+def measure(sections: Sections) -> list[tuple[str, int, int]]:
+    """(name, bytes, records) per section, in order; a section whose getter fails is left out."""
+    seen: set[int] = set()
+    out = []
+    for name, get in sections.items():
+        try:
+            obj, n = get()
+        except Exception:
+            continue
+        out.append((name, deep_sizeof(obj, seen), n))
+    return out
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_report(rows: list[tuple[str, int, int]]) -> str:
+    lines = [f"{'Subsystem':<22}{'Bytes':>11}{'Records':>10}{'B/record':>10}"]
+    for name, size, n in rows:
+        lines.append(f"{name:<22}{fmt_bytes(size):>11}{n:>10}{(f'{size / n:.0f}' if n else '—'):>10}")
+    lines.append(f"{'Total':<22}{fmt_bytes(sum(r[1] for r in rows)):>11}")
+    return "\n".join(lines)
+
+
+# --- Raw vs compact, per record ---
+
+def _per_record(make: Callable[[], tuple[Any, int]]) -> float:
+    obj, n = make()
+    return deep_sizeof(obj) / max(1, n)
+
+
+def compare(sample: int = 20) -> list[tuple[str, float, float]]:
+    """(entity, raw bytes/record, compact bytes/record) on mock_okx data."""
+    os.environ.setdefault("OKX_CANDLE_DB", "")
+    import mock_okx
+    from candle_buffer import CandleBuffer
+    from open_orders import OpenOrders
+    from ticker_store import TickerStore
+
+    ex = mock_okx.MockExchange(sample, seed=1)
+    now_ms = int(time.time() * 1000)
+    for inst in ex.instruments.values():
+        for _ in range(30):
+            inst.step(ex.rng, now_ms)
+    tickers = json.dumps([inst.ticker(now_ms) for inst in ex.instruments.values()])
+    candles = json.dumps(next(iter(ex.instruments.values())).candles_for("1m"))
+    trades = json.dumps([t for inst in ex.instruments.values() for t in inst.trades[:30]])
+    orders = []
+    for inst in ex.instruments.values():
+        px = float(inst.fmt(inst.last * 0.5))
+        _, _, order = ex.place({"instId": inst.inst_id, "side": "buy", "ordType": "limit", "px": inst.fmt(px),
+                                "sz": f"{inst.lot:.8f}".rstrip("0").rstrip(".")})
+        if order:
+            orders.append(order)
+    orders = json.dumps(orders)
+
+    def store():
+        st = TickerStore()
+        st.load(json.loads(tickers))
+        return st, len(st)
+
+    def buffer():
+        rows = json.loads(candles)
+        b = CandleBuffer(len(rows))
+        b.set_rows(rows)
+        return b, len(b)
+
+    def open_orders():
+        oo = OpenOrders()
+        oo.load(json.loads(orders))
+        return oo, len(oo)
+
+    def raw(text):
+        return lambda: (json.loads(text), len(json.loads(text)))
+
+    out = [
+        ("ticker", _per_record(raw(tickers)), _per_record(store)),
+        ("candle", _per_record(raw(candles)), _per_record(buffer)),
+        ("order", _per_record(raw(orders)), _per_record(open_orders)),
+    ]
+    try:  # the terminal's own records (it needs requests and websocket-client)
+        import terminal_btc
+    except ImportError:
+        return out
+    out.append(("trade (terminal)", _per_record(raw(trades)),
+                _per_record(lambda: (tuple(map(terminal_btc.trade_of, json.loads(trades))), len(json.loads(trades))))))
+    out.append(("ticker (terminal)", _per_record(raw(tickers)),
+                _per_record(lambda: ([terminal_btc.ticker_of(d) for d in json.loads(tickers)], sample))))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bytes per record, raw vs compact, and a whole-universe estimate")
+    ap.add_argument("--instruments", type=int, default=700, help="instruments streamed (default 700)")
+    ap.add_argument("--bars", type=int, default=1440, help="1m bars kept per instrument (default 1440)")
+    ap.add_argument("--sample", type=int, default=20, help="mock instruments measured (default 20)")
+    args = ap.parse_args()
+    rows = compare(args.sample)
+    print(f"{'Record':<20}{'Raw B':>9}{'Compact B':>11}{'Ratio':>8}")
+    for name, raw_b, compact_b in rows:
+        print(f"{name:<20}{raw_b:>9.0f}{compact_b:>11.0f}{raw_b / compact_b:>7.1f}x")
+    per = {name: (raw_b, compact_b) for name, raw_b, compact_b in rows}
+    n_bars = args.instruments * args.bars
+    print(f"\n{args.instruments} instruments, {args.bars} bars each:")
+    for label, (raw_b, compact_b), n in (("tickers", per["ticker"], args.instruments), ("candles", per["candle"], n_bars)):
+        print(f"  {label:<8}{n:>10} records  raw {fmt_bytes(raw_b * n):>10}  compact {fmt_bytes(compact_b * n):>10}")
+
+
+if __name__ == "__main__":
+    main()
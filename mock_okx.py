@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the OKX v5 API this project uses, for integration and load testing.
+One port serves REST (/api/v5/...) and WebSocket (/ws/v5/public, /ws/v5/private; minimal RFC 6455
+on the stdlib via ws_local.py, no extra dependency). Prices are synthetic random walks emitted at a configurable
+rate across many instruments; a small matching engine fills spot orders against the synthetic last
+price (limit orders fill in two halves, so partially_filled pushes are exercised too).
+
+Run:  python mock_okx.py --port 8765 --rate 5000 --instruments 200
+Then: OKX_REST_BASE=http://127.0.0.1:8765 OKX_WS_PUBLIC=ws://127.0.0.1:8765/ws/v5/public \\
+      OKX_WS_PRIVATE=ws://127.0.0.1:8765/ws/v5/private python run.py
+Any API key/secret/passphrase is accepted (set them to enable the private stream).
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from decimal import Decimal, ROUND_FLOOR
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import ws_local
+from ws_local import WsClient, ws_frame
+
+MAJORS = ["BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "TRX", "LINK", "AVAX", "DOT", "LTC", "BCH", "TON", "OKB"]
+CHANNELS = ("tickers", "trades", "books5", "candle1m")  # one synthetic message per tick, in rotation
+HISTORY_MINUTES = 1440
+
+
+# --- Market model ---
+
+class Instrument:
+    __slots__ = ("inst_id", "base", "quote", "tick", "lot", "decimals", "last", "open24h", "high24h",
+                 "low24h", "vol24h", "candles", "closed", "trades", "seq")
+
+    def __init__(self, inst_id: str, price: float, rng: random.Random):
+        self.inst_id = inst_id
+        self.base, self.quote = inst_id.split("-")
+        self.decimals = max(0, min(8, 4 - int(math.floor(math.log10(price)))))
+        self.tick = 10 ** -self.decimals
+        self.lot = 10 ** -max(0, min(8, int(math.floor(math.log10(price))) + 2))
+        self.last = price
+        self.open24h = self.high24h = self.low24h = price
+        self.vol24h = 0.0
+        self.candles: list[list[float]] = []  # closed + live 1m bars [ts, o, h, l, c, vol], oldest first
+        self.closed: list[float] | None = None  # bar that just closed, until its confirm push goes out
+        self.trades: list[dict] = []  # newest first
+        self.seq = itertools.count(1)
+        self._backfill(rng)
+
+    def fmt(self, px: float) -> str:
+        return f"{px:.{self.decimals}f}"
+
+    def _backfill(self, rng: random.Random):
+        now = int(time.time() * 1000)
+        start = now - now % 60000 - HISTORY_MINUTES * 60000
+        px = self.last
+        for i in range(HISTORY_MINUTES + 1):
+            o = px
+            h = l = o
+            for _ in range(4):
+                px *= math.exp(rng.gauss(0, 0.001))
+                h, l = max(h, px), min(l, px)
+            self.candles.append([start + i * 60000, o, h, l, px, rng.uniform(1, 100)])
+        self.last = px
+        day = self.candles[-1440:]
+        self.open24h = day[0][1]
+        self.high24h = max(c[2] for c in day)
+        self.low24h = min(c[3] for c in day)
+        self.vol24h = sum(c[5] for c in day)
+
+    def step(self, rng: random.Random, now_ms: int) -> tuple[float, str]:
+        """Advance the random walk one trade; returns (size, side)."""
+        self.last = max(self.tick, self.last * math.exp(rng.gauss(0, 0.0004)))
+        sz = rng.expovariate(1.0) * self.lot * 100
+        side = "buy" if rng.random() < 0.5 else "sell"
+        self.high24h = max(self.high24h, self.last)
+        self.low24h = min(self.low24h, self.last)
+        self.vol24h += sz
+        minute = now_ms - now_ms % 60000
+        bar = self.candles[-1]
+        if bar[0] < minute:
+            self.closed = bar
+            self.candles.append([minute, self.last, self.last, self.last, self.last, 0.0])
+            if len(self.candles) > HISTORY_MINUTES * 2:
+                del self.candles[:HISTORY_MINUTES]
+            bar = self.candles[-1]
+        bar[2], bar[3], bar[4] = max(bar[2], self.last), min(bar[3], self.last), self.last
+        bar[5] += sz
+        self.trades.insert(0, {
+            "instId": self.inst_id, "tradeId": str(next(self.seq)), "px": self.fmt(self.last),
+            "sz": f"{sz:.8f}", "side": side, "ts": str(now_ms),
+        })
+        del self.trades[100:]
+        return sz, side
+
+    def ticker(self, now_ms: int) -> dict:
+        spread = self.tick
+        return {
+            "instType": "SPOT", "instId": self.inst_id, "last": self.fmt(self.last),
+            "lastSz": self.trades[0]["sz"] if self.trades else "0",
+            "askPx": self.fmt(self.last + spread), "askSz": "1", "bidPx": self.fmt(self.last), "bidSz": "1",
+            "open24h": self.fmt(self.open24h), "high24h": self.fmt(self.high24h), "low24h": self.fmt(self.low24h),
+            "volCcy24h": f"{self.vol24h * self.last:.2f}", "vol24h": f"{self.vol24h:.4f}",
+            "sodUtc0": self.fmt(self.open24h), "sodUtc8": self.fmt(self.open24h), "ts": str(now_ms),
+        }
+
+    def book(self, depth: int, now_ms: int) -> dict:
+        px = self.last
+        bids = [[self.fmt(px - i * self.tick), f"{1 + (i * 7) % 13:.4f}", "0", str(1 + i % 3)] for i in range(depth)]
+        asks = [[self.fmt(px + (i + 1) * self.tick), f"{1 + (i * 5) % 11:.4f}", "0", str(1 + i % 4)] for i in range(depth)]
+        return {"asks": asks, "bids": bids, "ts": str(now_ms)}
+
+    def candle_row(self, bar: list, confirm: str) -> list[str]:
+        vol = f"{bar[5]:.8f}"
+        quote = f"{bar[5] * bar[4]:.2f}"
+        return [str(bar[0]), self.fmt(bar[1]), self.fmt(bar[2]), self.fmt(bar[3]), self.fmt(bar[4]), vol, quote, quote, confirm]
+
+    def candles_for(self, bar: str) -> list[list[str]]:
+        """All stored bars for `bar` (aggregated from 1m), newest first; the live bar has confirm "0"."""
+        # imported here: candle_resample pulls in config, which must see the OKX_* overrides first
+        from candle_resample import BAR_MINUTES, bar_ms, bucket_start
+        if bar.removesuffix("utc") not in BAR_MINUTES:
+            return []
+        if bar == "1m":
+            rows = self.candles
+        else:
+            rows = []
+            for ts, o, h, l, c, v in self.candles:
+                start = bucket_start(ts, bar)
+                if rows and rows[-1][0] == start:
+                    r = rows[-1]
+                    r[2], r[3], r[4], r[5] = max(r[2], h), min(r[3], l), c, r[5] + v
+                else:
+                    rows.append([start, o, h, l, c, v])
+        now_ms = int(time.time() * 1000)
+        out = []
+        for i, r in enumerate(reversed(rows)):
+            live = i == 0 and (bar == "1m" or r[0] + bar_ms(bar) > now_ms)
+            out.append(self.candle_row(r, "0" if live else "1"))
+        return out
+
+
+# --- Exchange ---
+
+def _ok(data: list) -> dict:
+    return {"code": "0", "msg": "", "data": data}
+
+
+def _err(code: str, msg: str, data: list | None = None) -> dict:
+    return {"code": code, "msg": msg, "data": data or []}
+
+
+class MockExchange:
+    def __init__(self, instruments: int = 50, rate: float = 1000.0, seed: int | None = None, hot: float = 0.0):
+        """hot: share of ticks sent to the first instrument (BTC-USDT), which is what the UIs watch."""
+        self.rng = random.Random(seed)
+        self.rate = rate
+        self.hot = hot
+        self.instruments: dict[str, Instrument] = {}
+        names = MAJORS + [f"T{i:04d}" for i in range(max(0, instruments - len(MAJORS)))]
+        for base in names[:instruments]:
+            price = 60000.0 if base == "BTC" else 10 ** self.rng.uniform(-3, 4)
+            inst_id = f"{base}-USDT"
+            self.instruments[inst_id] = Instrument(inst_id, price, self.rng)
+        self._ids = list(self.instruments)
+        self.balances: dict[str, list[Decimal]] = {"USDT": [Decimal("1000000"), Decimal(0)]}  # ccy -> [avail, frozen]
+        for base in names[:instruments]:
+            self.balances[base] = [Decimal("100"), Decimal(0)]
+        self.orders: dict[str, dict] = {}  # open orders by ordId
+        self._resting: dict[str, list[str]] = {}  # instId -> open ordIds
+        self._ord_seq = itertools.count(int(time.time()) * 1000)
+        self._subs: dict[tuple[str, str], set[WsClient]] = {}
+        self._clients: set[WsClient] = set()
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self.generated = 0
+        self.published = 0
+
+    # --- Subscriptions ---
+
+    @staticmethod
+    def _key(arg: dict) -> tuple[str, str]:
+        return arg.get("channel", ""), arg.get("instId") or arg.get("instType") or ""
+
+    def connect(self, client: WsClient):
+        with self._lock:
+            self._clients.add(client)
+
+    def disconnect(self, client: WsClient):
+        with self._lock:
+            self._clients.discard(client)
+            for subs in self._subs.values():
+                subs.discard(client)
+
+    def subscribe(self, client: WsClient, arg: dict) -> str | None:
+        """Returns an error message, or None on success."""
+        channel, key = self._key(arg)
+        if channel == "orders":
+            if not client.logged_in:
+                return "Please log in"
+        elif channel in ("tickers", "trades", "books5", "books") or channel.startswith("candle"):
+            if key not in self.instruments:
+                return f"Wrong URL or channel:{channel},instId:{key} doesn't exist"
+        else:
+            return f"Wrong URL or channel:{channel} doesn't exist"
+        with self._lock:
+            self._subs.setdefault((channel, key), set()).add(client)
+        now_ms = int(time.time() * 1000)
+        inst = self.instruments.get(key)
+        if channel in ("books5", "books") and inst:
+            client.send_json({"arg": arg, "action": "snapshot", "data": [inst.book(5 if channel == "books5" else 20, now_ms)]})
+        return None
+
+    def unsubscribe(self, client: WsClient, arg: dict):
+        with self._lock:
+            subs = self._subs.get(self._key(arg))
+            if subs:
+                subs.discard(client)
+
+    def clients(self) -> list[WsClient]:
+        with self._lock:
+            return list(self._clients)
+
+    def _publish(self, channel: str, key: str, arg: dict, item):
+        subs = self._subs.get((channel, key))
+        if not subs:
+            return
+        frame = ws_frame(json.dumps({"arg": arg, "data": [item]}, separators=(",", ":")).encode("utf-8"))
+        for client in list(subs):
+            client.push(frame)
+            self.published += 1
+
+    # --- Synthetic feed ---
+
+    def start(self):
+        threading.Thread(target=self._feed_loop, daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _feed_loop(self):
+        """Emit `rate` messages per second in 5 ms slices. Each tick is one channel of one instrument;
+        every instrument rotates through the channels on its own, so each gets all of them whatever the
+        instrument count."""
+        t0 = time.perf_counter()
+        done = 0
+        ids = itertools.cycle(self._ids)
+        turn = dict.fromkeys(self._ids, 0)  # instId -> index of its next channel
+        rnd, hot, first = self.rng.random, self.hot, self._ids[0]
+        while not self._stopped.is_set():
+            due = int((time.perf_counter() - t0) * self.rate) - done
+            if due <= 0:
+                time.sleep(0.005)
+                continue
+            due = min(due, max(1, int(self.rate)))  # never try to catch up more than a second
+            now_ms = int(time.time() * 1000)
+            with self._lock:
+                for _ in range(due):
+                    inst_id = first if hot and rnd() < hot else next(ids)
+                    i = turn[inst_id]
+                    turn[inst_id] = (i + 1) % len(CHANNELS)
+                    self._tick(self.instruments[inst_id], CHANNELS[i], now_ms)
+            done += due
+            self.generated += due
+
+    def _tick(self, inst: Instrument, channel: str, now_ms: int):
+        inst.step(self.rng, now_ms)
+        inst_id = inst.inst_id
+        if inst.closed is not None:
+            if ("candle1m", inst_id) in self._subs:
+                self._publish("candle1m", inst_id, {"channel": "candle1m", "instId": inst_id},
+                              inst.candle_row(inst.closed, "1"))
+            inst.closed = None
+        if channel == "tickers":
+            if ("tickers", inst_id) in self._subs:
+                self._publish("tickers", inst_id, {"channel": "tickers", "instId": inst_id}, inst.ticker(now_ms))
+        elif channel == "trades":
+            if ("trades", inst_id) in self._subs:
+                self._publish("trades", inst_id, {"channel": "trades", "instId": inst_id}, inst.trades[0])
+        elif channel == "books5":
+            if ("books5", inst_id) in self._subs:
+                self._publish("books5", inst_id, {"channel": "books5", "instId": inst_id}, inst.book(5, now_ms))
+        else:
+            if ("candle1m", inst_id) in self._subs:
+                self._publish("candle1m", inst_id, {"channel": "candle1m", "instId": inst_id},
+                              inst.candle_row(inst.candles[-1], "0"))
+        if inst_id in self._resting:
+            self._match(inst, now_ms)
+
+    # --- Matching engine ---
+
+    def _order_push(self, order: dict):
+        self._publish("orders", "SPOT", {"channel": "orders", "instType": "SPOT"}, dict(order))
+
+    def place(self, args: dict) -> tuple[str, str, dict | None]:
+        """-> (sCode, sMsg, order)"""
+        inst = self.instruments.get(args.get("instId", ""))
+        if inst is None:
+            return "51001", "Instrument ID does not exist", None
+        side, ord_type = args.get("side"), args.get("ordType")
+        if side not in ("buy", "sell") or ord_type not in ("limit", "market"):
+            return "51000", "Parameter side or ordType error", None
+        try:
+            sz = Decimal(str(args.get("sz")))
+            px = Decimal(str(args.get("px"))) if ord_type == "limit" else None
+        except Exception:
+            return "51000", "Parameter sz or px error", None
+        if sz <= 0 or (px is not None and px <= 0):
+            return "51000", "Parameter sz or px error", None
+        rec = self.instrument_record(inst)
+        tick, lot = Decimal(rec["tickSz"]), Decimal(rec["lotSz"])
+        if px is not None and px % tick:
+            return "51006", f"Order price is not a multiple of tickSz {rec['tickSz']}", None
+        quote_sized = ord_type == "market" and side == "buy"
+        if not quote_sized and sz % lot:
+            return "51121", f"Order quantity must be a multiple of lotSz {rec['lotSz']}", None
+        last = Decimal(inst.fmt(inst.last))
+        with self._lock:
+            if side == "buy":
+                ccy, need = inst.quote, sz if quote_sized else (px or last) * sz
+            else:
+                ccy, need = inst.base, sz
+            bal = self.balances.setdefault(ccy, [Decimal(0), Decimal(0)])
+            if need > bal[0]:
+                return "51008", f"Order failed. Insufficient {ccy} balance", None
+            bal[0] -= need
+            bal[1] += need
+            now_ms = str(int(time.time() * 1000))
+            order = {
+                "instType": "SPOT", "instId": inst.inst_id, "ordId": str(next(self._ord_seq)), "clOrdId": args.get("clOrdId", ""),
+                "side": side, "ordType": ord_type, "tdMode": args.get("tdMode", "cash"), "px": str(px or ""),
+                "sz": str(sz), "accFillSz": "0", "fillSz": "0", "fillPx": "", "avgPx": "", "state": "live",
+                "frozen": str(need), "cTime": now_ms, "uTime": now_ms,
+            }
+            self.orders[order["ordId"]] = order
+            self._resting.setdefault(inst.inst_id, []).append(order["ordId"])
+            self._order_push(order)
+            if ord_type == "market" or (side == "buy" and px >= last) or (side == "sell" and px <= last):
+                self._fill(inst, order, last, full=True)
+        return "0", "Order placed", order
+
+    def cancel(self, args: dict) -> tuple[str, str, dict | None]:
+        with self._lock:
+            order = self.orders.get(args.get("ordId", ""))
+            if order is None or order["instId"] != args.get("instId"):
+                return "51400", "Order cancellation failed as the order has been filled, canceled or does not exist", None
+            self._close(order, "canceled")
+        return "0", "Order cancelled", order
+
+    def _match(self, inst: Instrument, now_ms: int):
+        last = Decimal(inst.fmt(inst.last))
+        for ord_id in list(self._resting.get(inst.inst_id, ())):
+            order = self.orders.get(ord_id)
+            if order is None:
+                continue
+            px = Decimal(order["px"])
+            if (order["side"] == "buy" and last <= px) or (order["side"] == "sell" and last >= px):
+                self._fill(inst, order, px, full=order["state"] == "partially_filled")
+
+    def _fill(self, inst: Instrument, order: dict, px: Decimal, full: bool):
+        sz, filled = Decimal(order["sz"]), Decimal(order["accFillSz"])
+        quote_sized = order["ordType"] == "market" and order["side"] == "buy"
+        total = (sz / px).quantize(Decimal("1e-8"), ROUND_FLOOR) if quote_sized else sz
+        qty = total - filled if full else (total / 2).quantize(Decimal("1e-8"), ROUND_FLOOR) or total
+        filled += qty
+        base = self.balances.setdefault(inst.base, [Decimal(0), Decimal(0)])
+        quote = self.balances.setdefault(inst.quote, [Decimal(0), Decimal(0)])
+        frozen = Decimal(order["frozen"])
+        if order["side"] == "buy":
+            cost = sz if quote_sized else qty * px
+            release = sz if quote_sized else qty * Decimal(order["px"] or px)
+            quote[1] -= release
+            quote[0] += release - cost
+            base[0] += qty
+        else:
+            release = qty
+            base[1] -= qty
+            quote[0] += qty * px
+        order["frozen"] = str(frozen - release)
+        prev_cost = Decimal(order["avgPx"] or 0) * (filled - qty)
+        order.update({
+            "accFillSz": str(filled), "fillSz": str(qty), "fillPx": str(px),
+            "avgPx": str((prev_cost + qty * px) / filled), "uTime": str(int(time.time() * 1000)),
+        })
+        if filled >= total:
+            self._close(order, "filled")
+        else:
+            order["state"] = "partially_filled"
+            self._order_push(order)
+
+    def _close(self, order: dict, state: str):
+        frozen = Decimal(order["frozen"])
+        if frozen:
+            inst = self.instruments[order["instId"]]
+            bal = self.balances[inst.quote if order["side"] == "buy" else inst.base]
+            bal[1] -= frozen
+            bal[0] += frozen
+            order["frozen"] = "0"
+        order["state"] = state
+        order["uTime"] = str(int(time.time() * 1000))
+        self.orders.pop(order["ordId"], None)
+        resting = self._resting.get(order["instId"])
+        if resting and order["ordId"] in resting:
+            resting.remove(order["ordId"])
+            if not resting:
+                del self._resting[order["instId"]]
+        self._order_push(order)
+
+    # --- REST ---
+
+    def instrument_record(self, inst: Instrument) -> dict:
+        lot = f"{inst.lot:.8f}".rstrip("0").rstrip(".")
+        return {
+            "instType": "SPOT", "instId": inst.inst_id, "baseCcy": inst.base, "quoteCcy": inst.quote,
+            "tickSz": inst.fmt(inst.tick), "lotSz": lot, "minSz": lot,
+            "maxLmtSz": "10000000", "maxMktSz": "1000000", "state": "live",
+        }
+
+    def rest(self, method: str, path: str, params: dict, body: dict | None) -> dict:
+        now_ms = int(time.time() * 1000)
+        inst = self.instruments.get(params.get("instId", ""))
+        with self._lock:
+            if path == "/api/v5/public/instruments":
+                return _ok([self.instrument_record(i) for i in self.instruments.values()])
+            if path == "/api/v5/market/tickers":
+                return _ok([i.ticker(now_ms) for i in self.instruments.values()])
+            if path == "/api/v5/trade/orders-pending":
+                return _ok([dict(o) for o in self.orders.values()
+                            if not params.get("instId") or o["instId"] == params["instId"]])
+            if path == "/api/v5/account/balance":
+                details = [{"ccy": c, "availBal": str(a), "frozenBal": str(f), "cashBal": str(a + f), "eq": str(a + f)}
+                           for c, (a, f) in self.balances.items() if not params.get("ccy") or c == params["ccy"]]
+                return _ok([{"uTime": str(now_ms), "details": details}])
+            if path in ("/api/v5/trade/order", "/api/v5/trade/cancel-order"):
+                if method != "POST":
+                    return _err("50000", "POST required")
+                s_code, s_msg, order = (self.place if path.endswith("/order") else self.cancel)(body or {})
+                item = {"ordId": order["ordId"] if order else "", "clOrdId": (body or {}).get("clOrdId", ""),
+                        "sCode": s_code, "sMsg": s_msg}
+                return {"code": "0" if s_code == "0" else "1", "msg": "" if s_code == "0" else "Operation failed.", "data": [item]}
+            if not path.startswith("/api/v5/market/"):
+                return _err("50014", f"Unknown endpoint {path}")
+            if inst is None:
+                return _err("51001", "Instrument ID does not exist")
+            if path == "/api/v5/market/ticker":
+                return _ok([inst.ticker(now_ms)])
+            if path == "/api/v5/market/books":
+                return _ok([inst.book(min(400, int(params.get("sz") or 1)), now_ms)])
+            if path == "/api/v5/market/trades":
+                return _ok(inst.trades[:min(500, int(params.get("limit") or 100))])
+            if path in ("/api/v5/market/candles", "/api/v5/market/history-candles"):
+                rows = inst.candles_for(params.get("bar") or "1m")
+                if params.get("after"):
+                    rows = [r for r in rows if int(r[0]) < int(params["after"])]
+                if params.get("before"):
+                    rows = [r for r in rows if int(r[0]) > int(params["before"])]
+                return _ok(rows[:min(300, int(params.get("limit") or 100))])
+        return _err("50014", f"Unknown endpoint {path}")
+
+
+# --- HTTP / WS server ---
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    exchange: MockExchange  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.headers.get("Upgrade", "").lower() == "websocket":
+            self._websocket()
+        else:
+            self._rest("GET")
+
+    def do_POST(self):
+        self._rest("POST")
+
+    def _rest(self, method: str):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = {}
+        try:
+            out = self.exchange.rest(method, url.path, params, body)
+        except (ValueError, TypeError) as e:
+            out = _err("50000", str(e))
+        payload = json.dumps(out).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _websocket(self):
+        ws_local.accept(self)
+        client = WsClient(self.wfile, private=urlparse(self.path).path.endswith("/private"))
+        self.exchange.connect(client)
+        try:
+            ws_local.serve(self, client, lambda text: self._ws_text(client, text))
+        finally:
+            self.exchange.disconnect(client)
+            client.close()
+
+    def _ws_text(self, client: WsClient, text: str):
+        if text == "ping":
+            client.push(ws_frame(b"pong"))
+            return
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            client.send_json({"event": "error", "code": "60012", "msg": f"Illegal request: {text[:100]}"})
+            return
+        op, args = msg.get("op"), msg.get("args") or []
+        ex = self.exchange
+        if op == "login":
+            client.logged_in = client.private
+            if client.logged_in:
+                client.send_json({"event": "login", "code": "0", "msg": "", "connId": "mock"})
+            else:
+                client.send_json({"event": "error", "code": "60011", "msg": "Login is not supported on the public channel"})
+        elif op in ("subscribe", "unsubscribe"):
+            for arg in args:
+                if op == "subscribe":
+                    error = ex.subscribe(client, arg)
+                    if error:
+                        client.send_json({"event": "error", "code": "60018", "msg": error, "connId": "mock"})
+                        continue
+                else:
+                    ex.unsubscribe(client, arg)
+                client.send_json({"event": op, "arg": arg, "connId": "mock"})
+        elif op in ("order", "cancel-order"):
+            if not client.logged_in:
+                client.send_json({"event": "error", "code": "60011", "msg": "Please log in"})
+                return
+            data = []
+            for arg in args:
+                s_code, s_msg, order = (ex.place if op == "order" else ex.cancel)(arg)
+                data.append({"ordId": order["ordId"] if order else "", "clOrdId": arg.get("clOrdId", ""), "sCode": s_code, "sMsg": s_msg})
+            ok = all(d["sCode"] == "0" for d in data)
+            client.send_json({"id": msg.get("id", ""), "op": op, "code": "0" if ok else "1", "msg": "", "data": data})
+        else:
+            client.send_json({"event": "error", "code": "60012", "msg": f"Illegal request: {text[:100]}"})
+
+
+def make_server(exchange: MockExchange, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Bind (port 0 picks a free one) without serving yet; call serve_forever() on a thread."""
+    handler = type("MockOKXHandler", (_Handler,), {"exchange": exchange})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def env_for(server: ThreadingHTTPServer) -> dict[str, str]:
+    """Environment that points config.py / terminal_btc.py at this server."""
+    host, port = server.server_address[:2]
+    return {
+        "OKX_REST_BASE": f"http://{host}:{port}",
+        "OKX_WS_PUBLIC": f"ws://{host}:{port}/ws/v5/public",
+        "OKX_WS_PRIVATE": f"ws://{host}:{port}/ws/v5/private",
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline mock OKX exchange (REST + WS)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--rate", type=float, default=1000, help="synthetic messages per second (all instruments)")
+    ap.add_argument("--instruments", type=int, default=50)
+    ap.add_argument("--hot", type=float, default=0.0, help="share of messages for BTC-USDT (0-1)")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+    exchange = MockExchange(args.instruments, args.rate, args.seed, args.hot)
+    server = make_server(exchange, args.host, args.port)
+    exchange.start()
+    for k, v in env_for(server).items():
+        print(f"export {k}={v}")
+    print(f"{len(exchange.instruments)} instruments, {args.rate:g} msgs/s. Ctrl+C to stop.")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        while True:
+            time.sleep(5)
+            clients = exchange.clients()
+            print(f"generated={exchange.generated} published={exchange.published} clients={len(clients)} "
+                  f"dropped={sum(c.dropped for c in clients)}")
+    except KeyboardInterrupt:
+        pass
+    exchange.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,11 @@ def _sign(timestamp: str, method: str, path: str, body: str = "") -> str:
     return base64.b64encode(sig).decode("utf-8")
 
 
+def _query_string(params: dict[str, Any]) -> str:
+    """Sorted k=v pairs, empty values dropped; the signed path must match the sent URL exactly."""
+    return "&".join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None and v != "")
+
+
 def _request(
     method: str,
     path: str,
@@ -39,7 +44,7 @@ def _request(
     body = ""
     if data is not None:
         body = json.dumps(data)
-    qs = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None and v != "")
+    qs = _query_string(params)
     if qs:
         path_with_qs = path + "?" + qs
     else:
@@ -102,6 +107,62 @@ def get_candles(
     return out.get("data", [])
 
 
+def get_candles_paged(
+    inst_id: str,
+    bar: str = "1m",
+    count: int = 300,
+    after: str | None = None,
+    since: int | None = None,
+) -> list[list]:
+    """
+    Page get_candles backwards from `after` (or now) until `count` rows. Newest first, like get_candles.
+    since: only bars with ts > since, e.g. after the last bar already cached. These are asked for with
+    `before`, so a warm cache downloads just the new bars, not a full page.
+    """
+    if since is not None:
+        return _candles_since(inst_id, bar, count, since)
+    out: list[list] = []
+    while len(out) < count:
+        limit = min(300, count - len(out))
+        page = get_candles(inst_id, bar=bar, after=after, limit=limit)
+        if not page:
+            break
+        out.extend(page)
+        after = str(page[-1][0])
+        if len(page) < limit:
+            break
+    return out[:count]
+
+
+def _candles_since(inst_id: str, bar: str, count: int, since: int) -> list[list]:
+    """Bars newer than since, newest first. Pages forward (before=newest seen) while pages come back
+    full; below each full page, the range down to since is paged backwards too, so bars are not skipped
+    whichever end of the range the exchange answers `before` with."""
+    by_ts: dict[int, list] = {}
+
+    def take(page: list) -> int:
+        n = len(by_ts)
+        for r in page:
+            ts = int(r[0])
+            if ts > since:
+                by_ts.setdefault(ts, r)
+        return len(by_ts) - n
+
+    before = since
+    while len(by_ts) < count:
+        page = get_candles(inst_id, bar=bar, before=str(before), limit=300)
+        if not take(page) or len(page) < 300:
+            break
+        after = min(int(r[0]) for r in page)
+        while len(by_ts) < count:
+            below = get_candles(inst_id, bar=bar, after=str(after), before=str(since), limit=300)
+            if not take(below) or len(below) < 300:
+                break
+            after = min(int(r[0]) for r in below)
+        before = max(int(r[0]) for r in page)
+    return [by_ts[ts] for ts in sorted(by_ts, reverse=True)][:count]
+
+
 # --- Private (trading) ---
 
 def place_order(
@@ -1,6 +1,6 @@
 """
 OKX API v5 WebSocket client: public (tickers, candlestick) and private (login, orders).
-Runs in a background thread; callbacks receive parsed data.
+Runs in a background thread; callbacks receive parsed data, with the push's md_latency Stamp.
 """
 import base64
 import hashlib
@@ -13,6 +13,8 @@ from typing import Any, Callable
 import websocket
 
 from config import get_ws_public_url, get_ws_private_url, API_KEY, SECRET_KEY, PASSPHRASE
+from md_latency import get_latency_meter
+from md_record import get_recorder
 
 
 def _sign_ws(timestamp: str) -> str:
@@ -25,8 +27,19 @@ def _sign_ws(timestamp: str) -> str:
     return base64.b64encode(sig).decode("utf-8")
 
 
+class WsFatalError(RuntimeError):
+    """An error reconnecting will not cure, such as a rejected login; other errors just precede a reconnect."""
+
+
 class OKXWebSocket:
-    """Single connection: public or private. Subscribe and receive via callbacks."""
+    """
+    Single connection: public or private. Subscribe and receive via callbacks.
+    Reconnects after a drop and replays subscriptions; on_open fires each time the connection is
+    ready (after login for private), so callers can resync state that may have been missed.
+    """
+
+    RECONNECT_DELAY = 3.0
+    SUB_BATCH = 100  # args per (un)subscribe request: OKX limits requests per connection, not args
 
     def __init__(
         self,
@@ -42,20 +55,33 @@ class OKXWebSocket:
         self._ws: websocket.WebSocketApp | None = None
         self._thread: threading.Thread | None = None
         self._running = False
+        self._stopped = False
+        self._ready = False  # connected (and logged in, for private)
+        self._subs: dict[str, dict] = {}  # key -> subscribe arg, replayed on (re)connect
         self._last_pong = 0.0
+        self._recorder = get_recorder()  # tees raw frames to disk when OKX_RECORD_DIR is set
+        self._source = "priv" if private else "pub"
+        self._meter = get_latency_meter()
 
     def _run(self):
         url = get_ws_private_url() if self.private else get_ws_public_url()
-        self._ws = websocket.WebSocketApp(
-            url,
-            on_open=self._on_open,
-            on_message=self._on_message,
-            on_error=lambda ws, err: self.on_error(err),
-            on_close=lambda ws, code, msg: None,
-        )
-        self._running = True
-        self._ws.run_forever(ping_interval=25, ping_timeout=10)
-        self._running = False
+        while not self._stopped:
+            self._ws = websocket.WebSocketApp(
+                url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=lambda ws, err: self.on_error(err),
+                on_close=lambda ws, code, msg: None,
+            )
+            self._running = True
+            try:
+                self._ws.run_forever(ping_interval=25, ping_timeout=10)
+            except Exception as e:
+                self.on_error(e)
+            self._running = False
+            self._ready = False
+            if not self._stopped:
+                time.sleep(self.RECONNECT_DELAY)
 
     def _on_open(self, ws):
         if self.private and API_KEY and SECRET_KEY and PASSPHRASE:
@@ -76,9 +102,18 @@ class OKXWebSocket:
                     }
                 )
             )
+            return  # subscriptions are replayed once the login is acknowledged
+        self._set_ready()
+
+    def _set_ready(self):
+        self._ready = True
+        self._send_batched("subscribe", list(self._subs.values()))
         self.on_open()
 
     def _on_message(self, ws, raw: str):
+        recv = time.time() * 1000 if self._meter.enabled else 0.0
+        if self._recorder:
+            self._recorder.record(self._source, raw)
         try:
             if raw == "pong":
                 self._last_pong = time.time()
@@ -86,12 +121,17 @@ class OKXWebSocket:
             data = json.loads(raw)
             if "event" in data:
                 # subscribe/unsubscribe/login etc
-                if data.get("event") == "login" and data.get("code") != "0":
-                    self.on_error(RuntimeError(data.get("msg", "Login failed")))
+                if data.get("event") == "login":
+                    if data.get("code") != "0":
+                        self.on_error(WsFatalError(data.get("msg", "Login failed")))
+                    else:
+                        self._set_ready()
                 return
             if "data" in data and isinstance(data["data"], list):
+                arg = data.get("arg", {})
+                stamp = self._meter.received(arg.get("channel", ""), arg.get("instId", ""), data["data"], recv)
                 for item in data["data"]:
-                    self.on_message({"arg": data.get("arg", {}), "data": item})
+                    self.on_message({"arg": arg, "data": item, "stamp": stamp})
             else:
                 self.on_message(data)
         except Exception as e:
@@ -100,11 +140,14 @@ class OKXWebSocket:
     def start(self):
         if self._thread and self._thread.is_alive():
             return
+        self._stopped = False
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def stop(self):
+        self._stopped = True
         self._running = False
+        self._ready = False
         if self._ws:
             try:
                 self._ws.close()
@@ -119,23 +162,44 @@ class OKXWebSocket:
             except Exception as e:
                 self.on_error(e)
 
+    def _send_batched(self, op: str, args: list[dict]):
+        for i in range(0, len(args), self.SUB_BATCH):
+            self.send({"op": op, "args": args[i:i + self.SUB_BATCH]})
+
+    def subscribe(self, args: list[dict]):
+        """Any channel args, e.g. [{"channel": "books5", "instId": "BTC-USDT"}]; sent in batches."""
+        for arg in args:
+            self._subs[json.dumps(arg, sort_keys=True)] = arg
+        if self._ready:
+            self._send_batched("subscribe", args)
+
+    def unsubscribe(self, args: list[dict]):
+        for arg in args:
+            self._subs.pop(json.dumps(arg, sort_keys=True), None)
+        if self._ready:
+            self._send_batched("unsubscribe", args)
+
+    def _subscribe(self, arg: dict):
+        self.subscribe([arg])
+
+    def _unsubscribe(self, arg: dict):
+        self.unsubscribe([arg])
+
     def subscribe_ticker(self, inst_id: str):
-        self.send({"op": "subscribe", "args": [{"channel": "tickers", "instId": inst_id}]})
+        self._subscribe({"channel": "tickers", "instId": inst_id})
 
     def unsubscribe_ticker(self, inst_id: str):
-        self.send({"op": "unsubscribe", "args": [{"channel": "tickers", "instId": inst_id}]})
+        self._unsubscribe({"channel": "tickers", "instId": inst_id})
 
     def subscribe_candle(self, inst_id: str, bar: str = "1m"):
         # channel: candle + bar e.g. candle1m
-        channel = "candle" + bar
-        self.send({"op": "subscribe", "args": [{"channel": channel, "instId": inst_id}]})
+        self._subscribe({"channel": "candle" + bar, "instId": inst_id})
 
     def unsubscribe_candle(self, inst_id: str, bar: str = "1m"):
-        channel = "candle" + bar
-        self.send({"op": "unsubscribe", "args": [{"channel": channel, "instId": inst_id}]})
+        self._unsubscribe({"channel": "candle" + bar, "instId": inst_id})
 
     def subscribe_orders(self, inst_type: str = "SPOT"):
-        self.send({"op": "subscribe", "args": [{"channel": "orders", "instType": inst_type}]})
+        self._subscribe({"channel": "orders", "instType": inst_type})
 
     def place_order_ws(self, inst_id: str, side: str, ord_type: str, sz: str, px: str | None = None, td_mode: str = "cash"):
         args = {"instId": inst_id, "tdMode": td_mode, "side": side, "ordType": ord_type, "sz": sz}
@@ -0,0 +1,86 @@
+"""
+OpenOrders: local open-orders model keyed by ordId, seeded from REST orders-pending and kept current
+by applying private WS `orders` pushes as deltas (new, partially filled, filled, cancelled).
+"""
+
+CLOSED_STATES = {"filled", "canceled", "mmp_canceled"}
+
+
+def _utime(d) -> int:
+    try:
+        return int(d.get("uTime") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Order:
+    """The fields of an OKX order the app reads, in slots: a raw order dict carries ~60 keys."""
+
+    __slots__ = ("ordId", "clOrdId", "instId", "side", "ordType", "px", "sz", "accFillSz", "avgPx", "state",
+                 "uTime")
+
+    def __init__(self, d: dict):
+        for f in self.__slots__:
+            setattr(self, f, str(d.get(f) or ""))
+
+    def update(self, d: dict):
+        """Apply a push; fields it does not carry keep their values."""
+        for f in self.__slots__:
+            if f in d:
+                setattr(self, f, str(d[f] or ""))
+
+    def get(self, name: str, default: str = "") -> str:
+        return getattr(self, name, "") or default
+
+
+class OpenOrders:
+    def __init__(self):
+        self._orders: dict[str, Order] = {}
+        self._ids: list[str] = []  # display order
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return (self._orders[i] for i in self._ids)
+
+    def __getitem__(self, index: int) -> Order:
+        return self._orders[self._ids[index]]
+
+    def get(self, ord_id: str) -> Order | None:
+        return self._orders.get(ord_id)
+
+    def load(self, data: list[dict]):
+        """Replace everything with a REST snapshot."""
+        self._orders = {}
+        self._ids = []
+        for d in data or []:
+            ord_id = d.get("ordId")
+            if ord_id and d.get("state") not in CLOSED_STATES and ord_id not in self._orders:
+                self._orders[ord_id] = Order(d)
+                self._ids.append(ord_id)
+
+    def apply(self, d: dict) -> tuple[str, int] | None:
+        """
+        Apply one WS order push. Returns (action, index) with action "add", "update" or "remove"
+        (index is the row before removal), or None if nothing changed (stale or unknown closed order).
+        """
+        ord_id = d.get("ordId")
+        if not ord_id:
+            return None
+        cur = self._orders.get(ord_id)
+        if cur is not None and _utime(d) < _utime(cur):
+            return None  # out-of-order push
+        if d.get("state") in CLOSED_STATES:
+            if cur is None:
+                return None
+            i = self._ids.index(ord_id)
+            del self._ids[i]
+            del self._orders[ord_id]
+            return "remove", i
+        if cur is None:
+            self._orders[ord_id] = Order(d)
+            self._ids.append(ord_id)
+            return "add", len(self._ids) - 1
+        cur.update(d)
+        return "update", self._ids.index(ord_id)
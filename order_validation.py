@@ -0,0 +1,107 @@
+"""
+Local pre-trade checks for spot orders using instrument rules from the catalog.
+Price is rounded to tickSz (buy down, sell up) and size down to lotSz with Decimal arithmetic;
+minSz, max order size and cached available balance are enforced before anything is sent.
+"""
+import time
+from decimal import Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
+from typing import NamedTuple
+
+
+class Validation(NamedTuple):
+    ok: bool
+    errors: list[str]
+    px: str | None  # normalized price (limit orders)
+    sz: str  # normalized size
+    elapsed_us: float
+
+
+def _dec(s) -> Decimal | None:
+    try:
+        d = Decimal(str(s).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return d if d.is_finite() else None
+
+
+def _step(value: Decimal, step: Decimal | None, rounding) -> Decimal:
+    if not step or step <= 0:
+        return value
+    return (value / step).to_integral_value(rounding=rounding) * step
+
+
+def _plain(d: Decimal) -> str:
+    s = format(d.normalize(), "f")
+    return s if s not in ("-0", "") else "0"
+
+
+def validate_order(
+    side: str,
+    ord_type: str,
+    sz: str,
+    px: str | None = None,
+    inst: dict | None = None,
+    balances: dict[str, Decimal] | None = None,
+) -> Validation:
+    """
+    inst: catalog record (tickSz, lotSz, minSz, maxLmtSz, maxMktSz, baseCcy, quoteCcy, state); None skips rule checks.
+    balances: ccy -> available balance; None skips the balance check.
+    Market buys are sized in the quote currency (OKX spot default), so lotSz/minSz do not apply to them.
+    """
+    t0 = time.perf_counter()
+    errors = []
+    inst = inst or {}
+    size = _dec(sz)
+    price = _dec(px) if ord_type == "limit" else None
+    if size is None or size <= 0:
+        errors.append("Size must be a positive number.")
+    if ord_type == "limit" and (price is None or price <= 0):
+        errors.append("Price required for limit order.")
+    if inst.get("state") and inst.get("state") != "live":
+        errors.append(f"Instrument is {inst.get('state')}.")
+    quote_sized = ord_type == "market" and side == "buy"
+    if not errors:
+        tick, lot, min_sz = _dec(inst.get("tickSz")), _dec(inst.get("lotSz")), _dec(inst.get("minSz"))
+        if price is not None:
+            price = _step(price, tick, ROUND_FLOOR if side == "buy" else ROUND_CEILING)
+            if price <= 0:
+                errors.append(f"Price is below tick size {inst.get('tickSz')}.")
+        if not quote_sized:
+            size = _step(size, lot, ROUND_FLOOR)
+            if min_sz and size < min_sz:
+                errors.append(f"Size below minimum {inst.get('minSz')} (lot {inst.get('lotSz')}).")
+            elif size <= 0:
+                errors.append(f"Size is below lot size {inst.get('lotSz')}.")
+            max_sz = _dec(inst.get("maxLmtSz" if ord_type == "limit" else "maxMktSz"))
+            if max_sz and size > max_sz:
+                errors.append(f"Size above maximum {_plain(max_sz)}.")
+    if not errors and balances is not None:
+        base, quote = inst.get("baseCcy"), inst.get("quoteCcy")
+        if side == "buy" and quote:
+            need = size if quote_sized else (price * size if price is not None else None)
+            have = balances.get(quote, Decimal(0))
+            if need is not None and need > have:
+                errors.append(f"Insufficient {quote}: need {_plain(need)}, available {_plain(have)}.")
+        elif side == "sell" and base:
+            have = balances.get(base, Decimal(0))
+            if size > have:
+                errors.append(f"Insufficient {base}: need {_plain(size)}, available {_plain(have)}.")
+    elapsed_us = (time.perf_counter() - t0) * 1e6
+    return Validation(
+        not errors,
+        errors,
+        _plain(price) if price is not None else None,
+        _plain(size) if size is not None else str(sz),
+        elapsed_us,
+    )
+
+
+def parse_balances(out: dict) -> dict[str, Decimal]:
+    """get_balance() response -> ccy -> available balance."""
+    balances = {}
+    for acct in out.get("data", []) or []:
+        for d in acct.get("details", []) or []:
+            avail = _dec(d.get("availBal") or d.get("cashBal") or "0")
+            if d.get("ccy") and avail is not None:
+                balances[d["ccy"]] = avail
+    return balances
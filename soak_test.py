@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Soak test: serve mock_okx in-process at a fixed message rate, run the wx app and/or the terminal UI
+against it as child processes, and report throughput, UI lag and memory every interval and at the end.
+
+  python soak_test.py --target app --rate 5000 --instruments 300 --duration 120
+  python soak_test.py --target terminal --rate 20000 --hot 0.5
+  python soak_test.py --target terminal --watch 100   (terminal watch list of 100 symbols)
+
+UI lag comes from OKX_UI_PROBE: the app logs how late a 100 ms timer fires (event-loop stall), the
+terminal logs draw time and the age of the newest data on screen. RSS/CPU are read from /proc (Linux).
+The app needs a display; xvfb-run is used when DISPLAY is unset and it is installed.
+"""
+import argparse
+import fcntl
+import os
+import pty
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import termios
+import threading
+import time
+
+import mock_okx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = {"app": "run.py", "terminal": "terminal_btc.py"}
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def _proc_tree(root: int) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    out, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        out.append(pid)
+        todo.extend(children.get(pid, ()))
+    return out
+
+
+def _find_script_pid(root: int, script: str) -> int | None:
+    """The python process running `script` (the root itself, or under xvfb-run)."""
+    for pid in _proc_tree(root):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                argv = f.read().split(b"\0")
+        except OSError:
+            continue
+        if any(a.endswith(script.encode()) for a in argv) and b"xvfb-run" not in argv[0]:
+            return pid
+    return None
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def _cpu_seconds(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLK_TCK
+    except (OSError, IndexError, ValueError):
+        return float("nan")
+
+
+class Target:
+    """One UI child process plus its probe log and resource samples."""
+
+    def __init__(self, name: str, env: dict, workdir: str, args: list[str] = ()):
+        self.name = name
+        self.script = SCRIPTS[name]
+        self.probe_path = os.path.join(workdir, f"probe_{name}.log")
+        self.stderr_path = os.path.join(workdir, f"stderr_{name}.log")
+        env = dict(env, OKX_UI_PROBE=self.probe_path)
+        cmd = [sys.executable, os.path.join(HERE, self.script), *args]
+        self.tty_bytes = 0
+        self._master = None
+        self._stderr = None
+        if name == "terminal":
+            self._master, slave = pty.openpty()
+            fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", 50, 160, 0, 0))
+            env.update(TERM=env.get("TERM") or "xterm-256color", LINES="50", COLUMNS="160")
+            self.proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdin=slave, stdout=slave, stderr=slave, close_fds=True)
+            os.close(slave)
+            threading.Thread(target=self._drain_tty, daemon=True).start()
+        else:
+            if not env.get("DISPLAY") and shutil.which("xvfb-run"):
+                cmd = ["xvfb-run", "-a"] + cmd
+            # a file, not a pipe: nobody reads a pipe until the end, and once it is full a traceback
+            # would block the GUI thread and show up as lag
+            self._stderr = open(self.stderr_path, "wb")
+            self.proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        self.pid: int | None = None
+        self.rss: list[float] = []
+        self.lag: list[float] = []  # app: timer lateness; terminal: draw time (ms)
+        self.age: list[float] = []  # terminal: data age at draw (ms)
+        self._probe_pos = 0
+        self._cpu0 = self._t0 = None
+        self._cpu_last = self._t_last = None
+
+    def _drain_tty(self):
+        while True:
+            try:
+                data = os.read(self._master, 65536)
+            except OSError:
+                return
+            if not data:
+                return
+            self.tty_bytes += len(data)
+
+    def sample(self) -> dict:
+        if self.pid is None:
+            self.pid = _find_script_pid(self.proc.pid, self.script)
+        now = time.monotonic()
+        cpu = _cpu_seconds(self.pid) if self.pid else float("nan")
+        rss = _rss_mb(self.pid) if self.pid else float("nan")
+        if rss == rss:
+            self.rss.append(rss)
+        if self._cpu0 is None and cpu == cpu:
+            self._cpu0 = self._cpu_last = cpu
+            self._t0 = self._t_last = now
+        cpu_pct = float("nan")
+        if self._cpu_last is not None and now > self._t_last:
+            cpu_pct = (cpu - self._cpu_last) / (now - self._t_last) * 100
+            self._cpu_last, self._t_last = cpu, now
+        lag, age = self._read_probe()
+        self.lag += lag
+        self.age += age
+        return {"rss": rss, "cpu": cpu_pct, "lag": lag, "age": age, "alive": self.proc.poll() is None}
+
+    def _read_probe(self) -> tuple[list[float], list[float]]:
+        lag, age = [], []
+        try:
+            with open(self.probe_path) as f:
+                f.seek(self._probe_pos)
+                chunk = f.read()
+        except OSError:
+            return lag, age
+        end = chunk.rfind("\n") + 1
+        self._probe_pos += len(chunk[:end].encode())
+        for line in chunk[:end].splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                lag.append(float(parts[1]))
+            if len(parts) >= 3 and float(parts[2]) >= 0:
+                age.append(float(parts[2]))
+        return lag, age
+
+    def stop(self):
+        if self.proc.poll() is None:
+            if self._master is not None:
+                try:
+                    os.write(self._master, b"q")
+                    self.proc.wait(timeout=3)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            if self.proc.poll() is None:
+                self.proc.terminate()
+                try:
+                    self.proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.proc.kill()
+        if self._master is not None:
+            try:
+                os.close(self._master)
+            except OSError:
+                pass
+        if self._stderr is not None:
+            self._stderr.close()
+
+    def line(self, s: dict, interval: float, tty0: int) -> str:
+        text = f"{self.name}: rss {s['rss']:.0f} MB cpu {s['cpu']:.0f}%"
+        label = "lag" if self.name == "app" else "draw"
+        if s["lag"]:
+            text += f" {label} p50 {_pct(s['lag'], 50):.1f} p99 {_pct(s['lag'], 99):.1f} max {max(s['lag']):.1f} ms"
+        if s["age"]:
+            text += f" age p50 {_pct(s['age'], 50):.0f} max {max(s['age']):.0f} ms"
+        if self.name == "terminal":
+            text += f" tty {(self.tty_bytes - tty0) / interval / 1024:.1f} KB/s"
+        return text + ("" if s["alive"] else " [exited]")
+
+    def summary(self, duration: float) -> str:
+        label = "event-loop lag" if self.name == "app" else "draw time"
+        lines = [f"{self.name} ({self.script}, exit code {self.proc.poll()})"]
+        if self.rss:
+            lines.append(f"  rss MB: start {self.rss[0]:.0f} end {self.rss[-1]:.0f} max {max(self.rss):.0f}")
+        if self._cpu0 is not None and self._t_last > self._t0:
+            lines.append(f"  cpu: {(self._cpu_last - self._cpu0) / (self._t_last - self._t0) * 100:.0f}% avg")
+        if self.lag:
+            lines.append(f"  {label} ms: p50 {_pct(self.lag, 50):.1f} p95 {_pct(self.lag, 95):.1f} "
+                         f"p99 {_pct(self.lag, 99):.1f} max {max(self.lag):.1f} ({len(self.lag)} samples)")
+        if self.age:
+            lines.append(f"  data age at draw ms: p50 {_pct(self.age, 50):.0f} p99 {_pct(self.age, 99):.0f} max {max(self.age):.0f}")
+        if self.name == "terminal":
+            lines.append(f"  terminal output: {self.tty_bytes / max(duration, 1e-9) / 1024:.1f} KB/s")
+        if self._stderr is not None and os.path.getsize(self.stderr_path):
+            with open(self.stderr_path, "rb") as f:
+                f.seek(max(0, os.path.getsize(self.stderr_path) - 4096))
+                err = f.read().decode("utf-8", "replace").strip()
+            if err:
+                lines.append(f"  stderr ({self.stderr_path}): " + err.splitlines()[-1][:200])
+        return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Soak the app/terminal against mock_okx")
+    ap.add_argument("--target", choices=["app", "terminal", "both", "none"], default="both")
+    ap.add_argument("--rate", type=float, default=5000, help="mock messages per second")
+    ap.add_argument("--instruments", type=int, default=200)
+    ap.add_argument("--hot", type=float, default=0.25, help="share of messages for BTC-USDT, which the UIs watch")
+    ap.add_argument("--duration", type=float, default=60, help="seconds")
+    ap.add_argument("--interval", type=float, default=5, help="report every N seconds")
+    ap.add_argument("--watch", type=int, default=1, help="terminal: number of instruments on its watch list")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    exchange = mock_okx.MockExchange(args.instruments, args.rate, args.seed, args.hot)
+    server = mock_okx.make_server(exchange)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exchange.start()
+    workdir = tempfile.mkdtemp(prefix="okx_soak_")
+    env = dict(os.environ, **mock_okx.env_for(server))
+    # throwaway credentials enable the private stream; caches go to the temp dir, not ~/.okx_desktop
+    env.update(OKX_API_KEY="mock", OKX_SECRET_KEY="mock", OKX_PASSPHRASE="mock", OKX_DEMO="0",
+               OKX_CACHE_DIR=workdir, OKX_CANDLE_DB=os.path.join(workdir, "candles.db"))
+    names = ["app", "terminal"] if args.target == "both" else [] if args.target == "none" else [args.target]
+    print(f"mock OKX at {env['OKX_REST_BASE']}: {args.instruments} instruments, {args.rate:g} msgs/s; "
+          f"targets: {', '.join(names) or 'none'}; logs in {workdir}")
+    watch = list(exchange.instruments)[:max(1, args.watch)]
+    targets = [Target(name, env, workdir, watch if name == "terminal" and args.watch > 1 else []) for name in names]
+
+    t_start = time.monotonic()
+    gen0, pub0 = exchange.generated, exchange.published
+    try:
+        while time.monotonic() - t_start < args.duration:
+            gen, pub, tty0 = exchange.generated, exchange.published, [t.tty_bytes for t in targets]
+            window: list[dict] = [{"rss": float("nan"), "cpu": float("nan"), "lag": [], "age": [], "alive": True} for _ in targets]
+            t0 = time.monotonic()
+            while time.monotonic() - t0 < args.interval:
+                time.sleep(1)
+                for i, t in enumerate(targets):
+                    s = t.sample()
+                    window[i].update(rss=s["rss"], cpu=s["cpu"], alive=s["alive"])
+                    window[i]["lag"] += s["lag"]
+                    window[i]["age"] += s["age"]
+            dt = time.monotonic() - t0
+            clients = exchange.clients()
+            print(f"[{time.monotonic() - t_start:5.0f}s] gen {(exchange.generated - gen) / dt:,.0f}/s "
+                  f"sent {(exchange.published - pub) / dt:,.0f}/s ws clients {len(clients)} "
+                  f"dropped {sum(c.dropped for c in clients)}")
+            for i, t in enumerate(targets):
+                print("    " + t.line(window[i], dt, tty0[i]))
+    except KeyboardInterrupt:
+        pass
+    duration = time.monotonic() - t_start
+    clients = exchange.clients()
+    for t in targets:
+        t.stop()
+    exchange.stop()
+    server.shutdown()
+    print(f"\n=== soak summary ({duration:.0f}s) ===")
+    print(f"mock: generated {(exchange.generated - gen0) / duration:,.0f} msgs/s, "
+          f"sent {(exchange.published - pub0) / duration:,.0f} msgs/s to subscribers, "
+          f"dropped {sum(c.dropped for c in clients)} (slow readers)")
+    for t in targets:
+        print(t.summary(duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+SortedView: ids kept in key order with bisect, so one live update moves one row in O(log n)
+instead of re-sorting the whole list.
+"""
+from bisect import bisect_left
+from typing import Any, Callable
+
+
+class SortedView:
+    def __init__(self, key_of: Callable[[str], Any], reverse: bool = False):
+        self.key_of = key_of
+        self.reverse = reverse
+        self._entries: list[tuple] = []  # (key, id), ascending
+        self._keys: dict[str, Any] = {}
+
+    def reset(self, ids):
+        self._keys = {i: self.key_of(i) for i in ids}
+        self._entries = sorted((k, i) for i, k in self._keys.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._keys
+
+    def __getitem__(self, row: int) -> str:
+        if self.reverse:
+            row = len(self._entries) - 1 - row
+        return self._entries[row][1]
+
+    def _row(self, pos: int) -> int:
+        return len(self._entries) - 1 - pos if self.reverse else pos
+
+    def index(self, id_: str) -> int:
+        """Display row of id_, or -1."""
+        if id_ not in self._keys:
+            return -1
+        return self._row(bisect_left(self._entries, (self._keys[id_], id_)))
+
+    def add(self, id_: str) -> int:
+        if id_ in self._keys:
+            return self.index(id_)
+        key = self._keys[id_] = self.key_of(id_)
+        pos = bisect_left(self._entries, (key, id_))
+        self._entries.insert(pos, (key, id_))
+        return self._row(pos)
+
+    def update(self, id_: str) -> tuple[int, int] | None:
+        """Re-key id_ after its data changed. Returns the (first, last) display rows that changed."""
+        if id_ not in self._keys:
+            return None
+        old = (self._keys[id_], id_)
+        new = (self.key_of(id_), id_)
+        entries = self._entries
+        i = bisect_left(entries, old)
+        if new == old:
+            row = self._row(i)
+            return row, row
+        self._keys[id_] = new[0]
+        del entries[i]
+        j = bisect_left(entries, new)
+        entries.insert(j, new)
+        a, b = self._row(i), self._row(j)
+        return min(a, b), max(a, b)
@@ -0,0 +1,178 @@
+"""
+TaskPool: one bounded set of worker threads for background REST work, instead of a thread per request.
+A task submitted under a key supersedes every earlier task with that key. A superseded task that is
+still queued is cancelled. One that is already running finishes, but its results are dropped: wrap the
+callbacks it hands to wx.CallAfter in task.guard(), which re-checks on the GUI thread, so a slow stale
+load can never overwrite a newer one.
+Urgent tasks (user actions such as orders) run on a worker of their own, in submit order, so they never
+wait behind running loads and are never rejected by the queue bound.
+stats() reports queue depth and wait (queued) / run latencies for the recent tasks.
+"""
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Hashable
+
+from config import TASK_QUEUE, TASK_WORKERS
+
+LATENCY_SAMPLES = 512
+
+
+class Task:
+    __slots__ = ("pool", "fn", "key", "gen", "state", "t_submit", "t_start")
+
+    def __init__(self, pool: "TaskPool", fn: Callable[["Task"], Any], key: Hashable | None, gen: int):
+        self.pool = pool
+        self.fn = fn
+        self.key = key
+        self.gen = gen
+        self.state = "queued"  # queued, running, done, failed, cancelled, rejected
+        self.t_submit = time.perf_counter()
+        self.t_start = 0.0
+
+    @property
+    def current(self) -> bool:
+        """False once a newer task was submitted with the same key."""
+        return self.key is None or self.pool._gens.get(self.key) == self.gen
+
+    def guard(self, callback: Callable) -> Callable:
+        """callback, but a no-op (counted as dropped) if this task has been superseded by the time it runs."""
+        def call(*args, **kwargs):
+            if self.current:
+                return callback(*args, **kwargs)
+            self.pool._bump("dropped")
+        return call
+
+
+class TaskPool:
+    def __init__(self, workers: int = TASK_WORKERS, max_queue: int = TASK_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._q: deque[Task] = deque()
+        self._urgent: deque[Task] = deque()
+        lock = threading.Lock()  # shared by both conditions: one view of the counters and keys
+        self._cond = threading.Condition(lock)
+        self._urgent_cond = threading.Condition(lock)
+        self._urgent_thread: threading.Thread | None = None
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._running = 0
+        self._gens: dict[Hashable, int] = {}  # key -> generation of its newest task
+        self._gen = 0
+        self._pending: dict[Hashable, Task] = {}  # key -> its task while queued
+        self.counts = dict.fromkeys(("submitted", "done", "failed", "cancelled", "dropped", "rejected"), 0)
+        self.max_depth = 0
+        self._wait_ms: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._run_ms: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def submit(self, fn: Callable[[Task], Any], key: Hashable | None = None, urgent: bool = False) -> Task:
+        """Run fn(task) on a worker. urgent tasks (user actions such as orders) go to the urgent worker."""
+        with self._cond:
+            self._gen += 1
+            task = Task(self, fn, key, self._gen)
+            self.counts["submitted"] += 1
+            old = self._pending.get(key) if key is not None else None
+            # check room first: a rejected task must not supersede anything (the queued predecessor it
+            # replaces frees its slot)
+            if not urgent and len(self._q) - (old is not None and old in self._q) >= self.max_queue:
+                task.state = "rejected"
+                self.counts["rejected"] += 1
+                return task
+            if key is not None:
+                self._gens[key] = task.gen
+                if old is not None:
+                    del self._pending[key]
+                    (self._urgent if old in self._urgent else self._q).remove(old)
+                    old.state = "cancelled"
+                    self.counts["cancelled"] += 1
+            if urgent:
+                self._urgent.append(task)
+                if key is not None:
+                    self._pending[key] = task
+                if self._urgent_thread is None:
+                    self._urgent_thread = threading.Thread(target=self._work, args=(True,), name="task-urgent",
+                                                           daemon=True)
+                    self._urgent_thread.start()
+                else:
+                    self._urgent_cond.notify()
+                return task
+            self._q.append(task)
+            if key is not None:
+                self._pending[key] = task
+            self.max_depth = max(self.max_depth, len(self._q))
+            if self._idle == 0 and len(self._threads) < self.workers:
+                t = threading.Thread(target=self._work, name=f"task-{len(self._threads)}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            else:
+                self._cond.notify()
+        return task
+
+    def _work(self, urgent: bool = False):
+        q, cond = (self._urgent, self._urgent_cond) if urgent else (self._q, self._cond)
+        while True:
+            with cond:
+                if not urgent:
+                    self._idle += 1
+                while not q:
+                    cond.wait()
+                if not urgent:
+                    self._idle -= 1
+                task = q.popleft()
+                if task.key is not None and self._pending.get(task.key) is task:
+                    del self._pending[task.key]
+                task.state = "running"
+                task.t_start = time.perf_counter()
+                self._running += 1
+                self._wait_ms.append((task.t_start - task.t_submit) * 1000)
+            try:
+                task.fn(task)
+                task.state = "done"
+            except Exception:
+                task.state = "failed"
+                traceback.print_exc()
+            with self._cond:
+                self._running -= 1
+                self.counts[task.state] += 1
+                self._run_ms.append((time.perf_counter() - task.t_start) * 1000)
+            task.fn = None  # drop the closure (and whatever it captured) now
+
+    def _bump(self, name: str):
+        with self._cond:
+            self.counts[name] += 1
+
+    def stats(self) -> dict:
+        def pct(xs: list[float], p: float) -> float:
+            return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else 0.0
+
+        with self._cond:
+            wait, run = sorted(self._wait_ms), sorted(self._run_ms)
+            out = dict(self.counts, depth=len(self._q) + len(self._urgent), max_depth=self.max_depth,
+                       running=self._running, workers=len(self._threads) + (self._urgent_thread is not None))
+        out.update(wait_p50_ms=pct(wait, 0.5), wait_p95_ms=pct(wait, 0.95), wait_max_ms=wait[-1] if wait else 0.0,
+                   run_p50_ms=pct(run, 0.5), run_p95_ms=pct(run, 0.95), run_max_ms=run[-1] if run else 0.0)
+        return out
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (
+            f"queue {s['depth']} (max {s['max_depth']}), running {s['running']}/{s['workers']} workers\n"
+            f"submitted {s['submitted']}, done {s['done']}, failed {s['failed']}, cancelled {s['cancelled']}, "
+            f"stale results dropped {s['dropped']}, rejected {s['rejected']}\n"
+            f"wait ms p50 {s['wait_p50_ms']:.1f} p95 {s['wait_p95_ms']:.1f} max {s['wait_max_ms']:.1f}; "
+            f"run ms p50 {s['run_p50_ms']:.1f} p95 {s['run_p95_ms']:.1f} max {s['run_max_ms']:.1f}"
+        )
+
+
+_pool: TaskPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_task_pool() -> TaskPool:
+    """Shared pool for every panel (and terminal_btc)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TaskPool()
+        return _pool
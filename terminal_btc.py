@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 """
-Single-file: OKX REST + WebSocket → BTC-USDT spot ticker, 1m candle, orderbook, trades.
+Single-file: OKX REST + WebSocket → spot ticker, 1m candle, orderbook, trades.
 Terminal UI via curses. Real-time updates.
-Run: python terminal_btc.py
-Quit: q or Esc
+Run: python terminal_btc.py                      (BTC-USDT)
+     python terminal_btc.py BTC-USDT ETH-USDT SOL-USDT ...   (watch list + summary table)
+     python terminal_btc.py --replay DIR --speed 10   (recorded session; OKX_RECORD_DIR=DIR records)
+Keys: Tab/n next symbol, p previous, Up/Down move, s summary/detail, Enter open, q or Esc quit
 
 On Windows: pip install windows-curses  (curses not in stdlib).
 """
+import argparse
 import json
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
 import requests
 import websocket
@@ -21,22 +26,126 @@ try:
 except ImportError:
     curses = None
 
+try:  # optional, from the desktop app: raw frame recording/replay
+    import md_record
+except ImportError:
+    md_record = None
+
+try:  # optional, from the desktop app: per-channel latency histograms and per-pane staleness
+    import md_latency
+except ImportError:
+    md_latency = None
+
 # --- Config (no external deps) ---
-INST_ID = "BTC-USDT"
-REST_BASE = "https://www.okx.com"
-WS_URL = "wss://ws.okx.com:8443/ws/v5/public"
-
-# --- Shared state (WS thread writes, main thread reads) ---
-_state = {
-    "ticker": {},
-    "candle": [],   # [ts, o, h, l, c, vol, ...]
-    "bids": [],     # [[price, sz, ...], ...]
-    "asks": [],
-    "trades": [],   # list of {price, sz, side, time, ...}
-    "ts": 0,
-    "error": "",
-}
-_lock = threading.Lock()
+INST_ID = "BTC-USDT"  # default watch list
+REST_BASE = os.environ.get("OKX_REST_BASE", "https://www.okx.com")
+WS_URL = os.environ.get("OKX_WS_PUBLIC", "wss://ws.okx.com:8443/ws/v5/public")
+MAX_FPS = float(os.environ.get("OKX_TERM_FPS", "20"))  # render cap; frames only happen when data changed
+KEY_POLL_S = 0.1  # key/resize polling while idle
+ERROR_SHOW_S = 5.0
+UI_PROBE = os.environ.get("OKX_UI_PROBE", "")  # soak_test.py: per frame "epoch_ms draw_ms data_age_ms"
+SUB_BATCH = 100  # subscription args per WS message
+DETAIL_CHANNELS = ("candle1m", "books5", "trades")  # focused symbol only; the watch list gets tickers
+
+# --- Shared state: immutable snapshots, swapped by reference (copy-on-write) ---
+# Pushes are cut down to the fields drawn: a raw ticker dict is ~1.5 KB, a Ticker ~0.4 KB.
+class Ticker(NamedTuple):
+    last: str = ""
+    open24h: str = ""
+    high24h: str = ""
+    low24h: str = ""
+    vol24h: str = ""
+    ts: str = ""
+
+
+class Trade(NamedTuple):
+    ts: str
+    side: str
+    px: str
+    sz: str
+
+
+def _first(d: dict, *names: str) -> str:
+    for n in names:
+        v = d.get(n)
+        if v:
+            return str(v)
+    return ""
+
+
+def ticker_of(d: dict) -> Ticker | None:
+    if not isinstance(d, dict) or not d:
+        return None
+    return Ticker(_first(d, "last", "lastPx"), _first(d, "open24h", "sodUtc0"), _first(d, "high24h", "highPx"),
+                  _first(d, "low24h", "lowPx"), _first(d, "vol24h", "volCcy24h"), _first(d, "ts"))
+
+
+def trade_of(d) -> Trade:
+    d = d if isinstance(d, dict) else {}
+    return Trade(_first(d, "ts"), _first(d, "side"), _first(d, "px", "price"), _first(d, "sz", "size"))
+
+
+def _levels(levels: list, depth: int) -> tuple:
+    """Book levels as (price, size); OKX sends [price, size, "0", orders]."""
+    return tuple((str(lv[0]), str(lv[1]) if len(lv) > 1 else "") for lv in levels[:depth] if lv)
+
+
+class InstState(NamedTuple):
+    ticker: Ticker | None = None
+    candle: tuple = ()   # (ts, o, h, l, c, vol, ...)
+    bids: tuple = ()     # ((price, sz), ...)
+    asks: tuple = ()
+    trades: tuple = ()   # (Trade, ...) newest first
+
+
+class Snapshot(NamedTuple):
+    focus: str                      # instrument shown in the quadrant view
+    states: dict[str, InstState]   # per instrument; only the focus keeps detail data. Never mutated once published.
+    ts: float = 0.0                 # last WS push
+    tickers_seq: int = 0            # bumps on every ticker change (summary table)
+    error: str = ""
+    error_seq: int = 0
+
+
+_EMPTY = InstState()
+_watch: tuple[str, ...] = (INST_ID,)
+_snap = Snapshot(INST_ID, {INST_ID: _EMPTY})  # readers just take a reference: no lock
+_write_lock = threading.Lock()  # serializes writers (WS thread, REST loaders, key handler) only
+_wake = threading.Event()  # set on every publish so the renderer draws right away
+_ws_app = None  # current WebSocketApp, for (un)subscribing on focus changes
+_recorder = md_record.get_recorder() if md_record else None  # OKX_RECORD_DIR
+_meter = md_latency.get_latency_meter() if md_latency else None
+_replay: tuple[str, float] | None = None  # (path, speed) from --replay: no REST/WS, frames come from a recording
+# Focus loads share a small pool instead of a thread each; a load superseded while queued is skipped
+_rest_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rest")
+_load_gen = 0
+
+
+def _swap(fn: Callable[[Snapshot], Snapshot]):
+    """Publish fn(current snapshot). fn must build new containers rather than mutate the old ones."""
+    global _snap
+    with _write_lock:
+        new = fn(_snap)
+        if new is _snap:
+            return
+        _snap = new
+    _wake.set()
+
+
+def _with_inst(s: Snapshot, inst_id: str, **fields) -> Snapshot:
+    states = dict(s.states)
+    states[inst_id] = states[inst_id]._replace(**fields)
+    return s._replace(states=states)
+
+
+def _set_error(msg: str):
+    _swap(lambda s: s._replace(error=msg, error_seq=s.error_seq + 1))
+
+
+def set_watch(inst_ids: list[str]):
+    global _watch, _snap
+    _watch = tuple(dict.fromkeys(i.upper() for i in inst_ids)) or (INST_ID,)
+    _snap = Snapshot(_watch[0], {i: _EMPTY for i in _watch})
 
 
 # --- REST ---
@@ -47,74 +156,155 @@ def _rest(path: str, params: dict[str, Any] | None = None) -> dict:
     return r.json()
 
 
-def fetch_ticker() -> dict:
-    j = _rest("/api/v5/market/ticker", {"instId": INST_ID})
+def fetch_ticker(inst_id: str = INST_ID) -> dict:
+    j = _rest("/api/v5/market/ticker", {"instId": inst_id})
     if j.get("code") != "0":
         raise RuntimeError(j.get("msg", "ticker error"))
     return (j.get("data") or [{}])[0]
 
 
-def fetch_candle_1m() -> list:
-    j = _rest("/api/v5/market/candles", {"instId": INST_ID, "bar": "1m", "limit": "1"})
+def fetch_tickers(inst_ids: list[str]) -> dict[str, dict]:
+    """All SPOT tickers in one request, filtered to inst_ids."""
+    j = _rest("/api/v5/market/tickers", {"instType": "SPOT"})
+    if j.get("code") != "0":
+        raise RuntimeError(j.get("msg", "tickers error"))
+    wanted = set(inst_ids)
+    return {d["instId"]: d for d in j.get("data", []) if d.get("instId") in wanted}
+
+
+def fetch_candle_1m(inst_id: str = INST_ID) -> list:
+    j = _rest("/api/v5/market/candles", {"instId": inst_id, "bar": "1m", "limit": "1"})
     if j.get("code") != "0":
         raise RuntimeError(j.get("msg", "candles error"))
     return (j.get("data") or [[]])[0] if j.get("data") else []
 
 
-def fetch_orderbook() -> tuple[list, list]:
-    j = _rest("/api/v5/market/books", {"instId": INST_ID, "sz": "20"})
+def fetch_orderbook(inst_id: str = INST_ID) -> tuple[list, list]:
+    j = _rest("/api/v5/market/books", {"instId": inst_id, "sz": "20"})
     if j.get("code") != "0":
         raise RuntimeError(j.get("msg", "books error"))
     data = (j.get("data") or [{}])[0]
     return data.get("bids", []), data.get("asks", [])
 
 
-def fetch_trades() -> list:
-    j = _rest("/api/v5/market/trades", {"instId": INST_ID, "limit": "20"})
+def fetch_trades(inst_id: str = INST_ID) -> list:
+    j = _rest("/api/v5/market/trades", {"instId": inst_id, "limit": "20"})
     if j.get("code") != "0":
         raise RuntimeError(j.get("msg", "trades error"))
     return j.get("data", [])
 
 
+def _apply_rest(s: Snapshot, inst_id: str, kind: str, result) -> Snapshot:
+    """REST results only fill fields the WS stream has not filled yet (the stream is newer)."""
+    if kind == "tickers":
+        states = dict(s.states)
+        for i, t in result.items():
+            if i in states and not states[i].ticker:
+                states[i] = states[i]._replace(ticker=ticker_of(t))
+        return s._replace(states=states, tickers_seq=s.tickers_seq + 1)
+    st = s.states.get(inst_id)
+    if st is None or s.focus != inst_id:
+        return s  # focus moved on while the request was in flight
+    if kind == "candle" and result and not st.candle:
+        return _with_inst(s, inst_id, candle=tuple(result))
+    if kind == "book" and not (st.bids or st.asks):
+        return _with_inst(s, inst_id, bids=_levels(result[0], 20), asks=_levels(result[1], 20))
+    if kind == "trades" and result and not st.trades:
+        return _with_inst(s, inst_id, trades=tuple(map(trade_of, result[:30])))
+    return s
+
+
+def _submit_load(inst_id: str, tickers: tuple[str, ...] = ()):
+    global _load_gen
+    _load_gen += 1
+    _rest_pool.submit(_load_rest, inst_id, tickers, _load_gen)
+
+
+def _load_rest(inst_id: str, tickers: tuple[str, ...] = (), gen: int | None = None):
+    """REST snapshot for inst_id (and tickers for the watch list): requests run concurrently, outside
+    any lock, and each result is published as soon as it arrives."""
+    if gen is not None and gen != _load_gen and not tickers:
+        return  # focus moved on while this load was queued
+    jobs = {
+        "candle": lambda: fetch_candle_1m(inst_id),
+        "book": lambda: fetch_orderbook(inst_id),
+        "trades": lambda: fetch_trades(inst_id),
+    }
+    if len(tickers) == 1:
+        jobs["tickers"] = lambda: {tickers[0]: fetch_ticker(tickers[0])}
+    elif tickers:
+        jobs["tickers"] = lambda: fetch_tickers(list(tickers))
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {pool.submit(fn): kind for kind, fn in jobs.items()}
+        for fut in as_completed(futures):
+            try:
+                result = fut.result()
+            except Exception as e:
+                _set_error(str(e))
+                continue
+            _swap(lambda s, kind=futures[fut], result=result: _apply_rest(s, inst_id, kind, result))
+
+
 # --- WebSocket ---
 def _on_ws_message(ws, raw: str):
+    recv = time.time() * 1000
+    if _recorder:
+        _recorder.record("term", raw)
     if raw == "pong":
         return
     try:
         data = json.loads(raw)
         if "event" in data:
+            if data.get("event") == "error":
+                _set_error(data.get("msg", "error"))
             return
         arg = data.get("arg", {})
         ch = arg.get("channel", "")
+        inst_id = arg.get("instId", "")
         payload = data.get("data", [])
-        with _lock:
-            _state["ts"] = time.time()
-            if ch == "tickers" and payload:
-                _state["ticker"] = payload[0] if isinstance(payload[0], dict) else {}
-            elif ch == "candle1m" and payload:
-                c = payload[0]
-                _state["candle"] = c if isinstance(c, list) else []
-            elif ch == "books5" and payload:
-                d = payload[0]
-                if isinstance(d, dict):
-                    _state["bids"] = d.get("bids", [])[:10]
-                    _state["asks"] = d.get("asks", [])[:10]
-            elif ch == "books" and payload:
-                d = payload[0]
-                if isinstance(d, dict):
-                    _state["bids"] = d.get("bids", [])[:15]
-                    _state["asks"] = d.get("asks", [])[:15]
-            elif ch == "trades" and payload:
-                # New trades at front; keep last 30
-                new_ = [t if isinstance(t, dict) else {} for t in payload]
-                _state["trades"] = (new_ + _state["trades"])[:30]
+        if not payload:
+            return
+        # decode outside the write lock; the swap only links new objects in
+        stamp = _meter.received(ch, inst_id, payload, recv) if _meter else None
+        first = payload[0]
+        new_trades = ()
+        if ch == "tickers":
+            fields = {"ticker": ticker_of(first)}
+        elif ch == "candle1m":
+            fields = {"candle": tuple(first) if isinstance(first, list) else ()}
+        elif ch in ("books5", "books"):
+            if not isinstance(first, dict):
+                return
+            depth = 10 if ch == "books5" else 15
+            fields = {"bids": _levels(first.get("bids", []), depth), "asks": _levels(first.get("asks", []), depth)}
+        elif ch == "trades":
+            fields = None
+            new_trades = tuple(map(trade_of, payload))
+        else:
+            return
+        now = time.time()
+        panes: list[str] = []  # panes showing this push, for the latency meter
+
+        def apply(s: Snapshot) -> Snapshot:
+            st = s.states.get(inst_id)
+            if st is None or (ch != "tickers" and inst_id != s.focus):
+                return s  # unknown, or a late push for a symbol that just lost focus
+            # New trades at front; keep last 30
+            f = fields if fields is not None else {"trades": (new_trades + st.trades)[:30]}
+            s = _with_inst(s, inst_id, **f)
+            panes[:] = _CHANNEL_PANES[ch] if inst_id == s.focus else ("summary",)
+            return s._replace(ts=now, tickers_seq=s.tickers_seq + (ch == "tickers"))
+
+        _swap(apply)
+        if stamp and panes:
+            _meter.applied(stamp, *panes)
     except Exception as e:
-        with _lock:
-            _state["error"] = str(e)
+        _set_error(str(e))
 
 
 def _ws_thread():
-    ws = websocket.WebSocketApp(
+    global _ws_app
+    ws = _ws_app = websocket.WebSocketApp(
         WS_URL,
         on_open=lambda w: _ws_send_subs(w),
         on_message=_on_ws_message,
@@ -128,14 +318,41 @@ def _ws_thread():
         time.sleep(3)
 
 
+def _detail_args(inst_id: str) -> list[dict]:
+    return [{"channel": ch, "instId": inst_id} for ch in DETAIL_CHANNELS]
+
+
+def _ws_send(ws, op: str, args: list[dict]):
+    """Batched (un)subscribe: SUB_BATCH args per message instead of one message per channel."""
+    for i in range(0, len(args), SUB_BATCH):
+        ws.send(json.dumps({"op": op, "args": args[i:i + SUB_BATCH]}))
+
+
 def _ws_send_subs(ws):
-    for ch, arg in [
-        ("tickers", {"channel": "tickers", "instId": INST_ID}),
-        ("candle1m", {"channel": "candle1m", "instId": INST_ID}),
-        ("books5", {"channel": "books5", "instId": INST_ID}),
-        ("trades", {"channel": "trades", "instId": INST_ID}),
-    ]:
-        ws.send(json.dumps({"op": "subscribe", "args": [arg]}))
+    focus = _snap.focus
+    _ws_send(ws, "subscribe", [{"channel": "tickers", "instId": i} for i in _watch] + _detail_args(focus))
+
+
+def _set_focus(inst_id: str):
+    """Move the detail channels to inst_id; the old focus drops its detail data (memory stays flat)."""
+    old = _snap.focus
+    if old == inst_id or inst_id not in _snap.states:
+        return
+
+    def apply(s: Snapshot) -> Snapshot:
+        states = dict(s.states)
+        states[s.focus] = InstState(ticker=states[s.focus].ticker)
+        return s._replace(focus=inst_id, states=states)
+
+    _swap(apply)
+    ws = _ws_app
+    if ws and ws.sock and ws.sock.connected:
+        try:
+            _ws_send(ws, "unsubscribe", _detail_args(old))
+            _ws_send(ws, "subscribe", _detail_args(inst_id))
+        except Exception as e:
+            _set_error(str(e))
+    _submit_load(inst_id)
 
 
 # --- Curses UI ---
@@ -146,101 +363,220 @@ def _fmt_ts(ts_ms) -> str:
         return str(ts_ms)
 
 
-def _draw_ticker(win, h: int, w: int):
-    with _lock:
-        t = _state["ticker"]
-    win.erase()
-    win.border()
-    win.addstr(0, 2, f" {INST_ID} Ticker ", curses.A_REVERSE)
+class _Pane:
+    """Bordered window that only rewrites lines whose content changed since the previous frame."""
+
+    def __init__(self, h: int, w: int, y: int, x: int, title: str):
+        self.h, self.w = h, w
+        self.win = curses.newwin(h, w, y, x)
+        self._lines: dict[int, tuple] = {}  # row -> segments last drawn
+        self.win.border()
+        self.win.addstr(0, 2, f" {title} ", curses.A_REVERSE)
+
+    def put(self, row: int, *segments: tuple[str, int]):
+        """Draw (text, attr) segments left to right from column 2, padded to the pane width."""
+        if row >= self.h - 1 or self._lines.get(row) == segments:
+            return
+        self._lines[row] = segments
+        col, end = 2, self.w - 1
+        try:
+            for text, attr in segments:
+                if col >= end:
+                    break
+                text = text[:end - col]
+                self.win.addstr(row, col, text, attr)
+                col += len(text)
+            if col < end:
+                self.win.addstr(row, col, " " * (end - col))
+        except curses.error:
+            pass
+
+    def finish(self, rows_used: int):
+        """Blank the rows below rows_used that held text last frame, then stage the window."""
+        for row in [r for r in self._lines if r >= rows_used and self._lines[r]]:
+            self.put(row)
+        self.win.noutrefresh()
+
+
+def _text(s: str, attr: int = 0) -> tuple[str, int]:
+    return s, attr
+
+
+def _focus_state(s: Snapshot) -> InstState:
+    return s.states.get(s.focus) or _EMPTY
+
+
+def _draw_ticker(pane: _Pane, s: Snapshot):
+    t = _focus_state(s).ticker
     if not t:
-        win.addstr(2, 2, "Waiting for data...")
+        pane.put(1, _text(" Waiting for data..."))
+        pane.finish(2)
         return
-    last = t.get("last", "") or t.get("lastPx", "")
-    open24 = t.get("open24h", "") or t.get("sodUtc0", "") or "0"
+    last = t.last
+    open24 = t.open24h or "0"
     try:
         ch = (float(last) - float(open24)) / float(open24) * 100 if float(open24) else 0
         ch_str = f"{ch:+.2f}%"
     except (TypeError, ValueError):
         ch_str = "—"
-    vol = t.get("vol24h", "") or t.get("volCcy24h", "")
-    win.addstr(1, 2, f" Last: {last}")
-    win.addstr(2, 2, f" 24h:  O {open24}  Change {ch_str}")
-    win.addstr(3, 2, f" High: {t.get('high24h') or t.get('highPx', '')}  Low: {t.get('low24h') or t.get('lowPx', '')}")
-    win.addstr(4, 2, f" Vol24h: {vol[:20]}" if vol else " Vol24h: —")
-    win.noutrefresh()
-
-
-def _draw_candle(win, h: int, w: int):
-    with _lock:
-        c = _state["candle"]
-    win.erase()
-    win.border()
-    win.addstr(0, 2, f" Candle 1m ", curses.A_REVERSE)
+    vol = t.vol24h
+    pane.put(1, _text(f" Last: {last}"))
+    pane.put(2, _text(f" 24h:  O {open24}  Change {ch_str}"))
+    pane.put(3, _text(f" High: {t.high24h}  Low: {t.low24h}"))
+    pane.put(4, _text(f" Vol24h: {vol[:20]}" if vol else " Vol24h: —"))
+    pane.finish(5)
+
+
+def _draw_candle(pane: _Pane, s: Snapshot):
+    c = _focus_state(s).candle
     if not c or len(c) < 5:
-        win.addstr(2, 2, "Waiting for data...")
+        pane.put(1, _text(" Waiting for data..."))
+        pane.finish(2)
         return
     ts, o, hi, lo, cl = c[0], c[1], c[2], c[3], c[4]
     vol = c[5] if len(c) > 5 else ""
-    win.addstr(1, 2, f" Time: {_fmt_ts(ts)}")
-    win.addstr(2, 2, f" O: {o}   H: {hi}   L: {lo}   C: {cl}")
-    win.addstr(3, 2, f" Vol: {vol}")
-    win.noutrefresh()
-
-
-def _draw_orderbook(win, h: int, w: int):
-    with _lock:
-        bids, asks = _state["bids"], _state["asks"]
-    win.erase()
-    win.border()
-    win.addstr(0, 2, f" Orderbook ", curses.A_REVERSE)
-    win.addstr(1, 2, "  Price", curses.A_BOLD)
-    win.addstr(1, min(24, w - 14), "Size", curses.A_BOLD)
+    pane.put(1, _text(f" Time: {_fmt_ts(ts)}"))
+    pane.put(2, _text(f" O: {o}   H: {hi}   L: {lo}   C: {cl}"))
+    pane.put(3, _text(f" Vol: {vol}"))
+    pane.finish(4)
+
+
+def _book_row(level: tuple, attr: int, size_col: int) -> tuple:
+    price, sz = level
+    return _text(f"  {price}".ljust(size_col - 2), attr), _text(sz[:12])
+
+
+def _draw_orderbook(pane: _Pane, s: Snapshot):
+    st = _focus_state(s)
+    bids, asks = st.bids, st.asks
+    size_col = min(24, pane.w - 14)
+    pane.put(1, _text("  Price".ljust(size_col - 2), curses.A_BOLD), _text("Size", curses.A_BOLD))
+    if not bids and not asks:
+        pane.put(2, _text("Waiting for data..."))
+        pane.finish(3)
+        return
     row = 2
-    for level in (asks[:8] if asks else []):
-        price = level[0] if len(level) > 0 else ""
-        sz = level[1] if len(level) > 1 else ""
-        if row >= h - 2:
+    for level in asks[:8]:
+        if row >= pane.h - 2:
             break
-        win.addstr(row, 2, f"  {price}", curses.color_pair(2) if hasattr(curses, "color_pair") else 0)
-        win.addstr(row, min(24, w - 12), str(sz)[:12])
+        pane.put(row, *_book_row(level, curses.color_pair(2), size_col))
         row += 1
-    if row < h - 2:
-        win.addstr(row, 2, "  ---")
+    if row < pane.h - 2:
+        pane.put(row, _text("  ---"))
         row += 1
-    for level in (bids[:8] if bids else []):
-        price = level[0] if len(level) > 0 else ""
-        sz = level[1] if len(level) > 1 else ""
-        if row >= h - 2:
+    for level in bids[:8]:
+        if row >= pane.h - 2:
             break
-        win.addstr(row, 2, f"  {price}", curses.color_pair(1) if hasattr(curses, "color_pair") else 0)
-        win.addstr(row, min(24, w - 12), str(sz)[:12])
+        pane.put(row, *_book_row(level, curses.color_pair(1), size_col))
         row += 1
-    if not bids and not asks:
-        win.addstr(2, 2, "Waiting for data...")
-    win.noutrefresh()
+    pane.finish(row)
 
 
-def _draw_trades(win, h: int, w: int):
-    with _lock:
-        trades = list(_state["trades"][:h - 3])
-    win.erase()
-    win.border()
-    win.addstr(0, 2, f" Trades ", curses.A_REVERSE)
-    win.addstr(1, 2, " Time   Side   Price    Size")
-    for i, t in enumerate(trades):
-        if i + 2 >= h - 1:
-            break
-        tm = _fmt_ts(t.get("ts", ""))
-        side = (t.get("side") or "—")[:4]
-        px = t.get("px") or t.get("price", "—")
-        sz = t.get("sz") or t.get("size", "—")
-        attr = curses.A_NORMAL
-        if hasattr(curses, "color_pair"):
-            attr = curses.color_pair(1) if side.lower() == "buy" else curses.color_pair(2)
-        win.addstr(2 + i, 2, f" {tm}  {side:4}  {str(px):>10}  {str(sz)[:12]}", attr)
+def _draw_trades(pane: _Pane, s: Snapshot):
+    trades = _focus_state(s).trades[:pane.h - 3]
+    pane.put(1, _text(" Time   Side   Price    Size"))
     if not trades:
-        win.addstr(2, 2, "Waiting for data...")
-    win.noutrefresh()
+        pane.put(2, _text("Waiting for data..."))
+        pane.finish(3)
+        return
+    for i, t in enumerate(trades):
+        tm = _fmt_ts(t.ts)
+        side = (t.side or "—")[:4]
+        px = t.px or "—"
+        sz = t.sz or "—"
+        attr = curses.color_pair(1) if side.lower() == "buy" else curses.color_pair(2)
+        pane.put(2 + i, _text(f" {tm}  {side:4}  {str(px):>10}  {str(sz)[:12]}", attr))
+    pane.finish(2 + len(trades))
+
+
+def _change_pct(t: Ticker) -> str:
+    try:
+        last = float(t.last)
+        open24 = float(t.open24h)
+        return f"{(last - open24) / open24 * 100:+.2f}%" if open24 else "—"
+    except (TypeError, ValueError):
+        return "—"
+
+
+def _draw_summary(pane: _Pane, s: Snapshot):
+    """One line per watched symbol; the focused one is highlighted and kept in view."""
+    focus = s.focus
+    rows = [(i, s.states[i].ticker) for i in _watch]
+    pane.put(1, _text(f"{'Symbol':<16}{'Last':>14}{'Chg%':>9}{'High 24h':>14}{'Low 24h':>14}{'Vol 24h':>16}{'Time':>10}", curses.A_BOLD))
+    visible = max(1, pane.h - 3)
+    sel = _watch.index(focus) if focus in _watch else 0
+    top = max(0, min(sel - visible // 2, len(rows) - visible))
+    for n, (inst_id, t) in enumerate(rows[top:top + visible]):
+        t = t or Ticker()
+        line = (f"{inst_id:<16}{t.last or '—':>14}{_change_pct(t):>9}{t.high24h:>14}"
+                f"{t.low24h:>14}{t.vol24h[:14]:>16}{(_fmt_ts(t.ts) if t.ts else ''):>10}")
+        pane.put(2 + n, _text(line, curses.A_REVERSE if inst_id == focus else 0))
+    pane.finish(2 + min(visible, len(rows)))
+
+
+_DRAW = {"ticker": _draw_ticker, "candle": _draw_candle, "book": _draw_orderbook, "trades": _draw_trades,
+         "summary": _draw_summary}
+# panes that show a push for the focused symbol (other symbols only reach the summary)
+_CHANNEL_PANES = {"tickers": ("ticker", "summary"), "candle1m": ("candle",), "books5": ("book",),
+                  "books": ("book",), "trades": ("trades",)}
+
+
+def _layout(stdscr, view: str) -> dict[str, _Pane]:
+    """Summary table or four quadrants; called at start, on resize and on view/focus changes
+    (the only times the screen is cleared)."""
+    h, w = stdscr.getmaxyx()
+    th, tw = max(8, h // 2), max(40, w // 2)
+    y2 = th + 1
+    h2 = h - th - 2
+    w2 = w - tw - 2
+    stdscr.erase()
+    stdscr.noutrefresh()
+    if view == "summary":
+        return {"summary": _Pane(h - 1, w, 0, 0, f"Watchlist ({len(_watch)})")}
+    return {
+        "ticker": _Pane(th, tw, 0, 0, f"{_snap.focus} Ticker"),
+        "candle": _Pane(th, w2, 0, tw + 1, "Candle 1m"),
+        "book": _Pane(h2, tw, y2, 0, "Orderbook"),
+        "trades": _Pane(h2, w2, y2, tw + 1, "Trades"),
+    }
+
+
+def _ages(panes) -> str:
+    """Footer staleness: age of the newest data each visible pane has drawn."""
+    return f"age {_meter.format_ages(panes)} " if _meter and _meter.enabled else ""
+
+
+def _draw_status(stdscr, err: str, s: Snapshot, ages: str = ""):
+    h, w = stdscr.getmaxyx()
+    try:
+        if err:
+            stdscr.addstr(h - 1, 0, f" WS: {err[:w-6]} ".ljust(w)[:w - 1], curses.A_REVERSE)
+            return
+        help_ = ""
+        if len(_watch) > 1:
+            pos = _watch.index(s.focus) + 1 if s.focus in _watch else 0
+            help_ = f" {s.focus} ({pos}/{len(_watch)})  Tab/n next  p prev  s summary/detail  Enter open  q quit"
+        line = (help_ + "  " + ages.rjust(w - 3 - len(help_)) if ages else help_.ljust(w))[:w - 1]
+        if line.strip():
+            stdscr.addstr(h - 1, 0, line.ljust(w - 1), curses.A_REVERSE if "STALE" in ages else curses.A_DIM)
+        else:
+            stdscr.move(h - 1, 0)
+            stdscr.clrtoeol()
+    except curses.error:
+        pass
+    finally:
+        stdscr.noutrefresh()
+
+
+def _pane_inputs(name: str, s: Snapshot) -> tuple:
+    """What a pane's content depends on; snapshot objects are immutable, so identity means unchanged.
+    (The renderer keeps the previous snapshot alive, so ids are not reused while compared.)"""
+    if name == "summary":
+        return s.focus, s.tickers_seq
+    st = s.states.get(s.focus) or _EMPTY
+    if name == "book":
+        return s.focus, id(st.bids), id(st.asks)
+    return s.focus, id(getattr(st, name))
 
 
 def _run_curses(stdscr):
@@ -258,68 +594,95 @@ def _run_curses(stdscr):
             pass
     stdscr.clear()
     stdscr.refresh()
-    h, w = stdscr.getmaxyx()
-    # Four quadrants
-    th, tw = max(8, h // 2), max(40, w // 2)
-    y2 = th + 1
-    h2 = h - th - 2
-    w2 = w - tw - 2
-    win_ticker = curses.newwin(th, tw, 0, 0)
-    win_candle = curses.newwin(th, w2, 0, tw + 1)
-    win_book = curses.newwin(h2, tw, y2, 0)
-    win_trades = curses.newwin(h2, w2, y2, tw + 1)
-    # Initial REST load
-    try:
-        with _lock:
-            _state["ticker"] = fetch_ticker()
-            c = fetch_candle_1m()
-            _state["candle"] = c if c else _state["candle"]
-            b, a = fetch_orderbook()
-            _state["bids"], _state["asks"] = b, a
-            _state["trades"] = fetch_trades() or _state["trades"]
-    except Exception as e:
-        with _lock:
-            _state["error"] = str(e)
-    # WS thread
-    t = threading.Thread(target=_ws_thread, daemon=True)
-    t.start()
-    # Refresh every 1 second; getch times out after 1000 ms
-    stdscr.timeout(1000)
-    # Refresh loop
+    size = stdscr.getmaxyx()
+    view = "summary" if len(_watch) > 1 else "detail"
+    panes = _layout(stdscr, view)
+    if _replay:
+        path, speed = _replay
+        handler = lambda raw: _on_ws_message(None, raw)
+        md_record.start_replay(path, {"term": handler, "pub": handler}, speed)
+    else:
+        # Initial REST load runs concurrently in the background while the WS connects
+        _submit_load(_snap.focus, _watch)
+        t = threading.Thread(target=_ws_thread, daemon=True)
+        t.start()
+    # Render when a new snapshot is published, at most MAX_FPS; keys are polled in between
+    stdscr.nodelay(True)
+    frame_s = 1.0 / max(1.0, MAX_FPS)
+    last_frame = 0.0
+    drawn: dict[str, tuple] = {}  # pane -> inputs it was last drawn from
+    prev = None  # snapshot of the last frame (keeps its objects alive for the id() comparison)
+    err, err_seq, err_until, status_key = "", 0, 0.0, None
+    probe = open(UI_PROBE, "a", buffering=1) if UI_PROBE else None
     while True:
         try:
-            nh, nw = stdscr.getmaxyx()
-            if nh != h or nw != w:
-                h, w = nh, nw
-                th, tw = max(8, h // 2), max(40, w // 2)
-                y2 = th + 1
-                h2 = h - th - 2
-                w2 = w - tw - 2
-                win_ticker = curses.newwin(th, tw, 0, 0)
-                win_candle = curses.newwin(th, w2, 0, tw + 1)
-                win_book = curses.newwin(h2, tw, y2, 0)
-                win_trades = curses.newwin(h2, w2, y2, tw + 1)
-            stdscr.clear()
-            stdscr.refresh()
-            _draw_ticker(win_ticker, th, tw)
-            _draw_candle(win_candle, th, w2)
-            _draw_orderbook(win_book, h2, tw)
-            _draw_trades(win_trades, h2, w2)
-            curses.doupdate()
-            with _lock:
-                err = _state.get("error", "")
-            if err:
-                stdscr.addstr(h - 1, 0, f" WS: {err[:w-6]} ".ljust(w)[:w], curses.A_REVERSE)
-                _state["error"] = ""
-                curses.doupdate()
+            _wake.wait(KEY_POLL_S)
             c = stdscr.getch()
             if c != -1 and (c == ord("q") or c == 27):
                 break
+            relayout = c == curses.KEY_RESIZE or stdscr.getmaxyx() != size
+            if c in (9, ord("n"), curses.KEY_DOWN, ord("p"), curses.KEY_BTAB, curses.KEY_UP) and len(_watch) > 1:
+                step = -1 if c in (ord("p"), curses.KEY_BTAB, curses.KEY_UP) else 1
+                _set_focus(_watch[(_watch.index(_snap.focus) + step) % len(_watch)])
+                relayout = relayout or view == "detail"  # quadrant titles name the symbol
+            elif c == ord("s") and len(_watch) > 1:
+                view, relayout = ("detail" if view == "summary" else "summary"), True
+            elif c in (10, 13, curses.KEY_ENTER) and view == "summary":
+                view, relayout = "detail", True
+            if relayout:
+                size = stdscr.getmaxyx()
+                panes = _layout(stdscr, view)
+                drawn, status_key = {}, None
+            wait = last_frame + frame_s - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)  # cap the frame rate; pushes arriving meanwhile join this frame
+            _wake.clear()
+            snap = _snap
+            if snap.error_seq != err_seq:
+                err, err_seq, err_until = snap.error, snap.error_seq, time.monotonic() + ERROR_SHOW_S
+            elif err and time.monotonic() > err_until:
+                err = ""
+            dirty = [n for n in panes if drawn.get(n) != _pane_inputs(n, snap)]
+            ages = _ages(panes)
+            status_dirty = status_key != (err, snap.focus, ages)
+            if not dirty and not status_dirty:
+                continue
+            t0 = time.perf_counter()
+            for name in dirty:
+                _DRAW[name](panes[name], snap)
+                drawn[name] = _pane_inputs(name, snap)
+            if status_dirty:
+                _draw_status(stdscr, err, snap, ages)
+                status_key = (err, snap.focus, ages)
+            curses.doupdate()
+            if _meter:
+                for name in dirty:
+                    _meter.painted(name)
+            prev = snap
+            last_frame = time.monotonic()
+            if probe:
+                age_ms = (time.time() - snap.ts) * 1000 if snap.ts else -1
+                probe.write(f"{int(time.time() * 1000)} {(time.perf_counter() - t0) * 1000:.1f} {age_ms:.0f}\n")
         except curses.error:
             pass
 
 
 def main():
+    ap = argparse.ArgumentParser(description="OKX spot terminal: ticker, 1m candle, orderbook, trades")
+    ap.add_argument("inst_ids", nargs="*", default=[INST_ID], help="instruments to watch, e.g. BTC-USDT ETH-USDT")
+    ap.add_argument("--replay", metavar="PATH", help="replay a recording (md_record.py) instead of connecting")
+    ap.add_argument("--speed", default="1", help="replay speed: 1, 10, ... or max")
+    args = ap.parse_args()
+    set_watch([i for arg in args.inst_ids for i in arg.split(",") if i])
+    if args.replay:
+        if not md_record:
+            print("--replay needs md_record.py (run from the app directory)")
+            return
+        global _replay, _recorder
+        _replay = (args.replay, md_record.parse_speed(args.speed))
+        _recorder = None
+        if _meter:
+            _meter.enabled = False  # recorded exchange timestamps are not comparable with now
     if not curses:
         print("Install curses (e.g. pip install windows-curses on Windows)")
         return
@@ -0,0 +1,139 @@
+"""
+TickerStore: one shared, array-backed table of 24h tickers (REST load + WS pushes).
+Every row carries the store version at which it last changed; views remember the last version they
+drew and ask for changed_since(version), so they repaint dirty rows only.
+Used from the GUI thread (REST results arrive via wx.CallAfter, WS via posted events).
+"""
+from array import array
+from bisect import bisect_right
+from typing import Callable
+
+# column -> OKX field names (first non-empty wins)
+FIELDS = {
+    "last": ("last", "lastPx"),
+    "open24h": ("open24h", "sodUtc0"),
+    "high24h": ("high24h", "highPx"),
+    "low24h": ("low24h", "lowPx"),
+    "vol24h": ("vol24h", "volCcy24h"),
+}
+NAN = float("nan")
+
+
+def _num(s) -> float:
+    try:
+        return float(s)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class TickerStore:
+    def __init__(self):
+        self.version = 0
+        self.ids: list[str] = []
+        self._row: dict[str, int] = {}
+        self.text: dict[str, list[str]] = {f: [] for f in FIELDS}  # exact strings for display
+        self.num: dict[str, array] = {f: array("d") for f in FIELDS}  # parsed once per update; nan if missing
+        self.ts = array("q")
+        self.row_version = array("q")
+        # change log: (version, row) in version order; compacted to one entry per row when it grows
+        self._log_ver = array("q")
+        self._log_row = array("l")
+        self._listeners: list[Callable[["TickerStore"], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, inst_id: str) -> bool:
+        return inst_id in self._row
+
+    def row(self, inst_id: str) -> int | None:
+        return self._row.get(inst_id)
+
+    def subscribe(self, callback: Callable[["TickerStore"], None]):
+        """callback(store) after each upsert/load; call changed_since() to get the dirty rows."""
+        self._listeners.append(callback)
+
+    def upsert(self, inst_id: str, d: dict, notify: bool = True) -> int:
+        if not inst_id:
+            return -1
+        self.version += 1
+        r = self._row.get(inst_id)
+        if r is None:
+            r = self._row[inst_id] = len(self.ids)
+            self.ids.append(inst_id)
+            for f in FIELDS:
+                self.text[f].append("")
+                self.num[f].append(NAN)
+            self.ts.append(0)
+            self.row_version.append(0)
+        for f, names in FIELDS.items():
+            v = ""
+            for n in names:
+                v = d.get(n) or ""
+                if v:
+                    break
+            v = str(v)
+            self.text[f][r] = v
+            self.num[f][r] = _num(v)
+        try:
+            self.ts[r] = int(d.get("ts") or 0)
+        except (TypeError, ValueError):
+            self.ts[r] = 0
+        self.row_version[r] = self.version
+        self._log_ver.append(self.version)
+        self._log_row.append(r)
+        if len(self._log_ver) > 4 * len(self.ids) + 1024:
+            self._compact_log()
+        if notify:
+            self._notify()
+        return r
+
+    def load(self, data: list[dict]):
+        """Bulk REST load; listeners are notified once."""
+        for d in data or []:
+            self.upsert(d.get("instId") or "", d, notify=False)
+        self._notify()
+
+    def changed_since(self, version: int) -> tuple[list[int], int]:
+        """Rows changed after `version` (each once, oldest change first) and the current version."""
+        i = bisect_right(self._log_ver, version)
+        rows = list(dict.fromkeys(self._log_row[i:]))
+        return rows, self.version
+
+    def get(self, inst_id: str) -> dict | None:
+        """Row as an OKX-style ticker dict (for code that still wants dicts)."""
+        r = self._row.get(inst_id)
+        if r is None:
+            return None
+        d = {f: self.text[f][r] for f in FIELDS}
+        d["instId"] = inst_id
+        d["ts"] = str(self.ts[r])
+        return d
+
+    def change_pct(self, r: int) -> float:
+        last, open_px = self.num["last"][r], self.num["open24h"][r]
+        return (last - open_px) / open_px * 100 if open_px else NAN
+
+    def range_pct(self, r: int) -> float:
+        high, low = self.num["high24h"][r], self.num["low24h"][r]
+        return (high - low) / low * 100 if low else NAN
+
+    def _compact_log(self):
+        order = sorted(range(len(self.ids)), key=self.row_version.__getitem__)
+        self._log_ver = array("q", (self.row_version[r] for r in order))
+        self._log_row = array("l", order)
+
+    def _notify(self):
+        for cb in list(self._listeners):
+            cb(self)
+
+
+_store: TickerStore | None = None
+
+
+def get_ticker_store() -> TickerStore:
+    """Shared store for every ticker view."""
+    global _store
+    if _store is None:
+        _store = TickerStore()
+    return _store
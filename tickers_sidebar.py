@@ -1,7 +1,8 @@
 """
 tickers
 """
-import threading
+import math
+from bisect import bisect_left
 from datetime import datetime, timezone
 import wx
 import wx.grid
@@ -13,10 +14,14 @@ from okx_client import (
     get_tickers,
 )
 from okx_ws import OKXWebSocket
+from ticker_store import TickerStore, get_ticker_store
+from task_pool import get_task_pool
 
 
 class TickersPanel(wx.Panel):
-    def __init__(self, parent):
+    MAX_ROWS = 200
+
+    def __init__(self, parent, store: TickerStore | None = None):
         super().__init__(parent)
         layout = wx.BoxSizer(wx.VERTICAL)
         self.grid = wx.grid.Grid(self)
@@ -31,58 +36,61 @@ class TickersPanel(wx.Panel):
         self.grid.EnableEditing(False)
         layout.Add(self.grid, 1, wx.EXPAND)
         self.SetSizer(layout)
-        self._ticker_map = {}
-        self._row_for_inst = {}
+        self._store = store or get_ticker_store()
+        self._seen = 0  # store version already drawn
+        self._order = []  # instIds in grid order (sorted, at most MAX_ROWS)
+        self._store.subscribe(self._on_store_change)
 
     def load(self):
-        def work():
+        def work(task):
             try:
                 data = get_tickers("SPOT")
-                wx.CallAfter(self._set_tickers, data)
+                wx.CallAfter(self._store.load, data)
             except Exception as e:
                 wx.CallAfter(self._show_error, str(e))
 
-        threading.Thread(target=work, daemon=True).start()
-
-    def _set_tickers(self, data: list):
-        usdt = [d for d in data if (d.get("instId") or "").endswith("-USDT")]
-        self._ticker_map = {d["instId"]: d for d in usdt}
-        self._sync_grid()
+        get_task_pool().submit(work, key=("tickers", id(self)))
 
-    def _sync_grid(self):
-        rows = sorted(self._ticker_map.keys())
-        n = self.grid.GetNumberRows()
-        if n > 0:
-            self.grid.DeleteRows(0, n)
-        for i, inst_id in enumerate(rows[:200]):
-            self.grid.AppendRows(1)
-            self._update_row(i, inst_id, self._ticker_map[inst_id])
-        self._row_for_inst = {inst_id: i for i, inst_id in enumerate(rows[:200])}
+    def _on_store_change(self, store: TickerStore):
+        rows, self._seen = store.changed_since(self._seen)
+        if not rows:
+            return
+        order = self._order
+        self.grid.BeginBatch()
+        try:
+            for r in rows:
+                inst_id = store.ids[r]
+                if not inst_id.endswith("-USDT"):
+                    continue
+                pos = bisect_left(order, inst_id)
+                if pos == len(order) or order[pos] != inst_id:
+                    # new instrument: insert its row in place instead of rebuilding the grid
+                    if pos >= self.MAX_ROWS:
+                        continue
+                    order.insert(pos, inst_id)
+                    self.grid.InsertRows(pos, 1)
+                    if len(order) > self.MAX_ROWS:
+                        order.pop()
+                        self.grid.DeleteRows(self.MAX_ROWS, 1)
+                self._update_row(pos, r)
+        finally:
+            self.grid.EndBatch()
 
-    def update_ticker(self, inst_id: str, data: dict):
-        self._ticker_map[inst_id] = data
-        if inst_id in self._row_for_inst:
-            row = self._row_for_inst[inst_id]
-            self._update_row(row, inst_id, data)
+    def _update_row(self, row: int, r: int):
+        st = self._store
+        text = st.text
+        self.grid.SetCellValue(row, 0, st.ids[r])
+        self.grid.SetCellValue(row, 1, text["last"][r])
+        ch = st.change_pct(r)
+        if math.isnan(ch):
+            self.grid.SetCellValue(row, 2, "")
         else:
-            self._sync_grid()
-
-    def _update_row(self, row: int, inst_id: str, d: dict):
-        last = d.get("last", "") or d.get("lastPx", "")
-        open_px = d.get("open24h", "") or d.get("sodUtc0", "")
-        self.grid.SetCellValue(row, 0, inst_id)
-        self.grid.SetCellValue(row, 1, str(last))
-        try:
-            lf, of = float(last), float(open_px)
-            ch = ((lf - of) / of * 100) if of else 0
             self.grid.SetCellValue(row, 2, f"{ch:.2f}%")
             self.grid.SetCellBackgroundColour(row, 2, wx.Colour(0, 200, 0) if ch >= 0 else wx.Colour(200, 0, 0))
-        except (TypeError, ValueError):
-            self.grid.SetCellValue(row, 2, "")
-        self.grid.SetCellValue(row, 3, str(d.get("high24h", "") or d.get("highPx", "")))
-        self.grid.SetCellValue(row, 4, str(d.get("low24h", "") or d.get("lowPx", "")))
-        self.grid.SetCellValue(row, 5, str(d.get("vol24h", "") or d.get("volCcy24h", "")))
-        self.grid.SetCellValue(row, 6, str(d.get("ts", ""))[:19] if d.get("ts") else "")
+        self.grid.SetCellValue(row, 3, text["high24h"][r])
+        self.grid.SetCellValue(row, 4, text["low24h"][r])
+        self.grid.SetCellValue(row, 5, text["vol24h"][r])
+        self.grid.SetCellValue(row, 6, str(st.ts[r] or ""))
 
     def _show_error(self, msg: str):
-        wx.MessageBox(msg, "Error", wx.OK | wx.ICON_ERROR)
\ No newline at end of file
+        wx.MessageBox(msg, "Error", wx.OK | wx.ICON_ERROR)
@@ -2,7 +2,6 @@
 OKX Crypto Desktop App - wxPython 4.
 Markets, tickers, candles (REST + WebSocket), spot trading (REST + WebSocket).
 """
-import threading
 from datetime import datetime, timezone
 import wx
 import wx.grid
@@ -21,6 +20,10 @@ from okx_ws import OKXWebSocket
 from candles_chart import CandlesChartPanel
 from tickers_sidebar import TickersPanel
 from markets_sidebar import MarketsPanel
+from open_orders import OpenOrders, Order
+from order_validation import validate_order, parse_balances
+from instrument_catalog import get_catalog
+from task_pool import get_task_pool
 
 
 
@@ -54,6 +57,8 @@ class TradingPanel(wx.Panel):
         btn_row.Add(self.place_btn, 0, wx.RIGHT, 4)
         btn_row.Add(self.cancel_btn, 0)
         layout.Add(btn_row, 0, wx.ALL, 4)
+        self.check_label = wx.StaticText(self, label="")
+        layout.Add(self.check_label, 0, wx.LEFT | wx.RIGHT, 4)
         layout.Add(wx.StaticText(self, label="Open orders:"), 0, wx.ALL, 2)
         self.orders_list = wx.ListCtrl(self, style=wx.LC_REPORT)
         self.orders_list.AppendColumn("Order ID", width=100)
@@ -61,7 +66,8 @@ class TradingPanel(wx.Panel):
         self.orders_list.AppendColumn("Side", width=50)
         self.orders_list.AppendColumn("Price", width=80)
         self.orders_list.AppendColumn("Size", width=80)
-        self.orders_list.AppendColumn("State", width=60)
+        self.orders_list.AppendColumn("Filled", width=80)
+        self.orders_list.AppendColumn("State", width=90)
         layout.Add(self.orders_list, 1, wx.EXPAND)
         self.SetSizer(layout)
         self.place_btn.Bind(wx.EVT_BUTTON, self._on_place)
@@ -69,6 +75,11 @@ class TradingPanel(wx.Panel):
         self.orders_list.Bind(wx.EVT_LIST_ITEM_SELECTED, self._on_order_sel)
         self._selected_ord_id = None
         self._selected_inst_id = None
+        self._orders = OpenOrders()
+        self._ws_ready_once = False
+        self._balances = None  # ccy -> available Decimal, from get_balance; None until loaded
+        self._balance_timer = wx.CallLater(1000, self._refresh_balance)
+        self._balance_timer.Stop()
 
     def set_inst_id(self, inst_id: str):
         self.inst_id.SetValue(inst_id or "BTC-USDT")
@@ -85,11 +96,19 @@ class TradingPanel(wx.Panel):
         if not inst_id or not sz:
             wx.MessageBox("Pair and size required.", "Error", wx.OK | wx.ICON_ERROR)
             return
-        if ord_type == "limit" and (not px or float(px) <= 0):
-            wx.MessageBox("Price required for limit order.", "Error", wx.OK | wx.ICON_ERROR)
+        # local rules (tickSz/lotSz/minSz/max size/balance) before any network call
+        check = validate_order(side, ord_type, sz, px, get_catalog().get(inst_id), self._balances)
+        if not check.ok:
+            self.check_label.SetLabel(f"Rejected locally in {check.elapsed_us:.0f} µs")
+            wx.MessageBox("\n".join(check.errors), "Error", wx.OK | wx.ICON_ERROR)
             return
+        self.check_label.SetLabel(f"Validated in {check.elapsed_us:.0f} µs")
+        sz, px = check.sz, check.px
+        self.sz.SetValue(sz)
+        if px is not None:
+            self.px.SetValue(px)
 
-        def work():
+        def work(task):
             try:
                 out = place_order(inst_id, side, ord_type, sz, px=px)
                 msg = out.get("msg", "")
@@ -97,13 +116,12 @@ class TradingPanel(wx.Panel):
                 code = out.get("code", "")
                 if code == "0" or s_code == "0":
                     wx.CallAfter(wx.MessageBox, "Order placed.", "OK", wx.OK)
-                    wx.CallAfter(self._refresh_orders)
                 else:
                     wx.CallAfter(wx.MessageBox, msg or str(out), "Error", wx.OK | wx.ICON_ERROR)
             except Exception as e:
                 wx.CallAfter(wx.MessageBox, str(e), "Error", wx.OK | wx.ICON_ERROR)
 
-        threading.Thread(target=work, daemon=True).start()
+        get_task_pool().submit(work, urgent=True)
 
     def _on_cancel(self, evt):
         if not self._selected_ord_id or not self._selected_inst_id:
@@ -115,49 +133,81 @@ class TradingPanel(wx.Panel):
         ord_id = self._selected_ord_id
         inst_id = self._selected_inst_id
 
-        def work():
+        def work(task):
             try:
                 out = cancel_order(inst_id, ord_id)
                 if out.get("code") == "0":
                     wx.CallAfter(wx.MessageBox, "Order cancelled.", "OK", wx.OK)
-                    wx.CallAfter(self._refresh_orders)
                 else:
                     wx.CallAfter(wx.MessageBox, out.get("msg", "Cancel failed"), "Error", wx.OK | wx.ICON_ERROR)
             except Exception as e:
                 wx.CallAfter(wx.MessageBox, str(e), "Error", wx.OK | wx.ICON_ERROR)
 
-        threading.Thread(target=work, daemon=True).start()
+        get_task_pool().submit(work, urgent=True)
 
     def _on_order_sel(self, evt):
         idx = evt.GetIndex()
         self._selected_ord_id = self.orders_list.GetItemText(idx, 0)
         self._selected_inst_id = self.orders_list.GetItemText(idx, 1)
 
+    def _refresh_balance(self):
+        if not API_KEY or not SECRET_KEY or not PASSPHRASE:
+            return
+
+        def work(task):
+            try:
+                balances = parse_balances(get_balance())
+                wx.CallAfter(setattr, self, "_balances", balances)
+            except Exception:
+                pass  # keep the previous cache; the exchange still checks the balance
+
+        get_task_pool().submit(work, key=("balance", id(self)))
+
     def _refresh_orders(self):
         if not API_KEY or not SECRET_KEY or not PASSPHRASE:
             return
+        self._refresh_balance()
 
-        def work():
+        def work(task):
             try:
                 data = get_orders("SPOT")
                 wx.CallAfter(self._set_orders, data)
             except Exception as e:
                 wx.CallAfter(wx.MessageBox, str(e), "Error", wx.OK | wx.ICON_ERROR)
 
-        threading.Thread(target=work, daemon=True).start()
+        get_task_pool().submit(work, key=("orders", id(self)))
 
     def _set_orders(self, data: list):
+        self._orders.load(data)
         self.orders_list.DeleteAllItems()
-        for d in data:
-            self.orders_list.Append((
-                d.get("ordId", ""),
-                d.get("instId", ""),
-                d.get("side", ""),
-                d.get("px", ""),
-                d.get("sz", ""),
-                d.get("state", ""),
-            ))
+        for d in self._orders:
+            self.orders_list.Append(self._order_row(d))
 
-    def update_order_ws(self, data: dict):
-        wx.CallAfter(self._refresh_orders)
+    @staticmethod
+    def _order_row(o: Order) -> tuple:
+        return o.ordId, o.instId, o.side, o.px, o.sz, o.accFillSz, o.state
+
+    def on_orders_stream_ready(self):
+        """Private WS (re)connected: the first time the REST load already ran; after a reconnect, resync."""
+        if self._ws_ready_once:
+            self._refresh_orders()
+        self._ws_ready_once = True
 
+    def update_order_ws(self, data: dict):
+        """Apply one WS orders push as a delta; only the affected row changes."""
+        change = self._orders.apply(data)
+        if change is None:
+            return
+        action, idx = change
+        if data.get("state") in ("partially_filled", "filled", "canceled") or action == "add":
+            # balances moved: refetch once things settle
+            self._balance_timer.Start(1000)
+        if action == "remove":
+            if self.orders_list.GetItemText(idx, 0) == self._selected_ord_id:
+                self._selected_ord_id = self._selected_inst_id = None
+            self.orders_list.DeleteItem(idx)
+        elif action == "add":
+            self.orders_list.Append(self._order_row(self._orders[idx]))
+        else:
+            for col, value in enumerate(self._order_row(self._orders[idx])):
+                self.orders_list.SetItem(idx, col, str(value))
@@ -0,0 +1,164 @@
+"""
+GUI thread diagnostics: a stall watchdog and an on-demand sampling profiler.
+Both read the GUI thread's Python stack from another thread (sys._current_frames), so nothing on the
+GUI thread has to cooperate beyond the heartbeat: the app calls StallWatchdog.beat() from a wx.Timer.
+When beats stop for longer than the threshold, the monitor thread logs the stack and the handler the
+main loop dispatched to (an event handler, or the callable behind a wx.CallAfter).
+
+The profiler writes folded stacks ("root;...;leaf count" per line), the input format of flamegraph.pl,
+speedscope and inferno.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Callable
+
+_loop_code: CodeType | None = None
+
+
+def run_main_loop(app):
+    """app.MainLoop() from a known frame: the first frame above it is whatever the loop dispatched to."""
+    global _loop_code
+    _loop_code = sys._getframe().f_code
+    app.MainLoop()
+
+
+def _stack(frame: FrameType | None) -> list[FrameType]:
+    """Root first."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _is_wx(frame: FrameType) -> bool:
+    return f"{os.sep}wx{os.sep}" in frame.f_code.co_filename
+
+
+def describe(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def running_handler(frames: list[FrameType]) -> FrameType | None:
+    """The handler the main loop is inside: first non-wx frame above run_main_loop (wx's CallAfter
+    trampoline is skipped, so this is the callable that was passed to CallAfter)."""
+    start = next((i + 1 for i, f in enumerate(frames) if f.f_code is _loop_code), None)
+    if start is None:
+        return None
+    return next((f for f in frames[start:] if not _is_wx(f)), None)
+
+
+class StallWatchdog:
+    def __init__(
+        self,
+        thread_id: int,
+        threshold_s: float,
+        log_path: str,
+        on_stall: Callable[[float, str], None] | None = None,
+    ):
+        """thread_id: the GUI thread. on_stall(seconds, handler) is called from beat(), on the GUI
+        thread, once a logged stall is over."""
+        self.thread_id = thread_id
+        self.threshold_s = threshold_s
+        self.log_path = log_path
+        self.on_stall = on_stall
+        self.stalls = 0
+        self.max_lag_s = 0.0
+        self._last_beat = time.monotonic()
+        self._reported = False  # current stall already logged
+        self._handler = ""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._monitor, name="ui-watchdog", daemon=True)
+
+    def start(self):
+        self._last_beat = time.monotonic()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self):
+        """GUI thread, from a timer: any gap since the previous beat is main-loop latency."""
+        now = time.monotonic()
+        lag = now - self._last_beat
+        self._last_beat = now
+        self.max_lag_s = max(self.max_lag_s, lag)
+        if self._reported:
+            self._reported = False
+            self._log(f"  ... stall ended after {lag * 1000:.0f} ms\n")
+            if self.on_stall:
+                self.on_stall(lag, self._handler)
+
+    def _monitor(self):
+        poll = min(0.1, self.threshold_s / 4)
+        while not self._stop.wait(poll):
+            stalled = time.monotonic() - self._last_beat
+            if stalled < self.threshold_s or self._reported:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return  # GUI thread is gone
+            frames = _stack(frame)
+            handler = running_handler(frames)
+            self._handler = describe(handler) if handler is not None else "?"
+            self._reported = True
+            self.stalls += 1
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._log(
+                f"{stamp} GUI stalled {stalled * 1000:.0f} ms in {self._handler}\n"
+                + "".join(traceback.format_stack(frame))
+            )
+
+    def _log(self, text: str):
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError:
+            sys.stderr.write(text)
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: int, interval_s: float = 0.005):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.samples = 0
+        self._counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ui-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        labels: dict[CodeType, str] = {}  # per function, not per line, so samples aggregate
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            parts = []
+            for f in _stack(frame):
+                label = labels.get(f.f_code)
+                if label is None:
+                    code = f.f_code
+                    name = getattr(code, "co_qualname", code.co_name)
+                    label = labels[code] = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+                parts.append(label)
+            self._counts[";".join(parts)] += 1
+            self.samples += 1
+
+    def stop(self, path: str) -> int:
+        """Stop sampling and write folded stacks to path; returns the number of samples."""
+        self._stop.set()
+        self._thread.join(timeout=1)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self._counts.most_common():
+                f.write(f"{stack} {n}\n")
+        return self.samples
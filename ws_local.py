@@ -0,0 +1,131 @@
+"""
+Minimal RFC 6455 server side on the stdlib, for the local servers in this project (mock_okx.py, md_hub.py):
+frame encode/decode, the upgrade handshake on a BaseHTTPRequestHandler, and a per-connection writer
+with a bounded queue.
+"""
+import base64
+import hashlib
+import json
+import queue
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+QUEUE_FRAMES = 20000  # per client; frames beyond this are dropped and counted
+
+
+def ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Unmasked server frame (FIN set)."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+def _read_exact(rfile, n: int) -> bytes:
+    data = rfile.read(n)
+    if len(data) < n:
+        raise ConnectionError("client closed")
+    return data
+
+
+def ws_read(rfile) -> tuple[int, bytes]:
+    """One client frame -> (opcode, unmasked payload). Continuation frames are returned as they come."""
+    b1, b2 = _read_exact(rfile, 2)
+    n = b2 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", _read_exact(rfile, 2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", _read_exact(rfile, 8))[0]
+    mask = _read_exact(rfile, 4) if b2 & 0x80 else None
+    data = _read_exact(rfile, n)
+    if mask and n:
+        key = (mask * (n // 4 + 1))[:n]
+        data = (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+    return b1 & 0x0F, data
+
+
+class WsClient:
+    """One WS connection: a bounded outgoing queue drained by a writer thread, so slow readers never block the feed."""
+
+    def __init__(self, wfile, private: bool = False):
+        self.wfile = wfile
+        self.private = private
+        self.logged_in = False
+        self.sent = 0
+        self.dropped = 0
+        self._q: queue.Queue = queue.Queue(maxsize=QUEUE_FRAMES)
+        self._alive = True
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def push(self, frame: bytes):
+        try:
+            self._q.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def send_json(self, obj: dict):
+        self.push(ws_frame(json.dumps(obj).encode("utf-8")))
+
+    def close(self):
+        self._alive = False
+        try:
+            self._q.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _write_loop(self):
+        while self._alive:
+            frame = self._q.get()
+            if frame is None:
+                break
+            batch = [frame]
+            while len(batch) < 256:  # coalesce writes under load
+                try:
+                    frame = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is None:
+                    self._alive = False
+                    break
+                batch.append(frame)
+            try:
+                self.wfile.write(b"".join(batch))
+                self.sent += len(batch)
+            except OSError:
+                self._alive = False
+
+
+def accept(handler: BaseHTTPRequestHandler):
+    """Answer the upgrade request; the connection is a WebSocket from here on."""
+    key = handler.headers.get("Sec-WebSocket-Key", "")
+    digest = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+    handler.send_response(101, "Switching Protocols")
+    handler.send_header("Upgrade", "websocket")
+    handler.send_header("Connection", "Upgrade")
+    handler.send_header("Sec-WebSocket-Accept", digest)
+    handler.end_headers()
+    handler.close_connection = True
+
+
+def serve(handler: BaseHTTPRequestHandler, client: WsClient, on_text: Callable[[str], None]):
+    """Read frames until the peer closes: control frames are answered here, text goes to on_text."""
+    try:
+        while True:
+            opcode, data = ws_read(handler.rfile)
+            if opcode == 0x8:  # close
+                client.push(ws_frame(data[:2], 0x8))
+                break
+            if opcode == 0x9:  # ping
+                client.push(ws_frame(data, 0xA))
+            elif opcode == 0x1:
+                on_text(data.decode("utf-8", "replace"))
+    except (ConnectionError, OSError, ValueError):
+        pass